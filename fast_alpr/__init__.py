@@ -1,8 +1,84 @@
 """
 FastALPR package.
+
+Public names are imported lazily on first access, so importing the package (i.e. just for the
+`BaseDetector` and `BaseOCR` types) doesn't load OpenCV, ONNX Runtime or the model libraries.
 """
 
-from fast_alpr.alpr import ALPR, ALPRResult
-from fast_alpr.base import BaseDetector, BaseOCR, DetectionResult, OcrResult
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fast_alpr.alpr import ALPR, ALPRResult, StreamFrame
+    from fast_alpr.base import BaseDetector, BaseOCR, DetectionResult, OcrResult
+    from fast_alpr.decoders import OpenCVDecoder, PyAVDecoder
+    from fast_alpr.frame import FrameContext
+    from fast_alpr.metrics import PipelineMetrics
+    from fast_alpr.motion import MotionGate
+    from fast_alpr.pool import ALPRPool
+    from fast_alpr.render import PlateRenderer, RenderStyle
+    from fast_alpr.roi import RegionOfInterest
+    from fast_alpr.scheduler import CameraScheduler
+    from fast_alpr.tiling import TiledDetector
+    from fast_alpr.tracker import PlateTracker
+    from fast_alpr.voting import PlateVoter
+
+_LAZY_IMPORTS: dict[str, str] = {
+    "ALPR": "fast_alpr.alpr",
+    "ALPRPool": "fast_alpr.pool",
+    "ALPRResult": "fast_alpr.alpr",
+    "BaseDetector": "fast_alpr.base",
+    "BaseOCR": "fast_alpr.base",
+    "CameraScheduler": "fast_alpr.scheduler",
+    "DetectionResult": "fast_alpr.base",
+    "FrameContext": "fast_alpr.frame",
+    "MotionGate": "fast_alpr.motion",
+    "OcrResult": "fast_alpr.base",
+    "OpenCVDecoder": "fast_alpr.decoders",
+    "PipelineMetrics": "fast_alpr.metrics",
+    "PlateRenderer": "fast_alpr.render",
+    "PlateTracker": "fast_alpr.tracker",
+    "PlateVoter": "fast_alpr.voting",
+    "PyAVDecoder": "fast_alpr.decoders",
+    "RegionOfInterest": "fast_alpr.roi",
+    "RenderStyle": "fast_alpr.render",
+    "StreamFrame": "fast_alpr.alpr",
+    "TiledDetector": "fast_alpr.tiling",
+}
+
+__all__ = [
+    "ALPR",
+    "ALPRPool",
+    "ALPRResult",
+    "BaseDetector",
+    "BaseOCR",
+    "CameraScheduler",
+    "DetectionResult",
+    "FrameContext",
+    "MotionGate",
+    "OcrResult",
+    "OpenCVDecoder",
+    "PipelineMetrics",
+    "PlateRenderer",
+    "PlateTracker",
+    "PlateVoter",
+    "PyAVDecoder",
+    "RegionOfInterest",
+    "RenderStyle",
+    "StreamFrame",
+    "TiledDetector",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Cache it, so the next accesses don't go through this function
+    globals()[name] = value
+    return value
+
 
-__all__ = ["ALPR", "ALPRResult", "BaseDetector", "BaseOCR", "DetectionResult", "OcrResult"]
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -2,25 +2,42 @@
 ALPR module.
 """
 
+import asyncio
 import os
-import statistics
-from collections.abc import Sequence
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, TypeVar, cast
 
-import cv2
 import numpy as np
 import onnxruntime as ort
 from fast_plate_ocr.inference.hub import OcrModel
 from open_image_models.detection.core.hub import PlateDetectorModel
 
 from fast_alpr.base import BaseDetector, BaseOCR, DetectionResult, OcrResult
+from fast_alpr.decoders import VideoDecoder
 from fast_alpr.default_detector import DefaultDetector
 from fast_alpr.default_ocr import DefaultOCR
+from fast_alpr.frame import FrameContext, use_contexts
+from fast_alpr.metrics import record_timings, stage
+from fast_alpr.motion import MotionGate
+from fast_alpr.render import PlateRenderer
+from fast_alpr.roi import RegionOfInterest, RoiLike, to_roi
+from fast_alpr.session import SessionProfile, SessionProfileName, get_session_profile
+from fast_alpr.stream import FrameReader
+from fast_alpr.tiling import TiledDetector
+from fast_alpr.tracker import CropQuality, PlateTracker, Track
+from fast_alpr.utils import load_image, non_max_suppression
 
 # pylint: disable=too-many-arguments, too-many-locals
 # ruff: noqa: PLR0913
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
 
 @dataclass(frozen=True)
 class ALPRResult:
@@ -30,13 +47,54 @@ class ALPRResult:
 
     detection: DetectionResult
     ocr: OcrResult | None
+    track_id: int | None = None
+    """ID of the plate's track, when results come from `ALPR.track`. None otherwise."""
+    finalized: bool = False
+    """Whether `ocr` is the finalized consensus read of the track (see `PlateVoter`)."""
+
+
+@dataclass(frozen=True)
+class StreamFrame:
+    """
+    Dataclass to hold the results of a frame processed by `ALPR.stream`.
+    """
 
+    frame_index: int
+    """Index of the frame within the source, counting every decoded frame."""
+    timestamp: float
+    """Time (seconds since the epoch) at which the frame was decoded."""
+    results: list[ALPRResult]
+    """Recognized license plates."""
+    frame: np.ndarray
+    """The decoded frame (Colors in order: BGR)."""
+    inferred: bool = True
+    """Whether ALPR ran on the frame. False for frames skipped by a `MotionGate`."""
+    context: FrameContext | None = None
+    """Views derived from the frame by the motion gate and the detector, i.e. to reuse a
+    downscaled copy for a preview."""
+    source: str | None = None
+    """Name of the source the frame comes from, when processed by a `CameraScheduler`."""
 
-class ALPR:
+
+class ALPR:  # pylint: disable=too-many-instance-attributes
     """
     Automatic License Plate Recognition (ALPR) system class.
 
     This class combines a detector and an OCR model to recognize license plates in images.
+
+    `predict`, `predict_many` and `draw_predictions` are thread-safe when using the default
+    detector and OCR, so a single instance can be shared between threads (i.e. one per camera)
+    without any external lock. Use `num_sessions` to give concurrent callers sessions of their own,
+    so they run in parallel across the CPU cores instead of sharing a single session.
+
+    When the plates can only appear in part of the frame (i.e. a lane), pass regions of interest
+    with `rois`. Detection then runs only on the crops of those regions, batched together, which
+    keeps more plate resolution after the detector's resize and avoids false detections elsewhere.
+    Boxes are always returned in full-frame coordinates.
+
+    By default the detector and OCR sessions are built (downloading the models if needed) when the
+    instance is created. Use `load_models="lazy"` to build them on the first call instead, or
+    `load_models="background"` to build them in a background thread and wait on `ready`.
     """
 
     def __init__(
@@ -54,6 +112,19 @@ class ALPR:
         ocr_model_path: str | os.PathLike | None = None,
         ocr_config_path: str | os.PathLike | None = None,
         ocr_force_download: bool = False,
+        num_sessions: int = 1,
+        max_concurrency: int | None = None,
+        rois: Sequence[RoiLike] | None = None,
+        tile_size: int | None = None,
+        tile_overlap: float = 0.2,
+        ocr_per_char_confidence: bool = False,
+        ocr_slot_probabilities: bool = False,
+        renderer: PlateRenderer | None = None,
+        timing_hooks: Sequence[Callable[[dict[str, float]], None]] | None = None,
+        load_models: Literal["eager", "lazy", "background"] = "eager",
+        session_profile: SessionProfile | SessionProfileName | None = None,
+        graph_cache_dir: str | os.PathLike | None = None,
+        frame_hooks: Sequence[Callable[[FrameContext, list[ALPRResult]], None]] | None = None,
     ) -> None:
         """
         Initialize the ALPR system.
@@ -78,117 +149,606 @@ class ALPR:
             ocr_config_path: Custom config path for the OCR. If None, the default configuration is
                 used.
             ocr_force_download: Whether to force download the OCR model.
+            num_sessions: Number of ONNX Runtime sessions created for each of the default detector
+                and OCR models. Each thread calling `predict` concurrently gets a free session.
+                When greater than 1, the sessions whose options are not given split the available
+                CPU cores evenly through `intra_op_num_threads`.
+            max_concurrency: Maximum number of inferences run at the same time by `apredict` and
+                `apredict_many`. Further calls wait (without blocking the event loop) until one
+                finishes. Defaults to `num_sessions`.
+            rois: Default regions of interest, as RegionOfInterest objects or `(x1, y1, x2, y2)`
+                rectangles in full-frame pixel coordinates. Plates are only looked for inside them.
+                If None, the whole frame is used. Can be overridden on each call, i.e. for
+                cameras with a different view.
+            tile_size: If given, the detector runs on overlapping tiles of this size (in pixels)
+                plus the whole frame, all in a single batch, and the boxes are merged across tiles.
+                This finds small plates in high resolution frames. See `TiledDetector`.
+            tile_overlap: Minimum overlap between consecutive tiles, as a fraction of `tile_size`.
+            ocr_per_char_confidence: Whether the default OCR returns the confidence of each
+                character (as a list) instead of their mean. Used by `PlateVoter`.
+            ocr_slot_probabilities: Whether the default OCR also returns the raw probabilities of
+                every character slot, in `OcrResult.slot_probabilities`.
+            renderer: The PlateRenderer used by `render` and `draw_predictions`. If None, one with
+                the default style is used.
+            timing_hooks: Callables (i.e. a PipelineMetrics) that receive the seconds spent in each
+                stage of the pipeline after every `predict`, `predict_many` and `track` call. See
+                `fast_alpr.metrics` for the stages. If None, nothing is timed.
+            load_models: When the detector and OCR are built. "eager" builds them right away,
+                "lazy" on first use (i.e. the first `predict`) and "background" in a background
+                thread, so the instance can be created without waiting. Either way, `ready`
+                completes once they are built. A failed build is raised on every later use.
+            session_profile: Tuned ONNX Runtime settings for the default detector and OCR, as a
+                SessionProfile or the name of one ("latency", "throughput" or "low-memory"). See
+                `fast_alpr.session.SESSION_PROFILES`. Explicit `detector_sess_options` and
+                `ocr_sess_options` take precedence over it.
+            graph_cache_dir: Directory where the graphs optimized by ONNX Runtime for the default
+                detector and OCR are cached, so later starts (i.e. other `ALPRPool` workers or
+                restarted processes) skip graph optimizations. If None, nothing is cached.
+            frame_hooks: Callables that receive the FrameContext and the results of every frame
+                processed by `predict`, `predict_many` and `track`, i.e. to draw a preview from
+                the views the pipeline already computed.
         """
-        # Initialize the detector
-        self.detector = detector or DefaultDetector(
-            model_name=detector_model,
-            conf_thresh=detector_conf_thresh,
-            providers=detector_providers,
-            sess_options=detector_sess_options,
+        if load_models not in ("eager", "lazy", "background"):
+            raise ValueError(
+                f"Unknown load_models '{load_models}'. Use one of ('eager', 'lazy', 'background')"
+            )
+
+        if session_profile is not None:
+            profile = get_session_profile(session_profile)
+            detector_sess_options = detector_sess_options or profile.session_options(num_sessions)
+            ocr_sess_options = ocr_sess_options or profile.session_options(num_sessions)
+
+        def build_detector() -> BaseDetector:
+            plate_detector = detector or DefaultDetector(
+                model_name=detector_model,
+                conf_thresh=detector_conf_thresh,
+                providers=detector_providers,
+                sess_options=detector_sess_options,
+                num_sessions=num_sessions,
+                graph_cache_dir=graph_cache_dir,
+            )
+            if tile_size is not None:
+                plate_detector = TiledDetector(
+                    plate_detector, tile_size=tile_size, overlap=tile_overlap
+                )
+            return plate_detector
+
+        def build_ocr() -> BaseOCR:
+            return ocr or DefaultOCR(
+                hub_ocr_model=ocr_model,
+                device=ocr_device,
+                providers=ocr_providers,
+                sess_options=ocr_sess_options,
+                model_path=ocr_model_path,
+                config_path=ocr_config_path,
+                force_download=ocr_force_download,
+                num_sessions=num_sessions,
+                per_char_confidence=ocr_per_char_confidence,
+                slot_probabilities=ocr_slot_probabilities,
+                graph_cache_dir=graph_cache_dir,
+            )
+
+        self._build_detector = build_detector
+        self._build_ocr = build_ocr
+        self._models: tuple[BaseDetector, BaseOCR] | None = None
+        self._models_lock = threading.Lock()
+        self.ready: Future[ALPR] = Future()
+        """Completes with this instance once the detector and OCR are built (see `load_models`)."""
+        if load_models == "eager":
+            self._load_models()
+        elif load_models == "background":
+            threading.Thread(
+                target=self._load_models,
+                kwargs={"raise_error": False},
+                daemon=True,
+                name="fast-alpr-loader",
+            ).start()
+
+        self.renderer = renderer or PlateRenderer()
+        self.rois: list[RegionOfInterest] = [to_roi(roi) for roi in rois or []]
+        self.timing_hooks: list[Callable[[dict[str, float]], None]] = list(timing_hooks or [])
+        self.frame_hooks: list[Callable[[FrameContext, list[ALPRResult]], None]] = list(
+            frame_hooks or []
         )
+        self.max_concurrency = max_concurrency or num_sessions
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        # asyncio primitives are bound to a single event loop
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def detector(self) -> BaseDetector:
+        """
+        The plate detector, which is built first if it wasn't yet (see `load_models`).
+        """
+        return self._get_models()[0]
 
-        # Initialize the OCR
-        self.ocr = ocr or DefaultOCR(
-            hub_ocr_model=ocr_model,
-            device=ocr_device,
-            providers=ocr_providers,
-            sess_options=ocr_sess_options,
-            model_path=ocr_model_path,
-            config_path=ocr_config_path,
-            force_download=ocr_force_download,
+    @detector.setter
+    def detector(self, detector: BaseDetector) -> None:
+        with self._models_lock:
+            ocr = self._models[1] if self._models is not None else self._build_ocr()
+            self._set_models((detector, ocr))
+
+    @property
+    def ocr(self) -> BaseOCR:
+        """
+        The plate OCR, which is built first if it wasn't yet (see `load_models`).
+        """
+        return self._get_models()[1]
+
+    @ocr.setter
+    def ocr(self, ocr: BaseOCR) -> None:
+        with self._models_lock:
+            detector = self._models[0] if self._models is not None else self._build_detector()
+            self._set_models((detector, ocr))
+
+    def _set_models(self, models: tuple[BaseDetector, BaseOCR]) -> None:
+        # Called with the models lock held, once both models are available
+        self._models = models
+        if self.ready.done() and self.ready.exception() is not None:
+            # A failed build is replaced by the models that were set
+            self.ready = Future()
+        if not self.ready.done():
+            self.ready.set_result(self)
+
+    def _get_models(self) -> tuple[BaseDetector, BaseOCR]:
+        models = self._models
+        if models is None:
+            models = self._load_models()
+        return models
+
+    def _load_models(self, raise_error: bool = True) -> tuple[BaseDetector, BaseOCR]:
+        # Only one thread builds the models, the others wait for it
+        with self._models_lock:
+            if not self.ready.done():
+                try:
+                    self._models = (self._build_detector(), self._build_ocr())
+                except Exception as e:  # pylint: disable=broad-except
+                    self.ready.set_exception(e)
+                else:
+                    self.ready.set_result(self)
+        if raise_error:
+            # Raises the error of a failed build
+            self.ready.result()
+        return cast(tuple[BaseDetector, BaseOCR], self._models)
+
+    def warmup(
+        self,
+        batch_sizes: Sequence[int] = (1,),
+        plates_per_frame: int = 1,
+        frame_shape: tuple[int, int] = (720, 1280),
+    ) -> dict[str, float]:
+        """
+        Run blank inputs through the detector and OCR for the shapes they will see, so the first
+        real frames are not slowed down by ONNX Runtime allocating memory and selecting kernels.
+
+        The models are built first if they weren't yet (see `load_models`), which is not included
+        in the reported times.
+
+        Parameters:
+            batch_sizes: Numbers of frames passed at once, i.e. 1 for `predict` and `track`, and
+                the batch sizes used with `predict_many`.
+            plates_per_frame: Maximum number of plates expected in a frame. The OCR is warmed up
+                for every number of plates from 1 up to this many in each batch of frames.
+            frame_shape: Height and width of the frames.
+
+        Returns:
+            Seconds spent warming up the `detector`, the `ocr`, and in `total`.
+        """
+        detector, ocr = self._get_models()
+        # Each ROI of a frame is a separate input of the detector batch
+        detector_batch_sizes = [batch_size * max(1, len(self.rois)) for batch_size in batch_sizes]
+        ocr_batch_sizes = sorted(
+            {
+                num_plates
+                for batch_size in batch_sizes
+                for num_plates in range(1, batch_size * plates_per_frame + 1)
+            }
         )
+        start = time.perf_counter()
+        detector.warmup(detector_batch_sizes, frame_shape)
+        detector_end = time.perf_counter()
+        ocr.warmup(ocr_batch_sizes)
+        end = time.perf_counter()
+        return {
+            "detector": detector_end - start,
+            "ocr": end - detector_end,
+            "total": end - start,
+        }
 
-    def predict(self, frame: np.ndarray | str) -> list[ALPRResult]:
+    def predict(
+        self, frame: np.ndarray | str | FrameContext, rois: Sequence[RoiLike] | None = None
+    ) -> list[ALPRResult]:
         """
         Returns all recognized license plates from a frame.
 
         Parameters:
-            frame: Unprocessed frame (Colors in order: BGR) or image path.
+            frame: Unprocessed frame (Colors in order: BGR), image path or FrameContext. Views of a
+                FrameContext (i.e. the detector's letterboxed frame) are reused if it already has
+                them, and kept in it for later stages and calls.
+            rois: Regions of interest of the frame. If None, the instance `rois` are used. Pass an
+                empty list to use the whole frame.
 
         Returns:
             A list of ALPRResult objects containing detection and OCR results.
         """
-        if isinstance(frame, str):
-            img_path = frame
-            img = cv2.imread(img_path)
-            if img is None:
-                raise ValueError(f"Failed to load image from path: {img_path}")
-        else:
-            img = frame
-
-        plate_detections = self.detector.predict(img)
-        alpr_results: list[ALPRResult] = []
-        for detection in plate_detections:
-            bbox = detection.bounding_box
-            x1, y1 = max(bbox.x1, 0), max(bbox.y1, 0)
-            x2, y2 = min(bbox.x2, img.shape[1]), min(bbox.y2, img.shape[0])
-            cropped_plate = img[y1:y2, x1:x2]
-            ocr_result = self.ocr.predict(cropped_plate)
-            alpr_result = ALPRResult(detection=detection, ocr=ocr_result)
-            alpr_results.append(alpr_result)
-        return alpr_results
-
-    def draw_predictions(self, frame: np.ndarray | str) -> np.ndarray:
+        return self.predict_many([frame], rois=None if rois is None else [rois])[0]
+
+    def predict_many(
+        self,
+        frames: Sequence[np.ndarray | str | FrameContext],
+        rois: Sequence[Sequence[RoiLike] | None] | None = None,
+    ) -> list[list[ALPRResult]]:
+        """
+        Returns all recognized license plates from multiple frames.
+
+        All the frames are passed to the detector as a single batch, and then all the plates found
+        across every frame are recognized with a single OCR batch. This is considerably faster than
+        calling `predict` once per frame, i.e. when processing one frame from each of several
+        cameras.
+
+        Parameters:
+            frames: Unprocessed frames (Colors in order: BGR), image paths or FrameContexts.
+            rois: Regions of interest of each frame, in the same order as `frames`. A None entry
+                (or a None list) uses the instance `rois`, and an empty list uses the whole frame.
+
+        Returns:
+            A list with the ALPRResult objects of each frame, in the same order as the input.
+        """
+        return self._timed(self._predict_many, frames, rois)
+
+    def _predict_many(
+        self,
+        frames: Sequence[np.ndarray | str | FrameContext],
+        rois: Sequence[Sequence[RoiLike] | None] | None,
+    ) -> list[list[ALPRResult]]:
+        with stage("decode"):
+            contexts = [self._to_context(frame) for frame in frames]
+        images = [context.image for context in contexts]
+        if rois is None:
+            rois = [None] * len(images)
+        elif len(rois) != len(images):
+            raise ValueError(f"Got {len(rois)} ROI lists for {len(images)} frames")
+        frames_rois = [
+            self.rois if frame_rois is None else [to_roi(roi) for roi in frame_rois]
+            for frame_rois in rois
+        ]
+        with stage("detect"), use_contexts(contexts):
+            frames_detections = self._detect(images, frames_rois)
+
+        with stage("crop"):
+            cropped_plates = [
+                self._crop(img, detection)
+                for img, plate_detections in zip(images, frames_detections, strict=True)
+                for detection in plate_detections
+            ]
+        # All the plates found in all the frames are recognized with a single OCR call
+        with stage("ocr"):
+            ocr_results = iter(self.ocr.predict_batch(cropped_plates))
+        frames_results = [
+            [
+                ALPRResult(detection=detection, ocr=next(ocr_results))
+                for detection in plate_detections
+            ]
+            for plate_detections in frames_detections
+        ]
+        for context, results in zip(contexts, frames_results, strict=True):
+            self._run_frame_hooks(context, results)
+        return frames_results
+
+    def track(
+        self,
+        frame: np.ndarray | str | FrameContext,
+        tracker: PlateTracker,
+        rois: Sequence[RoiLike] | None = None,
+    ) -> list[ALPRResult]:
+        """
+        Returns all recognized license plates from a video frame, following them across frames.
+
+        Each detection is assigned a stable track ID. OCR only runs (as a single batch) on new
+        tracks, or when a track's crop got noticeably larger or sharper than the one OCR last ran
+        on. The other plates reuse the most confident read of their track so far, which removes most
+        OCR calls on video.
+
+        Parameters:
+            frame: Unprocessed frame (Colors in order: BGR), image path or FrameContext.
+            tracker: The PlateTracker of the source the frame comes from.
+            rois: Regions of interest of the frame. If None, the instance `rois` are used.
+
+        Returns:
+            A list of ALPRResult objects with the track ID and the best OCR result of each plate.
+        """
+        return self._timed(self._track, frame, tracker, rois)
+
+    def _track(
+        self,
+        frame: np.ndarray | str | FrameContext,
+        tracker: PlateTracker,
+        rois: Sequence[RoiLike] | None,
+    ) -> list[ALPRResult]:
+        with stage("decode"):
+            context = self._to_context(frame)
+        img = context.image
+        frame_rois = self.rois if rois is None else [to_roi(roi) for roi in rois]
+        with stage("detect"), use_contexts([context]):
+            detections = self._detect([img], [frame_rois])[0]
+
+        pending: list[tuple[Track, CropQuality]] = []
+        cropped_plates: list[np.ndarray] = []
+        with stage("track"):
+            tracks = tracker.update(detections)
+            for detection, track in zip(detections, tracks, strict=True):
+                cropped_plate = self._crop(img, detection)
+                quality = CropQuality.measure(cropped_plate)
+                if tracker.needs_ocr(track, quality):
+                    pending.append((track, quality))
+                    cropped_plates.append(cropped_plate)
+        with stage("ocr"):
+            ocr_results = self.ocr.predict_batch(cropped_plates)
+        for (track, quality), ocr_result in zip(pending, ocr_results, strict=True):
+            tracker.record_ocr(track, ocr_result, quality)
+
+        results = [
+            ALPRResult(
+                detection=detection,
+                ocr=track.ocr,
+                track_id=track.track_id,
+                finalized=track.finalized,
+            )
+            for detection, track in zip(detections, tracks, strict=True)
+        ]
+        self._run_frame_hooks(context, results)
+        return results
+
+    @staticmethod
+    def _to_context(frame: np.ndarray | str | FrameContext) -> FrameContext:
+        return frame if isinstance(frame, FrameContext) else FrameContext(load_image(frame))
+
+    def _run_frame_hooks(self, context: FrameContext, results: list[ALPRResult]) -> None:
+        for hook in self.frame_hooks:
+            hook(context, results)
+
+    def _timed(self, func: Callable[..., _R], *args: object) -> _R:
+        if not self.timing_hooks:
+            return func(*args)
+        with record_timings() as timings:
+            result = func(*args)
+        for hook in self.timing_hooks:
+            hook(timings)
+        return result
+
+    @staticmethod
+    def _crop(img: np.ndarray, detection: DetectionResult) -> np.ndarray:
+        bbox = detection.bounding_box
+        x1, y1 = max(bbox.x1, 0), max(bbox.y1, 0)
+        x2, y2 = min(bbox.x2, img.shape[1]), min(bbox.y2, img.shape[0])
+        return img[y1:y2, x1:x2]
+
+    def _detect(
+        self, images: list[np.ndarray], frames_rois: list[list[RegionOfInterest]]
+    ) -> list[list[DetectionResult]]:
+        # Frames without ROIs are detected whole, the others are replaced by their ROI crops. All
+        # of them go to the detector as a single batch.
+        inputs: list[np.ndarray] = []
+        owners: list[tuple[int, RegionOfInterest | None, int, int]] = []
+        for idx, (img, frame_rois) in enumerate(zip(images, frames_rois, strict=True)):
+            if not frame_rois:
+                inputs.append(img)
+                owners.append((idx, None, 0, 0))
+                continue
+            for roi in frame_rois:
+                x1, y1, x2, y2 = roi.clip(img.shape[1], img.shape[0])
+                if x2 > x1 and y2 > y1:
+                    inputs.append(img[y1:y2, x1:x2])
+                    owners.append((idx, roi, x1, y1))
+
+        frames_detections: list[list[DetectionResult]] = [[] for _ in images]
+        for (idx, region, dx, dy), detections in zip(
+            owners, self.detector.predict_batch(inputs), strict=True
+        ):
+            if region is None:
+                frames_detections[idx] = detections
+                continue
+            for detection in detections:
+                # Map the box back to full-frame coordinates
+                mapped = DetectionResult(
+                    label=detection.label,
+                    confidence=detection.confidence,
+                    bounding_box=detection.bounding_box.translate(dx, dy),
+                )
+                if region.contains(*mapped.bounding_box.center):
+                    frames_detections[idx].append(mapped)
+        # Plates inside overlapping ROIs are found more than once
+        for idx, frame_rois in enumerate(frames_rois):
+            if len(frame_rois) > 1:
+                frames_detections[idx] = non_max_suppression(frames_detections[idx])
+        return frames_detections
+
+    def stream(
+        self,
+        source: str | int,
+        frame_stride: int = 1,
+        drop_frames: bool | None = None,
+        reconnect: bool | None = None,
+        max_backoff: float = 30.0,
+        motion_gate: MotionGate | None = None,
+        yield_skipped: bool = False,
+        rois: Sequence[RoiLike] | None = None,
+        tracker: PlateTracker | None = None,
+        decoder: VideoDecoder | None = None,
+    ) -> Iterator[StreamFrame]:
+        """
+        Recognize license plates from a video source, yielding the results of each processed frame.
+
+        Frames are decoded in a background thread. For live sources (camera indexes and stream
+        URLs such as RTSP) only the latest decoded frame is kept, so inference always runs on the
+        most recent frame and latency doesn't build up when inference is slower than the source.
+        Live sources are re-opened with exponential backoff if the connection fails. Video files are
+        processed frame by frame until they end.
+
+        Parameters:
+            source: Camera index, stream URL or video file path.
+            frame_stride: Only every `frame_stride`-th decoded frame is considered for inference.
+            drop_frames: Whether to keep only the latest frame. Defaults to True for live sources
+                and False for video files.
+            reconnect: Whether to re-open the source when it fails or ends. Defaults to True for
+                live sources and False for video files.
+            max_backoff: Maximum seconds to wait between reconnection attempts.
+            motion_gate: Optional MotionGate used to skip inference on frames without motion. Use a
+                separate gate for each source.
+            yield_skipped: Whether frames skipped by `motion_gate` are also yielded (with no
+                results and `inferred` set to False), i.e. to keep showing a live preview.
+            rois: Regions of interest of the source. If None, the instance `rois` are used.
+            tracker: Optional PlateTracker. If given, frames are processed with `track`, so results
+                carry track IDs and OCR is skipped for plates already read. Use a separate tracker
+                for each source.
+            decoder: Decodes the source, i.e. a PyAVDecoder with several decoding threads. If
+                None, an OpenCVDecoder is used. See `fast_alpr.decoders`.
+
+        Returns:
+            An iterator of StreamFrame objects. The background thread is stopped when the iterator
+            is exhausted or closed. If the source failed (i.e. a corrupted file, but not a lost
+            connection that is re-opened), the error is raised once the frames already decoded are
+            consumed.
+        """
+        reader = FrameReader(
+            source,
+            frame_stride=frame_stride,
+            drop_frames=drop_frames,
+            reconnect=reconnect,
+            max_backoff=max_backoff,
+            decoder=decoder,
+        ).start()
+        try:
+            while (item := reader.read()) is not None:
+                frame_index, timestamp, frame = item
+                # Shared by the motion gate, the detector and the consumer of the stream
+                context = FrameContext(frame)
+                if motion_gate is not None and not motion_gate.should_process(context, timestamp):
+                    if yield_skipped:
+                        yield StreamFrame(
+                            frame_index=frame_index,
+                            timestamp=timestamp,
+                            results=[],
+                            frame=frame,
+                            inferred=False,
+                            context=context,
+                        )
+                    continue
+                yield StreamFrame(
+                    frame_index=frame_index,
+                    timestamp=timestamp,
+                    results=(
+                        self.predict(context, rois=rois)
+                        if tracker is None
+                        else self.track(context, tracker, rois=rois)
+                    ),
+                    frame=frame,
+                    context=context,
+                )
+            if reader.error is not None:
+                raise reader.error
+        finally:
+            reader.stop()
+
+    async def apredict(self, frame: np.ndarray | str | FrameContext) -> list[ALPRResult]:
+        """
+        Asynchronous version of `predict`.
+
+        Inference runs on a thread pool managed by this instance, so the event loop is never
+        blocked. At most `max_concurrency` inferences run at once and further calls wait for a free
+        slot, which applies backpressure instead of growing an unbounded queue of pending frames.
+
+        Parameters:
+            frame: Unprocessed frame (Colors in order: BGR), image path or FrameContext.
+
+        Returns:
+            A list of ALPRResult objects containing detection and OCR results.
+        """
+        return await self._run_in_executor(self.predict, frame)
+
+    async def apredict_many(
+        self, frames: Sequence[np.ndarray | str | FrameContext], batch_size: int = 8
+    ) -> list[list[ALPRResult]]:
+        """
+        Asynchronous version of `predict_many`.
+
+        Frames are split into batches of `batch_size`, which run concurrently (bounded by
+        `max_concurrency`) on the thread pool managed by this instance.
+
+        Parameters:
+            frames: Unprocessed frames (Colors in order: BGR), image paths or FrameContexts.
+            batch_size: Maximum number of frames passed to each `predict_many` call.
+
+        Returns:
+            A list with the ALPRResult objects of each frame, in the same order as the input.
+        """
+        batches = [frames[idx : idx + batch_size] for idx in range(0, len(frames), batch_size)]
+        batches_results = await asyncio.gather(
+            *(self._run_in_executor(self.predict_many, batch) for batch in batches)
+        )
+        return [frame_results for batch in batches_results for frame_results in batch]
+
+    async def _run_in_executor(self, func: Callable[[_T], _R], arg: _T) -> _R:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(self._get_executor(), func, arg)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="fast-alpr"
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool used by `apredict` and `apredict_many`, if it was started.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def draw_predictions(self, frame: np.ndarray | str | FrameContext) -> np.ndarray:
         """
         Draws detections and OCR results on the frame.
 
+        This runs `predict` on the frame. If the results are already available (i.e. they are also
+        used for something else), use `render` instead so inference doesn't run twice.
+
         Parameters:
-            frame: The original frame or image path.
+            frame: The original frame, image path or FrameContext.
 
         Returns:
             The frame with detections and OCR results drawn.
         """
         # If frame is a string, assume it's an image path and load it
-        if isinstance(frame, str):
-            img_path = frame
-            img = cv2.imread(img_path)
-            if img is None:
-                raise ValueError(f"Failed to load image from path: {img_path}")
-        else:
-            img = frame
-
-        # Get ALPR results using the ndarray
-        alpr_results = self.predict(img)
-
-        for result in alpr_results:
-            detection = result.detection
-            ocr_result = result.ocr
-            bbox = detection.bounding_box
-            x1, y1, x2, y2 = bbox.x1, bbox.y1, bbox.x2, bbox.y2
-            # Draw the bounding box
-            cv2.rectangle(img, (x1, y1), (x2, y2), (36, 255, 12), 2)
-            if ocr_result is None or not ocr_result.text or not ocr_result.confidence:
-                continue
-            # Remove padding symbols if any
-            plate_text = ocr_result.text
-            confidence: float = (
-                statistics.mean(ocr_result.confidence)
-                if isinstance(ocr_result.confidence, list)
-                else ocr_result.confidence
-            )
-            display_text = f"{plate_text} {confidence * 100:.2f}%"
-            font_scale = 1.25
-            # Draw black background for better readability
-            cv2.putText(
-                img=img,
-                text=display_text,
-                org=(x1, y1 - 10),
-                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-                fontScale=font_scale,
-                color=(0, 0, 0),
-                thickness=6,
-                lineType=cv2.LINE_AA,
-            )
-            # Draw white text
-            cv2.putText(
-                img=img,
-                text=display_text,
-                org=(x1, y1 - 10),
-                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-                fontScale=font_scale,
-                color=(255, 255, 255),
-                thickness=2,
-                lineType=cv2.LINE_AA,
-            )
+        context = self._to_context(frame)
+
+        # Get ALPR results, reusing the views of the context
+        alpr_results = self.predict(context)
+        return self.render(context.image, alpr_results)
 
-        return img
+    def render(
+        self, frame: np.ndarray, results: Sequence[ALPRResult], copy: bool = False
+    ) -> np.ndarray:
+        """
+        Draws existing ALPR results on the frame with the instance `renderer`, without running any
+        inference.
+
+        Parameters:
+            frame: The frame the results come from (Colors in order: BGR).
+            results: The ALPRResult objects of the frame, i.e. as returned by `predict`.
+            copy: If True, the results are drawn on a copy and the frame is left untouched.
+                Otherwise, the frame is drawn in place.
+
+        Returns:
+            The frame with detections and OCR results drawn.
+        """
+        return self.renderer.render(frame, results, copy=copy)
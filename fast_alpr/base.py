@@ -3,7 +3,8 @@ Base module.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 
 import numpy as np
 
@@ -15,6 +16,44 @@ class BoundingBox:
     x2: int
     y2: int
 
+    @property
+    def area(self) -> int:
+        """Returns the area of the bounding box."""
+        return max(self.x2 - self.x1, 0) * max(self.y2 - self.y1, 0)
+
+    @property
+    def center(self) -> tuple[float, float]:
+        """Returns the (x, y) coordinates of the center of the bounding box."""
+        return (self.x1 + self.x2) / 2.0, (self.y1 + self.y2) / 2.0
+
+    def intersection_area(self, other: "BoundingBox") -> int:
+        """Returns the area of the intersection of this bounding box with another one."""
+        return BoundingBox(
+            x1=max(self.x1, other.x1),
+            y1=max(self.y1, other.y1),
+            x2=min(self.x2, other.x2),
+            y2=min(self.y2, other.y2),
+        ).area
+
+    def iou(self, other: "BoundingBox") -> float:
+        """Returns the Intersection-over-Union (IoU) of this bounding box and another one."""
+        inter_area = self.intersection_area(other)
+        union_area = self.area + other.area - inter_area
+        return inter_area / union_area if union_area > 0 else 0.0
+
+    def union(self, other: "BoundingBox") -> "BoundingBox":
+        """Returns the smallest bounding box enclosing this bounding box and another one."""
+        return BoundingBox(
+            x1=min(self.x1, other.x1),
+            y1=min(self.y1, other.y1),
+            x2=max(self.x2, other.x2),
+            y2=max(self.y2, other.y2),
+        )
+
+    def translate(self, dx: int, dy: int) -> "BoundingBox":
+        """Returns a new bounding box shifted by (dx, dy)."""
+        return BoundingBox(x1=self.x1 + dx, y1=self.y1 + dy, x2=self.x2 + dx, y2=self.y2 + dy)
+
 
 @dataclass(frozen=True)
 class DetectionResult:
@@ -27,6 +66,9 @@ class DetectionResult:
 class OcrResult:
     text: str
     confidence: float | list[float]
+    slot_probabilities: np.ndarray | None = field(default=None, compare=False, repr=False)
+    """Raw probabilities of each character slot of the model, with shape (slots, alphabet size),
+    when the OCR was asked for them. Padding slots are included."""
 
 
 class BaseDetector(ABC):
@@ -34,9 +76,39 @@ class BaseDetector(ABC):
     def predict(self, frame: np.ndarray) -> list[DetectionResult]:
         """Perform detection on the input frame and return a list of detections."""
 
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        """Perform detection on multiple frames, returning the list of detections of each frame in
+        the same order. By default, this calls `predict` once per frame. Subclasses backed by models
+        that accept batched inputs should override it to run all the frames in a single call."""
+        return [self.predict(frame) for frame in frames]
+
+    def warmup(self, batch_sizes: Sequence[int], frame_shape: tuple[int, int]) -> None:
+        """Run blank frames of `frame_shape` (height, width) through the detector once for each of
+        the batch sizes, so the first real frames don't pay for memory allocation and kernel
+        selection. By default, this calls `predict_batch`. Subclasses with several sessions should
+        override it to warm up every one of them."""
+        frame = np.zeros((*frame_shape, 3), dtype=np.uint8)
+        for batch_size in batch_sizes:
+            self.predict_batch([frame] * batch_size)
+
 
 class BaseOCR(ABC):
     @abstractmethod
     def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
         """Perform OCR on the cropped plate image and return the recognized text and character
         probabilities."""
+
+    def predict_batch(self, cropped_plates: list[np.ndarray]) -> list[OcrResult | None]:
+        """Perform OCR on multiple cropped plate images, returning one result per plate in the same
+        order. By default, this calls `predict` once per plate. Subclasses backed by models that
+        accept batched inputs should override it to run all the plates in a single call."""
+        return [self.predict(cropped_plate) for cropped_plate in cropped_plates]
+
+    def warmup(self, batch_sizes: Sequence[int]) -> None:
+        """Run blank plates through the OCR once for each of the batch sizes, so the first real
+        plates don't pay for memory allocation and kernel selection. By default, this calls
+        `predict_batch`. Subclasses with several sessions should override it to warm up every one
+        of them."""
+        cropped_plate = np.zeros((64, 128, 3), dtype=np.uint8)
+        for batch_size in batch_sizes:
+            self.predict_batch([cropped_plate] * batch_size)
@@ -0,0 +1,482 @@
+"""
+Benchmark module.
+
+Measures the latency and throughput of the default detector, the default OCR and the full ALPR
+pipeline across models, batch sizes, thread counts and session profiles, and reports them as JSON:
+
+```shell
+python -m fast_alpr.benchmark --target alpr --batch-size 1 4 --threads 1 2 --output results.json
+```
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Literal, get_args
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+from fast_plate_ocr.inference.hub import OcrModel
+from open_image_models.detection.core.hub import PlateDetectorModel
+
+from fast_alpr.alpr import ALPR
+from fast_alpr.default_detector import DefaultDetector
+from fast_alpr.default_ocr import DefaultOCR
+from fast_alpr.metrics import record_timings
+from fast_alpr.session import SESSION_PROFILES, SessionProfileName, get_session_profile
+from fast_alpr.utils import load_image
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+# pylint: disable=too-many-arguments, too-many-locals
+# ruff: noqa: PLR0913
+
+Target = Literal["detector", "ocr", "alpr"]
+
+DETECTOR_MODELS: tuple[PlateDetectorModel, ...] = ("yolo-v9-t-384-license-plate-end2end",)
+"""Detector models benchmarked by default."""
+
+OCR_MODELS: tuple[OcrModel, ...] = (
+    "cct-xs-v1-global-model",
+    "cct-s-v1-global-model",
+    "global-plates-mobile-vit-v2-model",
+    "european-plates-mobile-vit-v2-model",
+)
+"""OCR models benchmarked by default, the same ones the test suite runs."""
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:  # pylint: disable=too-many-instance-attributes
+    """
+    Dataclass to hold the measurements of a single benchmark configuration.
+    """
+
+    target: Target
+    """What was measured: the detector, the OCR or the full ALPR pipeline."""
+    detector_model: str | None
+    ocr_model: str | None
+    batch_size: int
+    """Frames (or plates, for the OCR) passed to each call."""
+    threads: int
+    """Number of threads calling the model concurrently."""
+    plates_per_frame: int
+    iterations: int
+    """Timed calls made by each thread."""
+    latency_ms: dict[str, float]
+    """Latency of each call, in milliseconds: p50, p95, p99, mean, min and max."""
+    fps: float
+    """Frames (or plates, for the OCR) processed per second, across all the threads."""
+    peak_rss_mb: float | None
+    """Peak resident memory of the process so far, in MiB. None where it can't be measured."""
+    profile: str | None = None
+    """Session profile of the models. None for the default session options."""
+    stage_ms: dict[str, float] = field(default_factory=dict)
+    """Mean time spent in each stage of a call, in milliseconds (see `fast_alpr.metrics`)."""
+    extra: dict[str, Any] = field(default_factory=dict)
+    """Additional measurements of the configuration."""
+
+
+def latency_summary(latencies: Sequence[float]) -> dict[str, float]:
+    """
+    Summarize call latencies (in seconds) as percentiles in milliseconds.
+
+    Parameters:
+        latencies: Latency of each call, in seconds.
+
+    Returns:
+        A dictionary with the p50, p95, p99, mean, min and max latencies, in milliseconds.
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def stage_summary(timings: Sequence[dict[str, float]]) -> dict[str, float]:
+    """
+    Average the stage timings of several calls, in milliseconds.
+
+    Parameters:
+        timings: Seconds spent in each stage, for every call.
+
+    Returns:
+        The mean milliseconds spent in each stage per call. Stages a call didn't go through count
+        as zero for that call.
+    """
+    totals: dict[str, float] = {}
+    for call_timings in timings:
+        for name, seconds in call_timings.items():
+            totals[name] = totals.get(name, 0.0) + seconds
+    return {name: 1000 * total / len(timings) for name, total in totals.items()}
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Peak resident set size of the current process, in MiB, or None if it can't be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def synthetic_plate(rng: np.random.Generator, width: int = 160, height: int = 40) -> np.ndarray:
+    """
+    Create a plate-like image: dark characters on a light background (Colors in order: BGR).
+    """
+    plate = np.full((height, width, 3), int(rng.integers(180, 255)), dtype=np.uint8)
+    text = "".join(rng.choice(list("ABCDEFGHJKLMNPRSTUVWXYZ0123456789"), size=7))
+    cv2.putText(
+        plate, text, (6, int(height * 0.75)), cv2.FONT_HERSHEY_SIMPLEX, height / 36, (20, 20, 20), 2
+    )
+    return plate
+
+
+def synthetic_frame(
+    rng: np.random.Generator,
+    width: int = 1280,
+    height: int = 720,
+    plates_per_frame: int = 1,
+    plate_size: tuple[int, int] = (40, 160),
+) -> np.ndarray:
+    """
+    Create a noisy frame with `plates_per_frame` synthetic plates pasted on it. The plates are not
+    guaranteed to be found by the detector, so use real frames to benchmark the OCR stage of the
+    full pipeline. `plate_size` is the (height, width) of the plates.
+    """
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for _ in range(plates_per_frame):
+        plate = synthetic_plate(rng, width=plate_size[1], height=plate_size[0])
+        plate = plate[: min(plate.shape[0], height), : min(plate.shape[1], width)]
+        x = int(rng.integers(0, width - plate.shape[1] + 1))
+        y = int(rng.integers(0, height - plate.shape[0] + 1))
+        frame[y : y + plate.shape[0], x : x + plate.shape[1]] = plate
+    return frame
+
+
+def measure(
+    func: Callable[[], object], iterations: int, warmup: int = 5, threads: int = 1
+) -> tuple[list[float], float]:
+    """
+    Time a function called repeatedly from one or more threads.
+
+    Parameters:
+        func: The function to time.
+        iterations: Number of timed calls made by each thread.
+        warmup: Number of untimed calls made before timing starts.
+        threads: Number of threads calling the function concurrently.
+
+    Returns:
+        The latency of every timed call (in seconds) and the total wall time (in seconds).
+    """
+    for _ in range(warmup):
+        func()
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        thread_latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            thread_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(thread_latencies)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(worker) for _ in range(threads)]:
+            future.result()
+    return latencies, time.perf_counter() - start
+
+
+def _batches(items: Sequence[np.ndarray], batch_size: int) -> list[np.ndarray]:
+    # Repeat the inputs as needed to fill a batch
+    return [items[idx % len(items)] for idx in range(batch_size)]
+
+
+def run_benchmarks(
+    targets: Sequence[Target] = ("detector", "ocr", "alpr"),
+    detector_models: Sequence[PlateDetectorModel] = DETECTOR_MODELS,
+    ocr_models: Sequence[OcrModel] = OCR_MODELS,
+    images: Sequence[str] = (),
+    width: int = 1280,
+    height: int = 720,
+    plates_per_frame: int = 1,
+    batch_sizes: Sequence[int] = (1,),
+    threads: Sequence[int] = (1,),
+    iterations: int = 50,
+    warmup: int = 5,
+    seed: int = 0,
+    profiles: Sequence[SessionProfileName | None] = (None,),
+    plate_size: tuple[int, int] = (40, 160),
+) -> list[BenchmarkResult]:
+    """
+    Benchmark the default detector, the default OCR and/or the full ALPR pipeline.
+
+    Parameters:
+        targets: What to measure.
+        detector_models: Detector models to benchmark.
+        ocr_models: OCR models to benchmark.
+        images: Paths of real frames. If empty, synthetic frames are used.
+        width: Width of the synthetic frames.
+        height: Height of the synthetic frames.
+        plates_per_frame: Number of plates per frame. The OCR stage is passed
+            `batch_size * plates_per_frame` plates per call.
+        batch_sizes: Number of frames passed to each call.
+        threads: Number of threads calling the models concurrently. Each configuration creates
+            that many sessions.
+        iterations: Number of timed calls made by each thread.
+        warmup: Number of untimed calls made before timing starts.
+        seed: Seed of the synthetic frames and plates.
+        profiles: Session profiles to compare (see `fast_alpr.session.SESSION_PROFILES`). None
+            uses the default session options.
+        plate_size: Height and width of the synthetic plates, i.e. the size of the crops passed to
+            the OCR. Plates from high resolution cameras are much larger than the OCR input, which
+            makes its preprocessing more expensive.
+
+    Returns:
+        The BenchmarkResult of every configuration.
+    """
+    rng = np.random.default_rng(seed)
+    frames = (
+        [load_image(image) for image in images]
+        if images
+        else [synthetic_frame(rng, width, height, plates_per_frame, plate_size) for _ in range(4)]
+    )
+    plates = [synthetic_plate(rng, width=plate_size[1], height=plate_size[0]) for _ in range(8)]
+    results: list[BenchmarkResult] = []
+
+    def record(
+        target: Target,
+        detector_model: str | None,
+        ocr_model: str | None,
+        func: Callable[[], object],
+        batch_size: int,
+        num_threads: int,
+        items_per_call: int,
+        profile: str | None,
+    ) -> None:
+        calls: list[dict[str, float]] = []
+
+        def timed() -> None:
+            with record_timings() as timings:
+                func()
+            calls.append(timings)
+
+        latencies, wall_time = measure(timed, iterations, warmup, num_threads)
+        # Warm-up calls are made first, from the calling thread
+        stage_ms = stage_summary(calls[warmup:])
+        extra: dict[str, Any] = {}
+        if target == "ocr" and "ocr_preprocess" in stage_ms:
+            extra["ocr_preprocess_ms_per_plate"] = stage_ms["ocr_preprocess"] / items_per_call
+        results.append(
+            BenchmarkResult(
+                target=target,
+                detector_model=detector_model,
+                ocr_model=ocr_model,
+                batch_size=batch_size,
+                threads=num_threads,
+                plates_per_frame=plates_per_frame,
+                iterations=iterations,
+                latency_ms=latency_summary(latencies),
+                fps=items_per_call * len(latencies) / wall_time,
+                peak_rss_mb=peak_rss_mb(),
+                profile=profile,
+                stage_ms=stage_ms,
+                extra=extra,
+            )
+        )
+
+    for profile, num_threads in itertools.product(profiles, threads):
+        sess_options = (
+            None if profile is None else get_session_profile(profile).session_options(num_threads)
+        )
+        if "detector" in targets:
+            for detector_model in detector_models:
+                detector = DefaultDetector(
+                    model_name=detector_model, sess_options=sess_options, num_sessions=num_threads
+                )
+                for batch_size in batch_sizes:
+                    batch = _batches(frames, batch_size)
+                    record(
+                        "detector",
+                        detector_model,
+                        None,
+                        functools.partial(detector.predict_batch, batch),
+                        batch_size,
+                        num_threads,
+                        batch_size,
+                        profile,
+                    )
+        if "ocr" in targets:
+            for ocr_model in ocr_models:
+                ocr = DefaultOCR(
+                    hub_ocr_model=ocr_model, sess_options=sess_options, num_sessions=num_threads
+                )
+                for batch_size in batch_sizes:
+                    batch = _batches(plates, batch_size * plates_per_frame)
+                    record(
+                        "ocr",
+                        None,
+                        ocr_model,
+                        functools.partial(ocr.predict_batch, batch),
+                        batch_size,
+                        num_threads,
+                        batch_size * plates_per_frame,
+                        profile,
+                    )
+        if "alpr" in targets:
+            for detector_model in detector_models:
+                for ocr_model in ocr_models:
+                    alpr = ALPR(
+                        detector_model=detector_model,
+                        ocr_model=ocr_model,
+                        num_sessions=num_threads,
+                        session_profile=profile,
+                    )
+                    for batch_size in batch_sizes:
+                        batch = _batches(frames, batch_size)
+                        record(
+                            "alpr",
+                            detector_model,
+                            ocr_model,
+                            functools.partial(alpr.predict_many, batch),
+                            batch_size,
+                            num_threads,
+                            batch_size,
+                            profile,
+                        )
+    return results
+
+
+def environment() -> dict[str, Any]:
+    """
+    Describe the machine and library versions the benchmark ran on.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "onnxruntime": ort.__version__,
+        "providers": ort.get_available_providers(),
+        "opencv": cv2.__version__,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser of the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        prog="fast-alpr-benchmark",
+        description="Benchmark the FastALPR detector, OCR and full pipeline.",
+    )
+    parser.add_argument(
+        "--target",
+        nargs="+",
+        choices=["detector", "ocr", "alpr"],
+        default=["detector", "ocr", "alpr"],
+        help="What to benchmark.",
+    )
+    parser.add_argument(
+        "--detector-model",
+        nargs="+",
+        choices=get_args(PlateDetectorModel),
+        default=list(DETECTOR_MODELS),
+        metavar="MODEL",
+        help="Detector models to benchmark.",
+    )
+    parser.add_argument(
+        "--ocr-model",
+        nargs="+",
+        choices=get_args(OcrModel),
+        default=list(OCR_MODELS),
+        metavar="MODEL",
+        help="OCR models to benchmark.",
+    )
+    parser.add_argument(
+        "--image", nargs="+", default=[], help="Real frames to use instead of synthetic ones."
+    )
+    parser.add_argument("--width", type=int, default=1280, help="Width of synthetic frames.")
+    parser.add_argument("--height", type=int, default=720, help="Height of synthetic frames.")
+    parser.add_argument("--plates-per-frame", type=int, default=1)
+    parser.add_argument(
+        "--plate-size",
+        nargs=2,
+        type=int,
+        default=[40, 160],
+        metavar=("HEIGHT", "WIDTH"),
+        help="Size of synthetic plates.",
+    )
+    parser.add_argument("--batch-size", nargs="+", type=int, default=[1])
+    parser.add_argument("--threads", nargs="+", type=int, default=[1])
+    parser.add_argument(
+        "--profile",
+        nargs="+",
+        choices=list(SESSION_PROFILES),
+        default=[None],
+        help="Session profiles to compare. Defaults to the default session options.",
+    )
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per thread.")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Entry point of the `fast-alpr-benchmark` command.
+    """
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(
+        targets=args.target,
+        detector_models=args.detector_model,
+        ocr_models=args.ocr_model,
+        images=args.image,
+        width=args.width,
+        height=args.height,
+        plates_per_frame=args.plates_per_frame,
+        batch_sizes=args.batch_size,
+        threads=args.threads,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+        profiles=args.profile,
+        plate_size=tuple(args.plate_size),
+    )
+    report = json.dumps(
+        {"environment": environment(), "results": [asdict(result) for result in results]},
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Video decoders module.
+
+Decoders open a video source for `FrameReader` (and so `ALPR.stream`). `OpenCVDecoder` uses
+`cv2.VideoCapture` and is the default. `PyAVDecoder` uses FFmpeg through PyAV (`pip install av`),
+with multi-threaded decoding, keyframe-only decoding and downscaling fused with the color
+conversion, which considerably cuts the CPU spent decoding high resolution streams.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from typing import Any, Literal
+
+import cv2
+import numpy as np
+
+
+class OpenedSource(ABC):
+    """
+    A video source opened by a VideoDecoder, decoded one frame at a time.
+    """
+
+    @abstractmethod
+    def read(self) -> np.ndarray | None:
+        """Decode the next frame (Colors in order: BGR). Returns None once the source ended, and
+        raises if decoding failed (i.e. a corrupted file or a lost stream)."""
+
+    def skip(self) -> bool:
+        """Move past the next frame, which isn't handed to the consumer (i.e. because of
+        `frame_stride`). Returns False once the source ended. By default, this calls
+        `read`. Subclasses should override it to skip the color conversion (and resize) of the
+        frame."""
+        return self.read() is not None
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the source."""
+
+
+class VideoDecoder(ABC):
+    """
+    Opens video sources. A decoder only holds settings, so a single instance can open several
+    sources (i.e. from a reader per camera).
+    """
+
+    # pylint: disable-next=unused-argument
+    def check(self, source: str | int) -> None:  # noqa: ARG002
+        """Raise if the decoder can never open this kind of source (i.e. a missing dependency or
+        an unsupported source type). Called by `FrameReader` in the caller's thread, before
+        decoding starts. By default, nothing is checked."""
+        return None
+
+    @abstractmethod
+    def open(self, source: str | int, live: bool) -> OpenedSource:
+        """Open a camera index, stream URL or video file path. `live` tells whether the source is
+        a live stream (see `is_live_source`). Raises OSError if the source can't be opened."""
+
+
+def _scaled_size(width: int, height: int, scale: float) -> tuple[int, int]:
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+class _OpenCVSource(OpenedSource):
+    def __init__(self, capture: cv2.VideoCapture, scale: float, interpolation: int) -> None:
+        self._capture = capture
+        self._scale = scale
+        self._interpolation = interpolation
+
+    def read(self) -> np.ndarray | None:
+        ok, frame = self._capture.read()
+        if not ok or frame is None:
+            return None
+        if self._scale != 1.0:
+            frame = cv2.resize(
+                frame,
+                _scaled_size(frame.shape[1], frame.shape[0], self._scale),
+                interpolation=self._interpolation,
+            )
+        return frame
+
+    def skip(self) -> bool:
+        # Only demuxes and decodes, without converting the frame to BGR
+        return bool(self._capture.grab())
+
+    def close(self) -> None:
+        self._capture.release()
+
+
+class OpenCVDecoder(VideoDecoder):
+    """
+    Decodes with OpenCV's `cv2.VideoCapture`.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int | None = 1,
+        hw_acceleration: bool = False,
+        scale: float = 1.0,
+        interpolation: int = cv2.INTER_AREA,
+        api_preference: int = cv2.CAP_ANY,
+    ) -> None:
+        """
+        Initialize the OpenCVDecoder.
+
+        Parameters:
+            buffer_size: Number of frames buffered by the capture of live sources. A small buffer
+                keeps reads fresh. If None, the backend default is kept. Not all the backends
+                support it.
+            hw_acceleration: Whether to ask the backend for hardware accelerated decoding (i.e.
+                VAAPI, D3D11 or NVDEC, depending on the platform and OpenCV build). Backends fall
+                back to software decoding when none is available.
+            scale: Factor applied to the width and height of the frames, right after decoding. Use
+                i.e. 0.5 for a reader dedicated to motion detection.
+            interpolation: OpenCV interpolation flag used when `scale` isn't 1.
+            api_preference: OpenCV capture backend, i.e. `cv2.CAP_FFMPEG` or `cv2.CAP_GSTREAMER`.
+        """
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.buffer_size = buffer_size
+        self.hw_acceleration = hw_acceleration
+        self.scale = scale
+        self.interpolation = interpolation
+        self.api_preference = api_preference
+
+    def open(self, source: str | int, live: bool) -> OpenedSource:
+        params = (
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+            if self.hw_acceleration
+            else []
+        )
+        capture = cv2.VideoCapture(source, self.api_preference, params)
+        if not capture.isOpened():
+            capture.release()
+            raise OSError(f"Failed to open video source {source}")
+        if live and self.buffer_size is not None:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return _OpenCVSource(capture, self.scale, self.interpolation)
+
+
+class _PyAVSource(OpenedSource):
+    def __init__(self, container: Any, stream: Any, scale: float) -> None:
+        self._container = container
+        self._scale = scale
+        self._frames: Iterator[Any] = container.decode(stream)
+
+    def _next_frame(self) -> Any:
+        # Decoding errors (i.e. corrupted or lost streams) are handled by the reader
+        return next(self._frames, None)
+
+    def read(self) -> np.ndarray | None:
+        frame = self._next_frame()
+        if frame is None:
+            return None
+        if self._scale == 1.0:
+            return frame.to_ndarray(format="bgr24")
+        # Scaled by FFmpeg in the same pass as the color conversion
+        width, height = _scaled_size(frame.width, frame.height, self._scale)
+        return frame.to_ndarray(format="bgr24", width=width, height=height)
+
+    def skip(self) -> bool:
+        return self._next_frame() is not None
+
+    def close(self) -> None:
+        self._container.close()
+
+
+def _import_av() -> Any:
+    try:
+        # Optional dependency, only imported when used
+        # pylint: disable-next=import-outside-toplevel, import-error
+        import av  # type: ignore[import-not-found]  # noqa: PLC0415
+    except ImportError as e:
+        raise ImportError("PyAVDecoder needs PyAV, install it with `pip install av`") from e
+    return av
+
+
+class PyAVDecoder(VideoDecoder):
+    """
+    Decodes with FFmpeg through PyAV, which needs to be installed separately (`pip install av`).
+
+    Camera indexes are not supported, use their device path (i.e. `/dev/video0`) or URL instead.
+    """
+
+    def __init__(
+        self,
+        threads: int = 0,
+        thread_type: Literal["AUTO", "FRAME", "SLICE"] = "AUTO",
+        keyframes_only: bool = False,
+        scale: float = 1.0,
+        options: Mapping[str, str] | None = None,
+        timeout: float | None = 10.0,
+    ) -> None:
+        """
+        Initialize the PyAVDecoder.
+
+        Parameters:
+            threads: Number of decoding threads of each source. 0 lets FFmpeg pick one per core.
+            thread_type: FFmpeg threading model. "FRAME" decodes several frames at once, which
+                gives the most throughput but adds a frame of latency per thread, while "SLICE"
+                splits each frame and adds none. "AUTO" uses both where possible.
+            keyframes_only: Whether to decode only the keyframes (I-frames), skipping the others
+                without decoding them. Much cheaper, at the GOP rate of the camera (typically 1 or
+                2 frames per second), which is enough for motion detection.
+            scale: Factor applied to the width and height of the frames, within the conversion to
+                BGR, so full resolution BGR frames are never produced.
+            options: FFmpeg options of the source, i.e. `{"rtsp_transport": "tcp"}`. Live sources
+                also get `{"fflags": "nobuffer"}` unless overridden.
+            timeout: Seconds to wait when opening or reading the source. None waits forever.
+        """
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        if threads < 0:
+            raise ValueError(f"threads must be at least 0, got {threads}")
+        self.threads = threads
+        self.thread_type = thread_type
+        self.keyframes_only = keyframes_only
+        self.scale = scale
+        self.options = dict(options or {})
+        self.timeout = timeout
+
+    def check(self, source: str | int) -> None:
+        _import_av()
+        if isinstance(source, int):
+            raise ValueError("PyAVDecoder doesn't support camera indexes, use OpenCVDecoder")
+
+    def open(self, source: str | int, live: bool) -> OpenedSource:
+        self.check(source)
+        av = _import_av()
+
+        # Don't buffer packets of live sources to analyze them, which delays every frame
+        options = {"fflags": "nobuffer", **self.options} if live else self.options
+        try:
+            container = av.open(source, options=options, timeout=self.timeout)
+        except av.error.FFmpegError as e:
+            raise OSError(f"Failed to open video source {source}: {e}") from e
+        if not container.streams.video:
+            container.close()
+            raise OSError(f"Video source {source} has no video stream")
+        stream = container.streams.video[0]
+        stream.thread_type = self.thread_type
+        stream.codec_context.thread_count = self.threads
+        if self.keyframes_only:
+            stream.codec_context.skip_frame = "NONKEY"
+        return _PyAVSource(container, stream, self.scale)
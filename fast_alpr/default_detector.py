@@ -2,14 +2,27 @@
 Default Detector module.
 """
 
+import logging
+import os
+import pathlib
 from collections.abc import Sequence
+from contextlib import nullcontext
 
 import numpy as np
 import onnxruntime as ort
 from open_image_models import LicensePlateDetector
-from open_image_models.detection.core.hub import PlateDetectorModel
+from open_image_models.detection.core.base import DetectionResult as OimDetectionResult
+from open_image_models.detection.core.hub import PlateDetectorModel, download_model
+from open_image_models.detection.core.yolo_v9.inference import YoloV9ObjectDetector
+from open_image_models.detection.core.yolo_v9.postprocess import convert_to_detection_result
+from open_image_models.detection.core.yolo_v9.preprocess import preprocess
 
 from fast_alpr.base import BaseDetector, BoundingBox, DetectionResult
+from fast_alpr.frame import active_context
+from fast_alpr.metrics import stage
+from fast_alpr.session import SessionPool, create_with_graph_cache, pooled_session_options
+
+LOGGER = logging.getLogger(__name__)
 
 
 class DefaultDetector(BaseDetector):
@@ -26,6 +39,8 @@ class DefaultDetector(BaseDetector):
         conf_thresh: float = 0.4,
         providers: Sequence[str | tuple[str, dict]] | None = None,
         sess_options: ort.SessionOptions = None,
+        num_sessions: int = 1,
+        graph_cache_dir: str | os.PathLike | None = None,
     ) -> None:
         """
         Initialize the DefaultDetector with the specified parameters. Uses `open-image-models`'s
@@ -39,13 +54,57 @@ class DefaultDetector(BaseDetector):
                 providers are used.
             sess_options: Custom session options for ONNX Runtime. If None, default session options
                 are used.
+            num_sessions: Number of ONNX Runtime sessions to create. Each thread calling `predict`
+                concurrently gets a session of its own. When greater than 1 and `sess_options` is
+                None, the CPU cores are split evenly between the sessions.
+            graph_cache_dir: If given, the graph optimized by ONNX Runtime is stored in this
+                directory and reused by later sessions (in this or other processes), so they skip
+                graph optimizations. See `fast_alpr.session.create_with_graph_cache`.
         """
-        self.detector = LicensePlateDetector(
-            detection_model=model_name,
-            conf_thresh=conf_thresh,
-            providers=providers,
-            sess_options=sess_options,
+        if num_sessions > 1 and sess_options is None:
+            sess_options = pooled_session_options(num_sessions)
+
+        def create_detector(
+            model_path: pathlib.Path, options: ort.SessionOptions
+        ) -> YoloV9ObjectDetector:
+            # Same as `LicensePlateDetector`, but loading the model from the graph cache
+            return YoloV9ObjectDetector(
+                model_path=model_path,
+                class_labels=["License Plate"],
+                conf_thresh=conf_thresh,
+                providers=providers,
+                sess_options=options,
+            )
+
+        self._pool: SessionPool[YoloV9ObjectDetector] = SessionPool(
+            [
+                LicensePlateDetector(
+                    detection_model=model_name,
+                    conf_thresh=conf_thresh,
+                    providers=providers,
+                    sess_options=sess_options,
+                )
+                if graph_cache_dir is None
+                else create_with_graph_cache(
+                    create_detector,
+                    model_path=download_model(model_name),
+                    providers=providers or ort.get_available_providers(),
+                    sess_options=sess_options,
+                    cache_dir=graph_cache_dir,
+                )
+                for _ in range(num_sessions)
+            ]
         )
+        self.detector = self._pool.instances[0]
+
+    @property
+    def supports_batching(self) -> bool:
+        """
+        Whether the underlying ONNX model has a dynamic batch dimension, so several frames can be
+        run through a single session call.
+        """
+        batch_dim = self.detector.model.get_inputs()[0].shape[0]
+        return not isinstance(batch_dim, int)
 
     def predict(self, frame: np.ndarray) -> list[DetectionResult]:
         """
@@ -58,8 +117,96 @@ class DefaultDetector(BaseDetector):
             A list of detection results, each containing the label,
             confidence, and bounding box of a detected license plate.
         """
-        detections = self.detector.predict(frame)
-        detection_results = [
+        return self._run([frame])[0]
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        """
+        Perform detection on multiple frames.
+
+        When the model has a dynamic batch dimension, all the frames are letterboxed and run
+        through a single session call. Otherwise, the model is run once per frame.
+
+        Parameters:
+            frames: The input images/frames in which to detect license plates.
+
+        Returns:
+            A list with the detection results of each frame, in the same order as the input.
+        """
+        if not frames:
+            return []
+        if len(frames) == 1 or not self.supports_batching:
+            return [self._run([frame])[0] for frame in frames]
+        return self._run(frames)
+
+    def warmup(self, batch_sizes: Sequence[int], frame_shape: tuple[int, int]) -> None:
+        """
+        Run blank frames through every session of the pool, once for each of the batch sizes.
+
+        Parameters:
+            batch_sizes: Numbers of frames passed to `predict_batch` at once. Only single frames are
+                run if the model doesn't have a dynamic batch dimension.
+            frame_shape: Height and width of the frames.
+        """
+        frame = np.zeros((*frame_shape, 3), dtype=np.uint8)
+        sizes = sorted(set(batch_sizes)) if self.supports_batching else [1]
+        for detector in self._pool.instances:
+            for batch_size in sizes:
+                self._run([frame] * batch_size, detector)
+
+    def _run(
+        self, frames: list[np.ndarray], detector: YoloV9ObjectDetector | None = None
+    ) -> list[list[DetectionResult]]:
+        # Same steps as `LicensePlateDetector.predict`, but for a whole batch
+        with stage("detect_preprocess"):
+            letterboxed = [self._letterbox(frame) for frame in frames]
+            inputs = (
+                letterboxed[0][0]
+                if len(letterboxed) == 1
+                else np.concatenate([tensor for tensor, _, _ in letterboxed], axis=0)
+            )
+        try:
+            with (
+                stage("detect_inference"),
+                self._pool.acquire() if detector is None else nullcontext(detector) as session,
+            ):
+                predictions = session.model.run(
+                    [session.output_name], {session.input_name: inputs}
+                )[0]
+        # Same as `open_image_models`, a failed run (i.e. no detections with some providers) is
+        # treated as no detections at all
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.warning("An error occurred during model inference: %s", e)
+            return [[] for _ in frames]
+
+        with stage("detect_postprocess"):
+            # First column of the end2end model output is the index of the image within the batch
+            batch_indices = predictions[:, 0].astype(int)
+            return [
+                self._convert_detections(
+                    convert_to_detection_result(
+                        predictions=predictions[batch_indices == idx],
+                        class_labels=self.detector.class_labels,
+                        ratio=ratio,
+                        padding=padding,
+                        score_threshold=self.detector.conf_thresh,
+                    )
+                )
+                for idx, (_, ratio, padding) in enumerate(letterboxed)
+            ]
+
+    def _letterbox(
+        self, frame: np.ndarray
+    ) -> tuple[np.ndarray, tuple[float, float], tuple[float, float]]:
+        # Frames processed by ALPR share the letterboxed tensor through their FrameContext
+        img_size = self.detector.img_size
+        context = active_context(frame)
+        if context is None:
+            return preprocess(frame, img_size)
+        return context.cached(("detector_letterbox", img_size), lambda: preprocess(frame, img_size))
+
+    @staticmethod
+    def _convert_detections(detections: list[OimDetectionResult]) -> list[DetectionResult]:
+        return [
             DetectionResult(
                 label=detection.label,
                 confidence=detection.confidence,
@@ -72,4 +219,3 @@ class DefaultDetector(BaseDetector):
             )
             for detection in detections
         ]
-        return detection_results
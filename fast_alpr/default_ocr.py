@@ -3,6 +3,7 @@ Default OCR module.
 """
 
 import os
+import threading
 from collections.abc import Sequence
 from typing import Literal
 
@@ -10,9 +11,53 @@ import cv2
 import numpy as np
 import onnxruntime as ort
 from fast_plate_ocr import LicensePlateRecognizer
+from fast_plate_ocr.core.process import INTERPOLATION_MAP, postprocess_output
+from fast_plate_ocr.inference import hub
+from fast_plate_ocr.inference.config import PlateOCRConfig
 from fast_plate_ocr.inference.hub import OcrModel
 
 from fast_alpr.base import BaseOCR, OcrResult
+from fast_alpr.metrics import stage
+from fast_alpr.session import SessionPool, create_with_graph_cache, pooled_session_options
+
+
+def _device_providers(device: Literal["cuda", "cpu", "auto"]) -> list[str]:
+    # Same providers `LicensePlateRecognizer` picks for each device
+    if device == "cuda":
+        return ["CUDAExecutionProvider"]
+    if device == "cpu":
+        return ["CPUExecutionProvider"]
+    return ort.get_available_providers()
+
+
+def _resize_into(
+    cropped_plate: np.ndarray,
+    model_input: np.ndarray,
+    config: PlateOCRConfig,
+    padding: tuple[int, int, int] | int | None = None,
+) -> None:
+    # Same as `fast_plate_ocr.core.process.resize_image`, but writing into `model_input`. The
+    # padding color defaults to the one of the config.
+    height, width = model_input.shape[:2]
+    # Drop the channel axis of grayscale inputs, so OpenCV writes into them in place
+    out = model_input.reshape(height, width) if model_input.shape[2] == 1 else model_input
+    interpolation = INTERPOLATION_MAP[config.interpolation]
+    if not config.keep_aspect_ratio:
+        cv2.resize(cropped_plate, (width, height), dst=out, interpolation=interpolation)
+        return
+
+    orig_h, orig_w = cropped_plate.shape[:2]
+    ratio = min(height / orig_h, width / orig_w)
+    new_w, new_h = round(orig_w * ratio), round(orig_h * ratio)
+    if (orig_w, orig_h) != (new_w, new_h):
+        cropped_plate = cv2.resize(cropped_plate, (new_w, new_h), interpolation=interpolation)
+    top, left = round((height - new_h) / 2 - 0.1), round((width - new_w) / 2 - 0.1)
+    if padding is None:
+        padding = config.padding_color
+    if model_input.shape[2] == 1 and isinstance(padding, tuple):
+        padding = padding[0]
+    out[...] = padding
+    out[top : top + new_h, left : left + new_w] = cropped_plate
 
 
 class DefaultOCR(BaseOCR):
@@ -23,7 +68,7 @@ class DefaultOCR(BaseOCR):
     to perform OCR on cropped license plate images.
     """
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments  # noqa: PLR0913
         self,
         hub_ocr_model: OcrModel | None = None,
         device: Literal["cuda", "cpu", "auto"] = "auto",
@@ -32,6 +77,11 @@ class DefaultOCR(BaseOCR):
         model_path: str | os.PathLike | None = None,
         config_path: str | os.PathLike | None = None,
         force_download: bool = False,
+        num_sessions: int = 1,
+        per_char_confidence: bool = False,
+        slot_probabilities: bool = False,
+        graph_cache_dir: str | os.PathLike | None = None,
+        fused_preprocessing: bool = True,
     ) -> None:
         """
         Initialize the DefaultOCR with the specified parameters. Uses `fast-plate-ocr`'s
@@ -51,16 +101,71 @@ class DefaultOCR(BaseOCR):
              used.
             force_download: If True, forces the download of the model and overwrites any existing
              files.
+            num_sessions: Number of ONNX Runtime sessions to create. Each thread calling `predict`
+             concurrently gets a session of its own. When greater than 1 and `sess_options` is None,
+             the CPU cores are split evenly between the sessions.
+            per_char_confidence: If True, `OcrResult.confidence` is the list of the confidences of
+             each character of the text, instead of their mean.
+            slot_probabilities: If True, `OcrResult.slot_probabilities` holds the raw probabilities
+             of every character slot, with shape (slots, alphabet size). Characters are ordered as
+             in `ocr_model.config.alphabet`. They come from the same model run.
+            graph_cache_dir: If given, the graph optimized by ONNX Runtime is stored in this
+             directory and reused by later sessions (in this or other processes), so they skip
+             graph optimizations. See `fast_alpr.session.create_with_graph_cache`.
+            fused_preprocessing: If True, large plates for grayscale models are resized before
+             being converted to grayscale (all of them with a single conversion), instead of
+             converting the full resolution crops. The model inputs then differ by rounding only,
+             by at most a couple of intensity levels.
         """
-        self.ocr_model = LicensePlateRecognizer(
-            hub_ocr_model=hub_ocr_model,
-            device=device,
-            providers=providers,
-            sess_options=sess_options,
-            onnx_model_path=model_path,
-            plate_config_path=config_path,
-            force_download=force_download,
+        if num_sessions > 1 and sess_options is None:
+            sess_options = pooled_session_options(num_sessions)
+        if graph_cache_dir is not None and not (model_path and config_path) and hub_ocr_model:
+            # The graph cache needs the model file, so resolve it the way `LicensePlateRecognizer`
+            # does
+            model_path, config_path = hub.download_model(
+                model_name=hub_ocr_model, force_download=force_download
+            )
+            force_download = False
+
+        def create_recognizer(
+            onnx_model_path: str | os.PathLike | None,
+            options: ort.SessionOptions | None,
+            force: bool = False,
+        ) -> LicensePlateRecognizer:
+            return LicensePlateRecognizer(
+                hub_ocr_model=hub_ocr_model,
+                device=device,
+                providers=providers,
+                sess_options=options,
+                onnx_model_path=onnx_model_path,
+                plate_config_path=config_path,
+                force_download=force,
+            )
+
+        self._pool = SessionPool(
+            [
+                create_recognizer(
+                    model_path,
+                    sess_options,
+                    # Only the first session needs to (re-)download the model
+                    force=force_download and idx == 0,
+                )
+                if graph_cache_dir is None or model_path is None
+                else create_with_graph_cache(
+                    create_recognizer,
+                    model_path=model_path,
+                    providers=providers or _device_providers(device),
+                    sess_options=sess_options,
+                    cache_dir=graph_cache_dir,
+                )
+                for idx in range(num_sessions)
+            ]
         )
+        self.ocr_model = self._pool.instances[0]
+        self.per_char_confidence = per_char_confidence
+        self.slot_probabilities = slot_probabilities
+        self.fused_preprocessing = fused_preprocessing
+        self._buffers = threading.local()
 
     def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
         """
@@ -74,15 +179,126 @@ class DefaultOCR(BaseOCR):
         """
         if cropped_plate is None:
             return None
-        if self.ocr_model.config.image_color_mode == "grayscale":
-            cropped_plate = cv2.cvtColor(cropped_plate, cv2.COLOR_BGR2GRAY)
-        plate_text, probabilities = self.ocr_model.run(cropped_plate, return_confidence=True)
-        if not isinstance(plate_text, list):
-            raise TypeError(f"Expected plate_text to be a list, got {type(plate_text).__name__}")
-        if not isinstance(probabilities, np.ndarray):
-            raise TypeError(
-                f"Expected probabilities to be a numpy ndarray, got {type(probabilities).__name__}"
+        return self.predict_batch([cropped_plate])[0]
+
+    def predict_batch(self, cropped_plates: list[np.ndarray]) -> list[OcrResult | None]:
+        """
+        Perform OCR on multiple cropped license plate images with a single model run.
+
+        Parameters:
+            cropped_plates: The cropped images of the license plates in BGR format.
+
+        Returns:
+            A list of OcrResult objects, one for each of the input plates and in the same order.
+        """
+        if not cropped_plates:
+            return []
+        with stage("ocr_preprocess"):
+            inputs = self._preprocess(cropped_plates)
+        # Same as `LicensePlateRecognizer.run`, but keeping the raw model output around so the
+        # slot probabilities don't need a second run
+        with stage("ocr_inference"), self._pool.acquire() as ocr_model:
+            model_output = ocr_model.model.run(None, {"input": inputs})[0]
+        with stage("ocr_postprocess"):
+            return self._postprocess(model_output)
+
+    def warmup(self, batch_sizes: Sequence[int]) -> None:
+        """
+        Run blank plates through every session of the pool, once for each of the batch sizes.
+
+        Parameters:
+            batch_sizes: Numbers of plates passed to `predict_batch` at once.
+        """
+        config = self.ocr_model.config
+        cropped_plate = np.zeros((config.img_height, config.img_width, 3), dtype=np.uint8)
+        for batch_size in sorted(set(batch_sizes)):
+            inputs = self._preprocess([cropped_plate] * batch_size)
+            for ocr_model in self._pool.instances:
+                ocr_model.model.run(None, {"input": inputs})
+
+    def _preprocess(self, cropped_plates: list[np.ndarray]) -> np.ndarray:
+        # Every plate is resized straight into its slot of a (N, H, W, C) buffer reused across
+        # calls, which is then run by the session as is. Crops can be views of the frame.
+        config = self.ocr_model.config
+        inputs = self._buffer("inputs", len(cropped_plates))
+        if config.image_color_mode != "grayscale":
+            for cropped_plate, model_input in zip(cropped_plates, inputs, strict=True):
+                _resize_into(cropped_plate, model_input, config)
+            return inputs
+        if not self.fused_preprocessing:
+            for cropped_plate, model_input in zip(cropped_plates, inputs, strict=True):
+                _resize_into(cv2.cvtColor(cropped_plate, cv2.COLOR_BGR2GRAY), model_input, config)
+            return inputs
+
+        # Crops much larger than the model input are resized first, since downscaling them is
+        # most of the pixel work, and then all the (small) resized plates are converted to
+        # grayscale with a single call. Resizing three channels instead of one only pays off
+        # above roughly 4x the input area, so smaller crops are converted before resizing.
+        colors = self._buffer("colors", len(cropped_plates), channels=3)
+        padding = config.padding_color
+        # A gray padding color, so it converts to the same value as the unfused path
+        gray_padding = padding[0] if isinstance(padding, tuple) else padding
+        min_fused_area = 4 * config.img_height * config.img_width
+        fused: list[int] = []
+        for idx, cropped_plate in enumerate(cropped_plates):
+            if cropped_plate.shape[0] * cropped_plate.shape[1] > min_fused_area:
+                _resize_into(cropped_plate, colors[idx], config, padding=gray_padding)
+                fused.append(idx)
+            else:
+                _resize_into(cv2.cvtColor(cropped_plate, cv2.COLOR_BGR2GRAY), inputs[idx], config)
+        if len(fused) == len(cropped_plates):
+            cv2.cvtColor(
+                colors.reshape(-1, config.img_width, 3),
+                cv2.COLOR_BGR2GRAY,
+                dst=inputs.reshape(-1, config.img_width),
             )
+        else:
+            for idx in fused:
+                cv2.cvtColor(
+                    colors[idx],
+                    cv2.COLOR_BGR2GRAY,
+                    dst=inputs[idx].reshape(config.img_height, config.img_width),
+                )
+        return inputs
+
+    def _buffer(self, name: str, batch_size: int, channels: int | None = None) -> np.ndarray:
+        # One set of buffers per thread, since the instance can be shared between threads
+        config = self.ocr_model.config
+        if channels is None:
+            channels = 1 if config.image_color_mode == "grayscale" else 3
+        buffer: np.ndarray | None = getattr(self._buffers, name, None)
+        if buffer is None or len(buffer) < batch_size:
+            capacity = max(batch_size, 2 * len(buffer) if buffer is not None else 1)
+            buffer = np.empty(
+                (capacity, config.img_height, config.img_width, channels), dtype=np.uint8
+            )
+            setattr(self._buffers, name, buffer)
+        return buffer[:batch_size]
+
+    def _postprocess(self, model_output: np.ndarray) -> list[OcrResult | None]:
+        config = self.ocr_model.config
+        plate_texts, probabilities = postprocess_output(
+            model_output, config.max_plate_slots, config.alphabet, return_confidence=True
+        )
+        slot_probabilities = model_output.reshape(
+            (-1, config.max_plate_slots, len(config.alphabet))
+        )
         # fast_plate_ocr uses '_' padding symbol
-        plate_text = plate_text.pop().replace("_", "")
-        return OcrResult(text=plate_text, confidence=float(np.mean(probabilities)))
+        return [
+            OcrResult(
+                text=plate_text.replace("_", ""),
+                confidence=(
+                    [
+                        float(prob)
+                        for char, prob in zip(plate_text, plate_probs, strict=True)
+                        if char != "_"
+                    ]
+                    if self.per_char_confidence
+                    else float(np.mean(plate_probs))
+                ),
+                slot_probabilities=plate_slot_probs if self.slot_probabilities else None,
+            )
+            for plate_text, plate_probs, plate_slot_probs in zip(
+                plate_texts, probabilities, slot_probabilities, strict=True
+            )
+        ]
@@ -0,0 +1,156 @@
+"""
+Frame context module.
+
+A FrameContext wraps a frame and lazily computes the views derived from it (the detector's
+letterboxed tensor, a grayscale copy, downscaled copies), each at most once. The same context is
+passed through every stage of `ALPR` and to its `frame_hooks`, and can be given to a `MotionGate`,
+so a frame that is detected on, motion-gated and shown in a preview isn't resized and color
+converted again by each of them.
+
+Stages that only receive plain frames (i.e. `BaseDetector.predict_batch`) find the context of a
+frame with `active_context`, while `ALPR` is processing it.
+"""
+
+import threading
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import cv2
+import numpy as np
+
+_T = TypeVar("_T")
+
+_ACTIVE: ContextVar[dict[int, "FrameContext"] | None] = ContextVar(
+    "fast_alpr_frame_contexts", default=None
+)
+
+
+class FrameContext:
+    """
+    A frame and the views derived from it, computed on first use and cached.
+
+    Views are cached for the lifetime of the context, so they assume the frame is not modified
+    after it is wrapped: draw on a copy (i.e. `ALPR.render(..., copy=True)`) or once no more views
+    are needed. Cached views are shared, so don't modify them in place either. Contexts are
+    thread-safe.
+    """
+
+    def __init__(self, image: np.ndarray) -> None:
+        """
+        Initialize the FrameContext.
+
+        Parameters:
+            image: The frame (Colors in order: BGR).
+        """
+        self.image = image
+        self._views: dict[Hashable, Any] = {}
+        # Reentrant, since views can be computed from other views
+        self._lock = threading.RLock()
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """
+        Shape of the frame.
+        """
+        return self.image.shape
+
+    def cached(self, key: Hashable, compute: Callable[[], _T]) -> _T:
+        """
+        Get a view of the frame, computing it the first time it is asked for.
+
+        Parameters:
+            key: Identifies the view, including every parameter it depends on (i.e.
+                `("detector_letterbox", (384, 384))`).
+            compute: Computes the view from `image`.
+
+        Returns:
+            The cached view.
+        """
+        try:
+            return self._views[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._views:
+                self._views[key] = compute()
+            return self._views[key]
+
+    def gray(self) -> np.ndarray:
+        """
+        Grayscale copy of the frame.
+        """
+        return self.cached(("gray",), lambda: _to_gray(self.image))
+
+    def resized(
+        self, scale: float, gray: bool = False, interpolation: int = cv2.INTER_AREA
+    ) -> np.ndarray:
+        """
+        Copy of the frame resized by `scale`.
+
+        Parameters:
+            scale: Factor applied to both the width and the height.
+            gray: Whether to convert the resized copy to grayscale. It is resized before being
+                converted, so the conversion touches fewer pixels.
+            interpolation: OpenCV interpolation flag.
+
+        Returns:
+            The resized (and converted) copy.
+        """
+        if gray:
+            return self.cached(
+                ("resized", scale, interpolation, True),
+                lambda: _to_gray(self.resized(scale, interpolation=interpolation)),
+            )
+        return self.cached(
+            ("resized", scale, interpolation, False),
+            lambda: cv2.resize(self.image, None, fx=scale, fy=scale, interpolation=interpolation),
+        )
+
+    def clear(self) -> None:
+        """
+        Drop the cached views, i.e. after the frame was modified in place.
+        """
+        with self._lock:
+            self._views.clear()
+
+
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+@contextmanager
+def use_contexts(contexts: Sequence[FrameContext]) -> Iterator[None]:
+    """
+    Make the contexts findable with `active_context` by the code run (in the current thread)
+    inside the `with` block.
+
+    Parameters:
+        contexts: The contexts of the frames being processed.
+    """
+    active = dict(_ACTIVE.get() or {})
+    active.update((id(context.image), context) for context in contexts)
+    token = _ACTIVE.set(active)
+    try:
+        yield
+    finally:
+        _ACTIVE.reset(token)
+
+
+def active_context(frame: np.ndarray) -> FrameContext | None:
+    """
+    Find the context of a frame being processed (see `use_contexts`).
+
+    Parameters:
+        frame: The frame, which must be the very same array the context wraps. Crops and copies of
+            it don't have a context.
+
+    Returns:
+        The context of the frame, or None if it has none.
+    """
+    active = _ACTIVE.get()
+    if active is None:
+        return None
+    context = active.get(id(frame))
+    return context if context is not None and context.image is frame else None
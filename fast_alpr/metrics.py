@@ -0,0 +1,239 @@
+"""
+Pipeline metrics module.
+
+Stages of the pipeline are timed with `stage`, which does nothing unless timings are being
+recorded for the current call (see `ALPR(timing_hooks=...)`), so there is no overhead when timing is
+disabled. Each recorded call produces a dictionary with the seconds spent in every stage:
+
+- `decode`: Loading images given as paths.
+- `detect`: Plate detection, which includes `detect_preprocess` (letterbox), `detect_inference`
+  (ONNX session) and `detect_postprocess` with the default detector.
+- `crop`: Cropping the detected plates.
+- `track`: Matching plates to tracks and measuring crop quality, with `ALPR.track`.
+- `ocr`: Plate recognition, which includes `ocr_preprocess` (color conversion and resize),
+  `ocr_inference` (ONNX session) and `ocr_postprocess` with the default OCR.
+"""
+
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+
+_TIMINGS: ContextVar[dict[str, float] | None] = ContextVar("fast_alpr_timings", default=None)
+_NULL_CONTEXT = nullcontext()
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+"""Default upper bounds (in seconds) of the histogram buckets of PipelineMetrics."""
+
+
+class _StageTimer:
+    __slots__ = ("_name", "_start", "_timings")
+
+    def __init__(self, timings: dict[str, float], name: str) -> None:
+        self._timings = timings
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        elapsed = time.perf_counter() - self._start
+        self._timings[self._name] = self._timings.get(self._name, 0.0) + elapsed
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """
+    Time the `with` block as a stage of the pipeline, if timings are being recorded.
+
+    Time spent in the same stage several times during a call is accumulated.
+
+    Parameters:
+        name: Name of the stage.
+
+    Returns:
+        A context manager timing the block, or a no-op one if timings are not being recorded.
+    """
+    timings = _TIMINGS.get()
+    if timings is None:
+        return _NULL_CONTEXT
+    return _StageTimer(timings, name)
+
+
+@contextmanager
+def record_timings() -> Iterator[dict[str, float]]:
+    """
+    Record the stage timings of the code run (in the current thread) inside the `with` block.
+
+    Returns:
+        The dictionary the seconds spent in each stage are added to.
+    """
+    timings: dict[str, float] = {}
+    token = _TIMINGS.set(timings)
+    try:
+        yield timings
+    finally:
+        _TIMINGS.reset(token)
+
+
+class PipelineMetrics:
+    """
+    Aggregated counters and histograms of stage timings.
+
+    An instance is a timing hook, so it can be passed to `ALPR(timing_hooks=[...])`. It is
+    thread-safe, and can be exported in the Prometheus text format with `to_prometheus` or served
+    over HTTP with `serve_prometheus`.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the PipelineMetrics.
+
+        Parameters:
+            buckets: Upper bounds (in seconds) of the histogram buckets.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.calls = 0
+        """Number of recorded calls."""
+        self._counts: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, timings: dict[str, float]) -> None:
+        """
+        Add the stage timings of a call.
+        """
+        with self._lock:
+            self.calls += 1
+            for name, seconds in timings.items():
+                self._observe(name, seconds)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Add a single observation of a stage.
+        """
+        with self._lock:
+            self._observe(name, seconds)
+
+    def _observe(self, name: str, seconds: float) -> None:
+        counts = self._counts.get(name)
+        if counts is None:
+            # One count per bucket, plus the +Inf bucket
+            counts = self._counts[name] = [0] * (len(self.buckets) + 1)
+            self._sums[name] = 0.0
+        idx = next(
+            (idx for idx, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets)
+        )
+        counts[idx] += 1
+        self._sums[name] += seconds
+
+    def reset(self) -> None:
+        """
+        Remove all the observations.
+        """
+        with self._lock:
+            self.calls = 0
+            self._counts.clear()
+            self._sums.clear()
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """
+        Summary of every stage.
+
+        Returns:
+            For each stage, its number of observations (`count`), total seconds (`sum`) and mean
+            seconds (`mean`).
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": sum(counts),
+                    "sum": self._sums[name],
+                    "mean": self._sums[name] / sum(counts),
+                }
+                for name, counts in self._counts.items()
+            }
+
+    def to_prometheus(self, prefix: str = "fast_alpr") -> str:
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Parameters:
+            prefix: Prefix of the metric names.
+
+        Returns:
+            The `<prefix>_calls_total` counter and the `<prefix>_stage_duration_seconds` histogram,
+            labeled by stage.
+        """
+        histogram = f"{prefix}_stage_duration_seconds"
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_calls_total Number of timed ALPR calls.",
+                f"# TYPE {prefix}_calls_total counter",
+                f"{prefix}_calls_total {self.calls}",
+                f"# HELP {histogram} Time spent in each stage of the ALPR pipeline.",
+                f"# TYPE {histogram} histogram",
+            ]
+            for name, counts in sorted(self._counts.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, None), counts, strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound is None else repr(bound)
+                    lines.append(f'{histogram}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'{histogram}_sum{{stage="{name}"}} {self._sums[name]}')
+                lines.append(f'{histogram}_count{{stage="{name}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(
+    metrics: PipelineMetrics, port: int = 9464, addr: str = "0.0.0.0"
+) -> ThreadingHTTPServer:
+    """
+    Serve the metrics in the Prometheus text format over HTTP, from a daemon thread.
+
+    Parameters:
+        metrics: The metrics to serve.
+        port: Port to listen on. Use 0 to pick a free one.
+        addr: Address to listen on.
+
+    Returns:
+        The running server. Call `shutdown` on it to stop serving.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+            # Don't log every scrape
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="fast-alpr-metrics").start()
+    return server
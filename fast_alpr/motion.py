@@ -0,0 +1,151 @@
+"""
+Motion gating module.
+"""
+
+import time
+from typing import Literal
+
+import cv2
+import numpy as np
+
+from fast_alpr.frame import FrameContext
+
+
+class MotionGate:  # pylint: disable=too-many-instance-attributes
+    """
+    Pre-filter that decides whether a frame is worth running ALPR on, based on motion.
+
+    Each frame is cropped to the region of interest (if any), downscaled and converted to
+    grayscale, and its foreground is estimated either with a MOG2 background subtractor or with a
+    cheaper difference against the previous frame. Once the fraction of moving pixels reaches
+    `threshold`, frames keep being processed for `cooldown` seconds, so a vehicle that stops in
+    front of the camera is still recognized. Idle cameras then skip the detector entirely.
+
+    A gate keeps per-source state, so use one instance per camera. It is not thread-safe.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        method: Literal["mog2", "diff"] = "mog2",
+        threshold: float = 0.02,
+        cooldown: float = 3.0,
+        scale: float = 0.25,
+        roi: tuple[int, int, int, int] | None = None,
+        diff_threshold: int = 25,
+        history: int = 500,
+        var_threshold: float = 16.0,
+    ) -> None:
+        """
+        Initialize the MotionGate.
+
+        Parameters:
+            method: Foreground estimation method. "mog2" uses OpenCV's MOG2 background subtractor,
+                which is robust to lighting changes. "diff" thresholds the absolute difference with
+                the previous frame, which is considerably cheaper.
+            threshold: Minimum fraction (0 to 1) of moving pixels in the (downscaled) region of
+                interest for a frame to count as motion.
+            cooldown: Seconds to keep processing frames after the last frame with motion.
+            scale: Downscale factor applied before estimating motion.
+            roi: Optional `(x1, y1, x2, y2)` rectangle, in full-frame pixel coordinates, where
+                motion is looked for. If None, the whole frame is used.
+            diff_threshold: Minimum intensity difference (0 to 255) for a pixel to count as moving
+                with the "diff" method.
+            history: Number of frames used to model the background with the "mog2" method.
+            var_threshold: Variance threshold of the "mog2" background subtractor.
+        """
+        if method not in ("mog2", "diff"):
+            raise ValueError(f"Unknown motion method '{method}'. Use one of ('mog2', 'diff')")
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.method = method
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.scale = scale
+        self.roi = roi
+        self.diff_threshold = diff_threshold
+        self._subtractor = (
+            cv2.createBackgroundSubtractorMOG2(
+                history=history, varThreshold=var_threshold, detectShadows=False
+            )
+            if method == "mog2"
+            else None
+        )
+        self._previous: np.ndarray | None = None
+        self._last_motion: float | None = None
+        self.motion_level = 0.0
+        """Fraction of moving pixels found in the last frame."""
+        self.processed_frames = 0
+        """Number of frames the gate let through."""
+        self.skipped_frames = 0
+        """Number of frames (and so inferences) the gate skipped."""
+
+    @property
+    def skip_ratio(self) -> float:
+        """
+        Fraction of the frames seen so far that were skipped.
+        """
+        total = self.processed_frames + self.skipped_frames
+        return self.skipped_frames / total if total else 0.0
+
+    def reset_stats(self) -> None:
+        """
+        Reset the processed and skipped frame counters.
+        """
+        self.processed_frames = 0
+        self.skipped_frames = 0
+
+    def should_process(
+        self, frame: np.ndarray | FrameContext, timestamp: float | None = None
+    ) -> bool:
+        """
+        Update the motion state with a new frame and decide whether to run ALPR on it.
+
+        Parameters:
+            frame: The frame (Colors in order: BGR), or its FrameContext. Without a `roi`, the
+                downscaled grayscale copy of a FrameContext is reused (or kept) for other consumers.
+            timestamp: Time of the frame in seconds, used for the cooldown. If None, the current
+                monotonic time is used.
+
+        Returns:
+            True if the frame should be processed.
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        self.motion_level = self._estimate_motion(frame)
+        if self.motion_level >= self.threshold:
+            self._last_motion = now
+        process = self._last_motion is not None and now - self._last_motion <= self.cooldown
+        if process:
+            self.processed_frames += 1
+        else:
+            self.skipped_frames += 1
+        return process
+
+    def _estimate_motion(self, frame: np.ndarray | FrameContext) -> float:
+        if isinstance(frame, FrameContext) and self.roi is None:
+            small = frame.resized(self.scale, gray=True)
+        else:
+            small = self._downscale(frame.image if isinstance(frame, FrameContext) else frame)
+
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(small)
+        else:
+            previous, self._previous = self._previous, small
+            if previous is None or previous.shape != small.shape:
+                # Nothing to compare against yet, so treat the frame as motion
+                return 1.0
+            _, mask = cv2.threshold(
+                cv2.absdiff(previous, small), self.diff_threshold, 255, cv2.THRESH_BINARY
+            )
+        # Remove salt-and-pepper noise before counting moving pixels
+        mask = cv2.medianBlur(mask, 5)
+        return cv2.countNonZero(mask) / mask.size
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        if self.roi is not None:
+            x1, y1, x2, y2 = self.roi
+            frame = frame[max(y1, 0) : y2, max(x1, 0) : x2]
+        # Downscale before converting to grayscale, so the conversion touches fewer pixels
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
@@ -0,0 +1,313 @@
+"""
+Process pool module.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Literal
+
+import numpy as np
+
+from fast_alpr.alpr import ALPR, ALPRResult
+from fast_alpr.session import get_session_profile, pooled_session_options
+from fast_alpr.utils import load_image
+
+_READY = -1
+"""Task id used by workers to report that their models finished loading."""
+
+
+def _set_worker_sess_options(alpr_kwargs: dict[str, Any], num_workers: int) -> None:
+    # Split the CPU cores between the workers, unless the caller tuned the sessions themselves
+    profile = alpr_kwargs.pop("session_profile", None)
+    # Every worker runs `num_sessions` sessions of each model
+    total_sessions = num_workers * alpr_kwargs.get("num_sessions", 1)
+    for key in ("detector_sess_options", "ocr_sess_options"):
+        if alpr_kwargs.get(key) is None:
+            alpr_kwargs[key] = (
+                pooled_session_options(total_sessions)
+                if profile is None
+                else get_session_profile(profile).session_options(total_sessions)
+            )
+
+
+def _worker_main(
+    alpr_kwargs: dict[str, Any],
+    num_workers: int,
+    task_queue: multiprocessing.Queue,
+    result_queue: multiprocessing.Queue,
+) -> None:
+    """
+    Entry point of the worker processes. Loads the models once and then runs `ALPR.predict` on the
+    frames found in shared memory until a `None` task is received.
+    """
+    _set_worker_sess_options(alpr_kwargs, num_workers)
+    try:
+        alpr = ALPR(**alpr_kwargs)
+    except Exception as e:  # pylint: disable=broad-except
+        result_queue.put((_READY, None, e))
+        return
+    result_queue.put((_READY, None, None))
+
+    segments: dict[int, SharedMemory] = {}
+    try:
+        while (task := task_queue.get()) is not None:
+            task_id, slot, segment_name, shape, dtype = task
+            segment = segments.get(slot)
+            # The parent re-creates a slot segment when a bigger frame doesn't fit in it
+            if segment is None or segment.name != segment_name:
+                if segment is not None:
+                    segment.close()
+                segment = segments[slot] = SharedMemory(name=segment_name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+            try:
+                result_queue.put((task_id, alpr.predict(frame), None))
+            except Exception as e:  # pylint: disable=broad-except
+                result_queue.put((task_id, None, e))
+            finally:
+                # Release the view so the segment can be closed
+                del frame
+    finally:
+        for segment in segments.values():
+            segment.close()
+
+
+class ALPRPool:  # pylint: disable=too-many-instance-attributes
+    """
+    Pool of worker processes, each one running its own `ALPR` instance.
+
+    A single Python process can't keep all the CPU cores busy with small models, since ONNX Runtime
+    intra-op threading gives diminishing returns. The pool runs `workers` processes that load the
+    detector and OCR models once, and frames are handed to them through shared memory instead of
+    being pickled. Results come back as `ALPRResult` objects.
+
+    Example:
+
+    ```python
+    with ALPRPool(workers=4, ocr_model="cct-xs-v1-global-model") as pool:
+        futures = [pool.submit(frame) for frame in frames]
+        results = [future.result() for future in futures]
+    ```
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        start_method: Literal["spawn", "forkserver", "fork"] = "spawn",
+        **alpr_kwargs: Any,
+    ) -> None:
+        """
+        Start the worker processes and wait until all of them have loaded their models.
+
+        Parameters:
+            workers: Number of worker processes. Defaults to the number of CPU cores.
+            max_pending: Maximum number of frames submitted but not yet processed. Each pending
+                frame uses a shared memory segment, and `submit` blocks while the limit is reached.
+                Defaults to twice the number of workers.
+            start_method: The `multiprocessing` start method used for the workers.
+            **alpr_kwargs: Keyword arguments used to create the `ALPR` instance of each worker. They
+                must be picklable, so custom `detector`/`ocr` instances holding ONNX sessions can't
+                be passed. If the session options are not given, the CPU cores are split evenly
+                between the workers.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError(f"Number of workers must be at least 1, got {self.workers}")
+        num_slots = max_pending or 2 * self.workers
+
+        context = multiprocessing.get_context(start_method)
+        self._task_queue: multiprocessing.Queue = context.Queue()
+        self._result_queue: multiprocessing.Queue = context.Queue()
+        self._processes = [
+            context.Process(  # type: ignore[attr-defined]
+                target=_worker_main,
+                args=(alpr_kwargs, self.workers, self._task_queue, self._result_queue),
+                daemon=True,
+            )
+            for _ in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._segments: list[SharedMemory | None] = [None] * num_slots
+        self._free_slots: queue.SimpleQueue[int] = queue.SimpleQueue()
+        for slot in range(num_slots):
+            self._free_slots.put(slot)
+        self._pending: dict[int, tuple[Future[list[ALPRResult]], int]] = {}
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._closed = False
+        # Set once a worker process died, after which the pool can't be used anymore
+        self._broken: RuntimeError | None = None
+
+        self._wait_until_ready()
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+        self._collector.start()
+
+    def _wait_until_ready(self) -> None:
+        ready = 0
+        while ready < self.workers:
+            try:
+                _, _, error = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                # Workers killed while loading (i.e. out of memory, or failed imports) never report
+                exit_codes = [p.exitcode for p in self._processes if not p.is_alive()]
+                if exit_codes:
+                    self._terminate()
+                    raise RuntimeError(
+                        f"ALPRPool worker died while loading the models (exit code {exit_codes[0]})"
+                    ) from None
+                continue
+            if error is not None:
+                self._terminate()
+                raise RuntimeError("ALPRPool worker failed to load the models") from error
+            ready += 1
+
+    def submit(self, frame: np.ndarray | str) -> Future[list[ALPRResult]]:
+        """
+        Schedule a frame to be processed by one of the workers.
+
+        If a worker process dies (i.e. killed for running out of memory), the pool is broken: the
+        pending futures fail with a RuntimeError, and so does every later call.
+
+        Parameters:
+            frame: Unprocessed frame (Colors in order: BGR) or image path.
+
+        Returns:
+            A future that resolves to the list of ALPRResult objects of the frame.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit frames to a closed ALPRPool")
+        if self._broken is not None:
+            raise RuntimeError("Cannot submit frames to a broken ALPRPool") from self._broken
+        img = np.ascontiguousarray(load_image(frame))
+        # Blocks while `max_pending` frames are in flight
+        slot = self._free_slots.get()
+        segment = self._segments[slot]
+        if segment is None or segment.size < img.nbytes:
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+            segment = self._segments[slot] = SharedMemory(create=True, size=max(img.nbytes, 1))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=segment.buf)[...] = img
+
+        future: Future[list[ALPRResult]] = Future()
+        task_id = next(self._task_ids)
+        with self._pending_lock:
+            # Checked under the lock, so the future is either failed with the others or not queued
+            if self._broken is not None:
+                self._free_slots.put(slot)
+                raise RuntimeError("Cannot submit frames to a broken ALPRPool") from self._broken
+            self._pending[task_id] = (future, slot)
+        self._task_queue.put((task_id, slot, segment.name, img.shape, img.dtype.str))
+        return future
+
+    def predict(self, frame: np.ndarray | str) -> list[ALPRResult]:
+        """
+        Returns all recognized license plates from a frame, processed by one of the workers.
+
+        Parameters:
+            frame: Unprocessed frame (Colors in order: BGR) or image path.
+
+        Returns:
+            A list of ALPRResult objects containing detection and OCR results.
+        """
+        return self.submit(frame).result()
+
+    def predict_many(self, frames: Sequence[np.ndarray | str]) -> list[list[ALPRResult]]:
+        """
+        Returns all recognized license plates from multiple frames, spread across the workers.
+
+        Parameters:
+            frames: Unprocessed frames (Colors in order: BGR) or image paths.
+
+        Returns:
+            A list with the ALPRResult objects of each frame, in the same order as the input.
+        """
+        futures = [self.submit(frame) for frame in frames]
+        return [future.result() for future in futures]
+
+    def _collect_results(self) -> None:
+        while True:
+            # Checked on every message, since the other workers keep producing results while the
+            # task of a dead one would never complete
+            if not self._closed and (
+                exit_codes := [p.exitcode for p in self._processes if not p.is_alive()]
+            ):
+                error = RuntimeError(
+                    f"An ALPRPool worker process died unexpectedly (exit code {exit_codes[0]})"
+                )
+                with self._pending_lock:
+                    self._broken = error
+                self._fail_pending(error)
+                return
+            try:
+                message = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if message is None:
+                return
+            task_id, results, error = message
+            with self._pending_lock:
+                future, slot = self._pending.pop(task_id)
+            self._free_slots.put(slot)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results)
+
+    def _fail_pending(self, error: Exception) -> None:
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future, slot in pending:
+            self._free_slots.put(slot)
+            future.set_exception(error)
+
+    def close(self) -> None:
+        """
+        Process the frames already submitted, then stop the workers and release the shared memory.
+        """
+        if self._closed:
+            return
+        if self._broken is not None or not all(p.is_alive() for p in self._processes):
+            # A dead worker may have left the task queue locked, so the others can't be stopped
+            # with `None` tasks
+            self._fail_pending(RuntimeError("ALPRPool was closed"))
+            self._terminate()
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join()
+        self._result_queue.put(None)
+        self._collector.join()
+        self._fail_pending(RuntimeError("ALPRPool was closed"))
+        self._release_segments()
+
+    def _terminate(self) -> None:
+        self._closed = True
+        for process in self._processes:
+            process.terminate()
+            process.join()
+        self._release_segments()
+
+    def _release_segments(self) -> None:
+        for idx, segment in enumerate(self._segments):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+                self._segments[idx] = None
+
+    def __enter__(self) -> "ALPRPool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
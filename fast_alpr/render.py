@@ -0,0 +1,232 @@
+"""
+Overlay rendering module.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from fast_alpr.alpr import ALPRResult
+
+
+@dataclass(frozen=True)
+class RenderStyle:  # pylint: disable=too-many-instance-attributes
+    """
+    Look of the overlays drawn by `PlateRenderer`. Colors are in BGR order.
+    """
+
+    box_color: tuple[int, int, int] = (36, 255, 12)
+    box_thickness: int = 2
+    font_face: int = cv2.FONT_HERSHEY_SIMPLEX
+    font_scale: float = 1.25
+    text_color: tuple[int, int, int] = (255, 255, 255)
+    text_thickness: int = 2
+    outline_color: tuple[int, int, int] = (0, 0, 0)
+    """Color of the outline drawn around the text, for better readability."""
+    outline_thickness: int = 6
+    """Thickness of the outline stroke. Set it to `text_thickness` or less to disable it."""
+    text_offset: int = 10
+    """Distance between the text baseline and the top of the box, in pixels."""
+    show_confidence: bool = True
+    """Whether to append the OCR confidence to the plate text."""
+    antialiased: bool = True
+    """Whether text is anti-aliased. Without it, labels are copied with a binary mask, which is
+    cheaper, i.e. for high-FPS previews."""
+
+
+@dataclass(frozen=True)
+class _Label:
+    patch: np.ndarray
+    """Rendered label (text over its outline color). Premultiplied by its alpha if anti-aliased."""
+    mask: np.ndarray
+    """If anti-aliased, the (H, W, 3) inverse alpha of the label. Otherwise, the (H, W) binary mask
+    of its pixels."""
+    antialiased: bool
+    baseline_y: int
+    """Row of the patch where the text baseline is."""
+    pad: int
+    """Columns of the patch left of the text origin."""
+
+
+class PlateRenderer:
+    """
+    Draws ALPR results (boxes and plate text) on frames.
+
+    Plate texts are rendered once into small patches, which are cached by text and then blended
+    into the frame (or just copied through a mask, without anti-aliasing), instead of laying out
+    and rasterizing the text with two `cv2.putText` passes on every frame. The confidence, which
+    changes on every frame, is drawn right after it with `cv2.putText`. The cache is bounded (least
+    recently used labels are evicted) and thread-safe, so one renderer can be shared by several
+    feeds.
+    """
+
+    def __init__(self, style: RenderStyle | None = None, cache_size: int = 256) -> None:
+        """
+        Initialize the PlateRenderer.
+
+        Parameters:
+            style: The look of the overlays. If None, the default RenderStyle is used.
+            cache_size: Maximum number of rendered labels kept in the cache.
+        """
+        self.style = style or RenderStyle()
+        self.cache_size = cache_size
+        self._labels: OrderedDict[str, _Label] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(
+        self, frame: np.ndarray, results: Sequence["ALPRResult"], copy: bool = False
+    ) -> np.ndarray:
+        """
+        Draws ALPR results on the frame.
+
+        Parameters:
+            frame: The frame the results come from (Colors in order: BGR).
+            results: The ALPRResult objects of the frame.
+            copy: If True, the results are drawn on a copy and the frame is left untouched.
+                Otherwise, the frame is drawn in place.
+
+        Returns:
+            The frame with detections and OCR results drawn.
+        """
+        img = frame.copy() if copy else frame
+        style = self.style
+        for result in results:
+            bbox = result.detection.bounding_box
+            cv2.rectangle(
+                img, (bbox.x1, bbox.y1), (bbox.x2, bbox.y2), style.box_color, style.box_thickness
+            )
+            ocr_result = result.ocr
+            if ocr_result is None or not ocr_result.text or not ocr_result.confidence:
+                continue
+            x, y = bbox.x1, bbox.y1 - style.text_offset
+            self._blit(img, self._label(ocr_result.text), x, y)
+            if style.show_confidence:
+                # Not `statistics.mean`, which is exact but much slower
+                confidence: float = (
+                    sum(ocr_result.confidence) / len(ocr_result.confidence)
+                    if isinstance(ocr_result.confidence, list)
+                    else ocr_result.confidence
+                )
+                self._draw_suffix(img, ocr_result.text, f" {confidence * 100:.2f}%", x, y)
+        return img
+
+    def clear_cache(self) -> None:
+        """
+        Remove all the cached labels, i.e. after changing the style.
+        """
+        with self._lock:
+            self._labels.clear()
+
+    def _label(self, text: str) -> _Label:
+        with self._lock:
+            label = self._labels.get(text)
+            if label is not None:
+                self._labels.move_to_end(text)
+                return label
+        label = self._render_label(text)
+        with self._lock:
+            self._labels[text] = label
+            while len(self._labels) > self.cache_size:
+                self._labels.popitem(last=False)
+        return label
+
+    def _render_label(self, text: str) -> _Label:  # pylint: disable=too-many-locals
+        style = self.style
+        stroke = max(style.outline_thickness, style.text_thickness)
+        (width, height), baseline = cv2.getTextSize(text, style.font_face, style.font_scale, stroke)
+        pad = stroke
+        origin = (pad, pad + height)
+        size = (height + baseline + 2 * pad, width + 2 * pad)
+
+        def put_text(img: np.ndarray, color: int | tuple[int, int, int], thickness: int) -> None:
+            cv2.putText(
+                img,
+                text,
+                origin,
+                style.font_face,
+                style.font_scale,
+                color,
+                thickness,
+                cv2.LINE_AA if style.antialiased else cv2.LINE_8,
+            )
+
+        # The text is drawn over the outline color, and the coverage of the outline (which
+        # contains the text) is the alpha of the label
+        alpha = np.zeros(size, dtype=np.uint8)
+        put_text(alpha, 255, stroke)
+        if not style.antialiased:
+            # Some OpenCV builds anti-alias text regardless of the line type, so the coverage of
+            # the text is mapped to either color
+            text_mask = np.zeros(size, dtype=np.uint8)
+            put_text(text_mask, 255, style.text_thickness)
+            colors = np.empty((256, 1, 3), dtype=np.uint8)
+            colors[:128] = style.outline_color
+            colors[128:] = style.text_color
+            return _Label(
+                patch=cv2.LUT(cv2.merge([text_mask, text_mask, text_mask]), colors),
+                mask=cv2.threshold(alpha, 127, 255, cv2.THRESH_BINARY)[1],
+                antialiased=False,
+                baseline_y=origin[1],
+                pad=pad,
+            )
+        # Filled per channel, which is much faster than broadcasting the color
+        patch = cv2.merge(
+            [np.full(size, channel, dtype=np.uint8) for channel in style.outline_color]
+        )
+        put_text(patch, style.text_color, style.text_thickness)
+        alpha3 = cv2.merge([alpha, alpha, alpha])
+        return _Label(
+            patch=cv2.multiply(patch, alpha3, scale=1 / 255),
+            mask=cv2.bitwise_not(alpha3),
+            antialiased=True,
+            baseline_y=origin[1],
+            pad=pad,
+        )
+
+    def _draw_suffix(self, img: np.ndarray, text: str, suffix: str, x: int, y: int) -> None:
+        # Not cached, since it changes on every frame. It is drawn where it would be if the whole
+        # label was drawn at once: the advance of the text is the width of the whole label minus
+        # the width of the suffix
+        style = self.style
+        font = (style.font_face, style.font_scale)
+        width = cv2.getTextSize(text + suffix, *font, style.text_thickness)[0][0]
+        origin = (x + width - cv2.getTextSize(suffix, *font, style.text_thickness)[0][0], y)
+        if not style.antialiased:
+            # putText can't be trusted to leave the text aliased
+            self._blit(img, self._render_label(suffix), *origin)
+            return
+        if style.outline_thickness > style.text_thickness:
+            cv2.putText(
+                img,
+                suffix,
+                origin,
+                *font,
+                style.outline_color,
+                style.outline_thickness,
+                cv2.LINE_AA,
+            )
+        cv2.putText(img, suffix, origin, *font, style.text_color, style.text_thickness, cv2.LINE_AA)
+
+    @staticmethod
+    def _blit(img: np.ndarray, label: _Label, x: int, y: int) -> None:  # pylint: disable=too-many-locals
+        # Top-left corner of the patch, clipped to the frame
+        top, left = y - label.baseline_y, x - label.pad
+        height, width = label.patch.shape[:2]
+        y1, x1 = max(top, 0), max(left, 0)
+        y2, x2 = min(top + height, img.shape[0]), min(left + width, img.shape[1])
+        if y2 <= y1 or x2 <= x1:
+            return
+        region = img[y1:y2, x1:x2]
+        patch = label.patch[y1 - top : y2 - top, x1 - left : x2 - left]
+        mask = label.mask[y1 - top : y2 - top, x1 - left : x2 - left]
+        # Both branches write into the frame through the `region` view
+        if label.antialiased:
+            cv2.add(cv2.multiply(region, mask, scale=1 / 255), patch, dst=region)
+        else:
+            cv2.copyTo(patch, mask, region)
@@ -0,0 +1,87 @@
+"""
+Region of interest module.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RegionOfInterest:
+    """
+    Region of a frame where license plates are looked for.
+
+    Detection runs on the crop of the region's bounding rectangle, which is letterboxed by the
+    detector at a higher effective resolution than the whole frame would be. For polygonal regions,
+    detections whose center falls outside the polygon are discarded.
+    """
+
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    polygon: tuple[tuple[int, int], ...] | None = None
+    """Vertices of the region, if it isn't a plain rectangle."""
+
+    @classmethod
+    def from_polygon(cls, points: Sequence[tuple[int, int]]) -> "RegionOfInterest":
+        """
+        Create a region from the vertices of a polygon, in full-frame pixel coordinates.
+
+        Parameters:
+            points: At least 3 `(x, y)` vertices.
+
+        Returns:
+            The RegionOfInterest bounding the polygon.
+        """
+        if len(points) < 3:
+            raise ValueError(f"A polygon needs at least 3 points, got {len(points)}")
+        xs = [int(x) for x, _ in points]
+        ys = [int(y) for _, y in points]
+        return cls(
+            x1=min(xs),
+            y1=min(ys),
+            x2=max(xs) + 1,
+            y2=max(ys) + 1,
+            polygon=tuple(zip(xs, ys, strict=True)),
+        )
+
+    def clip(self, width: int, height: int) -> tuple[int, int, int, int]:
+        """
+        Bounding rectangle of the region, clipped to the frame.
+
+        Parameters:
+            width: Frame width.
+            height: Frame height.
+
+        Returns:
+            The `(x1, y1, x2, y2)` rectangle. It is empty if the region lies outside the frame.
+        """
+        x1, y1 = min(max(self.x1, 0), width), min(max(self.y1, 0), height)
+        return x1, y1, max(min(self.x2, width), x1), max(min(self.y2, height), y1)
+
+    def contains(self, x: float, y: float) -> bool:
+        """
+        Whether a point (in full-frame coordinates) lies inside the region.
+        """
+        if self.polygon is None:
+            return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
+        contour = np.array(self.polygon, dtype=np.int32)
+        return cv2.pointPolygonTest(contour, (float(x), float(y)), False) >= 0
+
+
+RoiLike = RegionOfInterest | tuple[int, int, int, int]
+"""A RegionOfInterest, or a plain `(x1, y1, x2, y2)` rectangle."""
+
+
+def to_roi(roi: RoiLike) -> RegionOfInterest:
+    """
+    Convert a rectangle tuple to a RegionOfInterest, leaving RegionOfInterest objects untouched.
+    """
+    if isinstance(roi, RegionOfInterest):
+        return roi
+    x1, y1, x2, y2 = roi
+    return RegionOfInterest(x1=x1, y1=y1, x2=x2, y2=y2)
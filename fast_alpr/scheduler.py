@@ -0,0 +1,448 @@
+"""
+Multi-camera scheduling module.
+
+A CameraScheduler keeps the latest frame of every registered source and repeatedly runs a batch
+of them through a single `ALPR` instance, so cameras don't compete for it through locks and thread
+scheduling. Which cameras go into each batch depends on:
+
+- `min_fps`: Sources that haven't been served for `1 / min_fps` seconds go first.
+- `priority`: The others are ordered by their priority times the seconds since they were served,
+  so a busy camera can't starve the rest and a main lane is served more often than a secondary one.
+- `latency_budget`: Batches are only grown while every frame in them is still expected to get its
+  results within the budget, based on the measured inference time per frame.
+- `max_frame_age`: Frames waiting for longer are dropped instead of being processed late.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from fast_alpr.alpr import ALPR, ALPRResult, StreamFrame
+from fast_alpr.decoders import VideoDecoder
+from fast_alpr.frame import FrameContext
+from fast_alpr.motion import MotionGate
+from fast_alpr.roi import RoiLike
+from fast_alpr.stream import FrameReader
+from fast_alpr.tracker import PlateTracker
+
+# pylint: disable=too-many-arguments
+# ruff: noqa: PLR0913
+
+LOGGER = logging.getLogger(__name__)
+
+_COST_SMOOTHING = 0.2
+"""Weight of the latest batch in the moving average of the inference time per frame."""
+
+
+@dataclass
+class _Source:  # pylint: disable=too-many-instance-attributes
+    name: str
+    priority: float
+    min_fps: float
+    max_frame_age: float | None
+    rois: Sequence[RoiLike] | None
+    tracker: PlateTracker | None
+    motion_gate: MotionGate | None
+    reader: FrameReader | None
+    last_served: float
+    pending: tuple[int, float, FrameContext] | None = None
+    next_index: int = 0
+    error_logged: bool = False
+    stats: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(
+            ("processed", "dropped_stale", "superseded", "skipped_motion", "latency_sum"), 0.0
+        )
+    )
+
+
+class CameraScheduler:  # pylint: disable=too-many-instance-attributes
+    """
+    Fair, priority-aware dispatch of the frames of several cameras to a single ALPR instance.
+
+    Frames come from sources decoded in background threads (see `add_source`) or are handed over
+    with `submit`. Only the latest frame of each source is kept. Call `start` to process them in a
+    background thread, which passes the results to `callback`, or call `step` to run one batch from
+    your own loop.
+    """
+
+    def __init__(
+        self,
+        alpr: ALPR,
+        max_batch_size: int = 4,
+        latency_budget: float = 0.25,
+        max_frame_age: float | None = 1.0,
+        callback: Callable[[StreamFrame], None] | None = None,
+        poll_interval: float = 0.005,
+    ) -> None:
+        """
+        Initialize the CameraScheduler.
+
+        Parameters:
+            alpr: The ALPR instance frames are run through.
+            max_batch_size: Maximum number of frames (so of sources) run in a single batch.
+            latency_budget: Target seconds from a frame being decoded to its results. Batches are
+                kept small enough for their frames to meet it, once the inference time per frame
+                was measured. It is a target, not a hard limit: a batch has at least one frame.
+            max_frame_age: Frames older than this many seconds when a batch is assembled are
+                dropped. Can be set per source. If None, frames are never dropped for their age.
+            callback: Called with the StreamFrame of every processed frame, from the thread
+                running `step`. Its `source` is the name of the source.
+            poll_interval: Seconds the background thread waits when there is no frame to process.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        self.alpr = alpr
+        self.max_batch_size = max_batch_size
+        self.latency_budget = latency_budget
+        self.max_frame_age = max_frame_age
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.frame_cost: float | None = None
+        """Moving average of the inference seconds per frame. None until a batch ran."""
+        self._sources: dict[str, _Source] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_source(
+        self,
+        name: str,
+        source: str | int | None = None,
+        priority: float = 1.0,
+        min_fps: float = 0.0,
+        max_frame_age: float | None = None,
+        rois: Sequence[RoiLike] | None = None,
+        tracker: PlateTracker | None = None,
+        motion_gate: MotionGate | None = None,
+        decoder: VideoDecoder | None = None,
+        frame_stride: int = 1,
+        reconnect: bool | None = None,
+    ) -> None:
+        """
+        Register a source.
+
+        Parameters:
+            name: Unique name of the source, i.e. "entrance".
+            source: Camera index, stream URL or video file path, decoded in a background thread
+                (keeping the latest frame only). If None, frames are handed over with `submit`.
+            priority: Relative weight of the source. A source with twice the priority of another
+                gets about twice as many of its frames processed when both have frames waiting.
+            min_fps: Frames per second the source should get at least. Sources falling behind go
+                before any other. 0 disables it.
+            max_frame_age: Overrides the scheduler `max_frame_age` for this source.
+            rois: Regions of interest of the source. If None, the ALPR instance ones are used.
+            tracker: Optional PlateTracker of the source. Its frames are then processed with
+                `ALPR.track`, one at a time, instead of being batched.
+            motion_gate: Optional MotionGate of the source. Frames without motion are dropped
+                before being scheduled.
+            decoder: Decoder of `source`. See `fast_alpr.decoders`.
+            frame_stride: Only every `frame_stride`-th decoded frame of `source` is considered.
+            reconnect: Whether to re-open `source` when it fails or ends. Defaults to True for live
+                sources and False for video files.
+        """
+        if priority <= 0:
+            raise ValueError(f"priority must be positive, got {priority}")
+        reader = (
+            None
+            if source is None
+            else FrameReader(
+                source,
+                frame_stride=frame_stride,
+                drop_frames=True,
+                reconnect=reconnect,
+                decoder=decoder,
+            )
+        )
+        with self._lock:
+            if name in self._sources:
+                raise ValueError(f"Source '{name}' is already registered")
+            self._sources[name] = _Source(
+                name=name,
+                priority=priority,
+                min_fps=min_fps,
+                max_frame_age=max_frame_age,
+                rois=rois,
+                tracker=tracker,
+                motion_gate=motion_gate,
+                reader=reader,
+                last_served=time.time(),
+            )
+            # Checked under the lock, so `start` can't also start the reader
+            if reader is not None and self._thread is not None and not self._stop_event.is_set():
+                reader.start()
+
+    def remove_source(self, name: str) -> None:
+        """
+        Unregister a source, stopping its background decoding.
+        """
+        with self._lock:
+            source = self._sources.pop(name)
+        if source.reader is not None:
+            source.reader.stop()
+
+    def submit(
+        self, name: str, frame: np.ndarray | FrameContext, timestamp: float | None = None
+    ) -> bool:
+        """
+        Hand over a frame of a source, replacing the one waiting (if any).
+
+        Parameters:
+            name: Name of the source.
+            frame: The frame (Colors in order: BGR) or its FrameContext.
+            timestamp: Time (seconds since the epoch) at which the frame was captured. If None,
+                the current time is used.
+
+        Returns:
+            False if the frame was dropped by the motion gate of the source, True otherwise.
+        """
+        with self._lock:
+            source = self._sources[name]
+            frame_index = source.next_index
+            source.next_index += 1
+        return self._enqueue(
+            source,
+            frame_index,
+            time.time() if timestamp is None else timestamp,
+            frame if isinstance(frame, FrameContext) else FrameContext(frame),
+        )
+
+    def _enqueue(
+        self, source: _Source, frame_index: int, timestamp: float, context: FrameContext
+    ) -> bool:
+        # The motion gate is cheap, so it runs right away instead of in the batch
+        if source.motion_gate is not None and not source.motion_gate.should_process(
+            context, timestamp
+        ):
+            with self._lock:
+                source.stats["skipped_motion"] += 1
+            return False
+        with self._lock:
+            if source.pending is not None:
+                source.stats["superseded"] += 1
+            source.pending = (frame_index, timestamp, context)
+        return True
+
+    def _poll_readers(self) -> None:
+        with self._lock:
+            readers = [
+                (source, source.reader)
+                for source in self._sources.values()
+                if source.reader is not None
+            ]
+        for source, reader in readers:
+            # Readers keep the latest frame only, so this never blocks
+            item = reader.read(timeout=0)
+            if item is not None:
+                frame_index, timestamp, frame = item
+                self._enqueue(source, frame_index, timestamp, FrameContext(frame))
+            elif reader.error is not None and not source.error_logged:
+                # A failed source would otherwise look like one that ended
+                LOGGER.error("Video source %s failed: %s", source.name, reader.error)
+                source.error_logged = True
+
+    def _select(self, now: float) -> list[tuple[_Source, tuple[int, float, FrameContext]]]:
+        # Drop stale frames, then order the sources with a waiting frame: the ones behind their
+        # minimum FPS first (most overdue first), then by priority times the time since served
+        with self._lock:
+            waiting: list[tuple[_Source, tuple[int, float, FrameContext]]] = []
+            for source in self._sources.values():
+                pending = source.pending
+                if pending is None:
+                    continue
+                max_age = (
+                    self.max_frame_age if source.max_frame_age is None else source.max_frame_age
+                )
+                if max_age is not None and now - pending[1] > max_age:
+                    source.pending = None
+                    source.stats["dropped_stale"] += 1
+                    continue
+                waiting.append((source, pending))
+
+            def urgency(item: tuple[_Source, tuple[int, float, FrameContext]]) -> tuple[float, ...]:
+                source = item[0]
+                wait = now - source.last_served
+                overdue = wait * source.min_fps
+                return (overdue if overdue >= 1 else 0.0, source.priority * wait)
+
+            waiting.sort(key=urgency, reverse=True)
+
+            selected: list[tuple[_Source, tuple[int, float, FrameContext]]] = []
+            oldest = now
+            for source, pending in waiting[: self.max_batch_size]:
+                oldest = min(oldest, pending[1])
+                # Every frame added to the batch delays the results of all of them
+                if (
+                    selected
+                    and self.frame_cost is not None
+                    and now - oldest + (len(selected) + 1) * self.frame_cost > self.latency_budget
+                ):
+                    break
+                source.pending = None
+                selected.append((source, pending))
+            return selected
+
+    def step(self, now: float | None = None) -> list[StreamFrame]:
+        """
+        Pick up new frames from the sources, and run a batch of them through ALPR.
+
+        Parameters:
+            now: Current time (seconds since the epoch) used to schedule the batch. If None, the
+                current time is used.
+
+        Returns:
+            The StreamFrame of every processed frame, also passed to `callback`. Empty if no frame
+            was waiting.
+        """
+        self._poll_readers()
+        now = time.time() if now is None else now
+        selected = self._select(now)
+        if not selected:
+            return []
+
+        start = time.perf_counter()
+        frames_results = self._infer(selected)
+        elapsed = time.perf_counter() - start
+        cost = elapsed / len(selected)
+        self.frame_cost = (
+            cost
+            if self.frame_cost is None
+            else (1 - _COST_SMOOTHING) * self.frame_cost + _COST_SMOOTHING * cost
+        )
+
+        done = now + elapsed
+        stream_frames = []
+        with self._lock:
+            for source, (frame_index, timestamp, context) in selected:
+                source.last_served = now
+                source.stats["processed"] += 1
+                source.stats["latency_sum"] += done - timestamp
+                stream_frames.append(
+                    StreamFrame(
+                        frame_index=frame_index,
+                        timestamp=timestamp,
+                        results=frames_results[source.name],
+                        frame=context.image,
+                        context=context,
+                        source=source.name,
+                    )
+                )
+        if self.callback is not None:
+            for stream_frame in stream_frames:
+                self.callback(stream_frame)
+        return stream_frames
+
+    def _infer(
+        self, selected: list[tuple[_Source, tuple[int, float, FrameContext]]]
+    ) -> dict[str, list[ALPRResult]]:
+        # Sources without a tracker are run as a single batch, the others one at a time
+        batched = [
+            (source, context) for source, (_, _, context) in selected if source.tracker is None
+        ]
+        frames_results: dict[str, list[ALPRResult]] = {}
+        if batched:
+            batch_results = self.alpr.predict_many(
+                [context for _, context in batched], rois=[source.rois for source, _ in batched]
+            )
+            for (source, _), results in zip(batched, batch_results, strict=True):
+                frames_results[source.name] = results
+        for source, (_, _, context) in selected:
+            if source.tracker is not None:
+                frames_results[source.name] = self.alpr.track(
+                    context, source.tracker, rois=source.rois
+                )
+        return frames_results
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Counters of every source.
+
+        Returns:
+            For each source, the number of frames `processed`, `dropped_stale` (waited longer than
+            `max_frame_age`), `superseded` (replaced by a newer frame before being scheduled) and
+            `skipped_motion` (dropped by the motion gate), the `mean_latency` (seconds) from
+            capture to results of the processed frames, and the `error` that finished the reader
+            of a source decoded in the background (see `FrameReader.error`), if any.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "processed": source.stats["processed"],
+                    "dropped_stale": source.stats["dropped_stale"],
+                    "superseded": source.stats["superseded"],
+                    "skipped_motion": source.stats["skipped_motion"],
+                    "mean_latency": (
+                        source.stats["latency_sum"] / source.stats["processed"]
+                        if source.stats["processed"]
+                        else 0.0
+                    ),
+                    "error": source.reader.error if source.reader is not None else None,
+                }
+                for name, source in self._sources.items()
+            }
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether every source decoded in the background ended (see `FrameReader.finished`) and all
+        their frames were processed or dropped. Always False with sources fed by `submit`, or
+        without any source.
+        """
+        with self._lock:
+            return bool(self._sources) and all(
+                source.reader is not None and source.reader.finished and source.pending is None
+                for source in self._sources.values()
+            )
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the background thread started by `start` is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "CameraScheduler":
+        """
+        Start decoding the sources and processing their frames in a background thread. A stopped
+        scheduler can't be started again.
+        """
+        with self._lock:
+            if self._thread is not None:
+                raise RuntimeError("The scheduler was already started")
+            # Sources added from now on start their own reader
+            self._thread = threading.Thread(
+                target=self._run, daemon=True, name="fast-alpr-scheduler"
+            )
+            for source in self._sources.values():
+                if source.reader is not None:
+                    source.reader.start()
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the background thread and the decoding of the sources.
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join()
+        with self._lock:
+            readers = [source.reader for source in self._sources.values() if source.reader]
+        for reader in readers:
+            reader.stop()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                processed = self.step()
+            except Exception:  # pylint: disable=broad-except
+                # A failing frame (or callback) shouldn't stop the other cameras
+                LOGGER.exception("Failed to process a batch of frames")
+                processed = []
+            if not processed:
+                self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,360 @@
+"""
+ONNX Runtime session utilities.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import pathlib
+import platform
+import queue
+import threading
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Generic, Literal, TypeVar
+
+import onnxruntime as ort
+
+T = TypeVar("T")
+
+LOGGER = logging.getLogger(__name__)
+
+
+def default_intra_op_num_threads(num_sessions: int) -> int:
+    """
+    Number of intra-op threads to give each session so that `num_sessions` sessions running at the
+    same time share the available CPU cores without oversubscribing them.
+
+    Parameters:
+        num_sessions: Number of sessions that run concurrently.
+
+    Returns:
+        The number of intra-op threads per session (at least 1).
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, num_sessions))
+
+
+def pooled_session_options(num_sessions: int) -> ort.SessionOptions:
+    """
+    Build the session options used by each of the sessions of a pool of `num_sessions` sessions.
+
+    Parameters:
+        num_sessions: Number of sessions in the pool.
+
+    Returns:
+        Session options with `intra_op_num_threads` tuned for the pool size.
+    """
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = default_intra_op_num_threads(num_sessions)
+    return sess_options
+
+
+SessionProfileName = Literal["latency", "throughput", "low-memory"]
+
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+_EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+@dataclass(frozen=True)
+class SessionProfile:  # pylint: disable=too-many-instance-attributes
+    """
+    Named set of ONNX Runtime session settings, used to build the `ort.SessionOptions` of the
+    detector and OCR sessions.
+
+    Profiles only hold plain values, so they can be stored in a config file with `to_dict` and
+    loaded back with `from_dict`. Thread counts left as None are derived from the host's core count
+    when the options are built. See `SESSION_PROFILES` for the named profiles.
+    """
+
+    name: str
+    intra_op_num_threads: int | None = None
+    """Threads used inside each operator. If None, the CPU cores are split evenly between all the
+    sessions that run at the same time."""
+    inter_op_num_threads: int = 1
+    """Threads used to run independent operators in parallel, with the "parallel" mode."""
+    execution_mode: Literal["sequential", "parallel"] = "sequential"
+    graph_optimization_level: Literal["disable", "basic", "extended", "all"] = "all"
+    enable_mem_pattern: bool = True
+    """Pre-allocate memory based on the shapes seen in previous runs."""
+    enable_cpu_mem_arena: bool = True
+    """Keep freed CPU memory in an arena for later runs, instead of returning it to the system."""
+    allow_spinning: bool = True
+    """Whether idle intra-op threads busy-wait for work. Lowers latency, but burns CPU that other
+    sessions or processes could use."""
+    config_entries: dict[str, str] = field(default_factory=dict)
+    """Extra session config entries (see `ort.SessionOptions.add_session_config_entry`)."""
+
+    def session_options(self, num_sessions: int = 1) -> ort.SessionOptions:
+        """
+        Build the session options of the profile.
+
+        Parameters:
+            num_sessions: Number of sessions that run at the same time (in all threads and
+                processes), used to split the CPU cores when `intra_op_num_threads` is None.
+
+        Returns:
+            The session options of each of the sessions.
+        """
+        sess_options = ort.SessionOptions()
+        sess_options.intra_op_num_threads = (
+            default_intra_op_num_threads(num_sessions)
+            if self.intra_op_num_threads is None
+            else self.intra_op_num_threads
+        )
+        sess_options.inter_op_num_threads = self.inter_op_num_threads
+        sess_options.execution_mode = _EXECUTION_MODES[self.execution_mode]
+        sess_options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS[
+            self.graph_optimization_level
+        ]
+        sess_options.enable_mem_pattern = self.enable_mem_pattern
+        sess_options.enable_cpu_mem_arena = self.enable_cpu_mem_arena
+        spinning = "1" if self.allow_spinning else "0"
+        sess_options.add_session_config_entry("session.intra_op.allow_spinning", spinning)
+        sess_options.add_session_config_entry("session.inter_op.allow_spinning", spinning)
+        for key, value in self.config_entries.items():
+            sess_options.add_session_config_entry(key, value)
+        return sess_options
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Plain dictionary of the profile settings, i.e. to store it as JSON or YAML.
+        """
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SessionProfile":
+        """
+        Create a profile from a dictionary, as returned by `to_dict`. If it has a `base` key, the
+        settings override the ones of that named profile.
+        """
+        data = dict(data)
+        base = data.pop("base", None)
+        if base is not None:
+            return dataclasses.replace(get_session_profile(base), **data)
+        return cls(**data)
+
+
+SESSION_PROFILES: dict[str, SessionProfile] = {
+    "latency": SessionProfile(name="latency"),
+    "throughput": SessionProfile(name="throughput", allow_spinning=False),
+    "low-memory": SessionProfile(
+        name="low-memory",
+        intra_op_num_threads=1,
+        enable_mem_pattern=False,
+        enable_cpu_mem_arena=False,
+        allow_spinning=False,
+    ),
+}
+"""Named session profiles.
+
+- `latency`: Every core (split between concurrent sessions) works on each run, and idle threads
+  spin so they pick up work immediately. Best for a single stream and `predict`.
+- `throughput`: Same threads, but idle threads sleep instead of spinning, so many sessions, workers
+  or `predict_many` batches running at once don't steal CPU from each other. Best with
+  `num_sessions` > 1 or `ALPRPool`.
+- `low-memory`: A single thread per session, without the memory arena or pre-allocated memory
+  patterns. Best for small devices and many idle cameras, at the cost of speed.
+"""
+
+
+def get_session_profile(profile: SessionProfile | SessionProfileName | str) -> SessionProfile:
+    """
+    Resolve a session profile given by name.
+
+    Parameters:
+        profile: A SessionProfile, or the name of one of the `SESSION_PROFILES`.
+
+    Returns:
+        The session profile.
+    """
+    if isinstance(profile, SessionProfile):
+        return profile
+    if profile not in SESSION_PROFILES:
+        raise ValueError(
+            f"Unknown session profile '{profile}'. Use one of {tuple(SESSION_PROFILES)}"
+        )
+    return SESSION_PROFILES[profile]
+
+
+def optimized_model_path(
+    cache_dir: str | os.PathLike,
+    model_path: str | os.PathLike,
+    providers: Sequence[str | tuple[str, dict]],
+    sess_options: ort.SessionOptions,
+) -> pathlib.Path:
+    """
+    Path of the optimized copy of a model in a graph cache directory.
+
+    Optimized graphs can contain provider specific nodes, so the cache is versioned by ONNX Runtime
+    version and execution providers, and entries are keyed by the model name, the model file (size
+    and modification time, so re-downloaded models are optimized again), the serialized
+    optimization level and the CPU architecture. Graphs are serialized at `ORT_ENABLE_EXTENDED` at
+    most (see `create_with_graph_cache`), so the `ORT_ENABLE_ALL` level shares its entries.
+
+    Parameters:
+        cache_dir: Root directory of the cache.
+        model_path: Path of the original ONNX model.
+        providers: Execution providers of the session.
+        sess_options: Session options of the session.
+
+    Returns:
+        The path of the optimized model, which may not exist yet.
+    """
+    model_path = pathlib.Path(model_path)
+    stat = model_path.stat()
+    provider_names = [
+        provider if isinstance(provider, str) else provider[0] for provider in providers
+    ]
+    key = hashlib.sha256(
+        repr(
+            (
+                str(model_path.resolve()),
+                stat.st_size,
+                stat.st_mtime_ns,
+                min(
+                    int(sess_options.graph_optimization_level),
+                    int(ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED),
+                ),
+                platform.machine(),
+            )
+        ).encode()
+    ).hexdigest()[:16]
+    return (
+        pathlib.Path(cache_dir).expanduser()
+        / f"onnxruntime-{ort.__version__}"
+        / "-".join(provider_names)
+        / f"{model_path.stem}-{key}.onnx"
+    )
+
+
+@contextmanager
+def _patched_options(sess_options: ort.SessionOptions, **attributes: Any) -> Iterator[None]:
+    # Temporarily set attributes of the session options, which belong to the caller
+    previous = {name: getattr(sess_options, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(sess_options, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(sess_options, name, value)
+
+
+def create_with_graph_cache(
+    create: Callable[[pathlib.Path, ort.SessionOptions], T],
+    model_path: str | os.PathLike,
+    providers: Sequence[str | tuple[str, dict]],
+    sess_options: ort.SessionOptions | None,
+    cache_dir: str | os.PathLike,
+) -> T:
+    """
+    Create a model instance, reusing the graph optimizations of a previous run if they are cached.
+
+    On a cache miss, ONNX Runtime writes the optimized graph to the cache. Only the optimizations
+    up to `ORT_ENABLE_EXTENDED` are serialized, since `ORT_ENABLE_ALL` adds layout transformations
+    for the instruction set of the local CPU, and the cache can be shared between hosts. Cached
+    graphs are then loaded with graph optimizations disabled, or with `ORT_ENABLE_ALL` (which only
+    has the layout transformations left to apply) if that level was asked for. Concurrent
+    processes filling the same entry don't clash, since each one writes a temporary file that is
+    atomically renamed. If the cache can't be written, the instance is created without it.
+
+    Parameters:
+        create: Creates the instance from a model path and session options.
+        model_path: Path of the original ONNX model.
+        providers: Execution providers of the session, used as part of the cache key.
+        sess_options: Session options of the session. They are temporarily modified while the
+            instance is created. If None, default session options are used.
+        cache_dir: Root directory of the cache.
+
+    Returns:
+        The created instance.
+    """
+    sess_options = sess_options or ort.SessionOptions()
+    extended = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    hardware_specific = int(sess_options.graph_optimization_level) > int(extended)
+    cached_path = optimized_model_path(cache_dir, model_path, providers, sess_options)
+
+    if not cached_path.exists():
+        tmp_path = cached_path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            with _patched_options(
+                sess_options,
+                optimized_model_filepath=str(tmp_path),
+                graph_optimization_level=(
+                    extended if hardware_specific else sess_options.graph_optimization_level
+                ),
+            ):
+                instance = create(pathlib.Path(model_path), sess_options)
+            if tmp_path.exists():
+                os.replace(tmp_path, cached_path)
+        except Exception as e:  # pylint: disable=broad-except
+            # i.e. an unwritable cache directory, or providers with compiled nodes, which can't
+            # be serialized
+            LOGGER.warning("Could not cache the optimized graph of %s: %s", model_path, e)
+            return create(pathlib.Path(model_path), sess_options)
+        if not hardware_specific or not cached_path.exists():
+            return instance
+        # The instance lacks the hardware specific optimizations, load it again with them
+
+    with _patched_options(
+        sess_options,
+        graph_optimization_level=(
+            sess_options.graph_optimization_level
+            if hardware_specific
+            else ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        ),
+    ):
+        return create(cached_path, sess_options)
+
+
+class SessionPool(Generic[T]):
+    """
+    Pool of model instances (each one owning its own ONNX Runtime session) that hands a free
+    instance to each calling thread.
+
+    With a single instance no locking is done at all, since `ort.InferenceSession.run` can be
+    called concurrently. With more instances, each caller gets exclusive use of one of them and
+    blocks until one is free if all are busy.
+    """
+
+    def __init__(self, instances: Sequence[T]) -> None:
+        """
+        Initialize the pool.
+
+        Parameters:
+            instances: Model instances the pool hands out.
+        """
+        if not instances:
+            raise ValueError("SessionPool requires at least one instance")
+        self.instances: list[T] = list(instances)
+        self._free: queue.SimpleQueue[T] = queue.SimpleQueue()
+        for instance in self.instances:
+            self._free.put(instance)
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    @contextmanager
+    def acquire(self) -> Iterator[T]:
+        """
+        Borrow an instance from the pool for the duration of the `with` block.
+        """
+        if len(self.instances) == 1:
+            yield self.instances[0]
+            return
+        instance = self._free.get()
+        try:
+            yield instance
+        finally:
+            self._free.put(instance)
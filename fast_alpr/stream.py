@@ -0,0 +1,226 @@
+"""
+Video stream reading module.
+"""
+
+import contextlib
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from fast_alpr.decoders import OpenCVDecoder, OpenedSource, VideoDecoder
+
+LOGGER = logging.getLogger(__name__)
+
+LIVE_SCHEMES: tuple[str, ...] = ("rtsp", "rtsps", "rtmp", "http", "https", "udp", "tcp", "srt")
+"""URL schemes of sources treated as live streams."""
+
+
+def is_live_source(source: str | int) -> bool:
+    """
+    Whether a video source is a live stream (camera index or network URL) rather than a file.
+
+    Parameters:
+        source: Camera index, stream URL or video file path.
+
+    Returns:
+        True if the source is live.
+    """
+    if isinstance(source, int):
+        return True
+    scheme, sep, _ = source.partition("://")
+    return bool(sep) and scheme.lower() in LIVE_SCHEMES
+
+
+class FrameReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Decodes a video source in a background thread.
+
+    For live sources, only the latest decoded frame is kept (latest-wins dropping), so a slow
+    consumer always gets the most recent frame instead of an ever-growing backlog. For video files
+    no frame is dropped by default, and the decoding thread waits for the consumer instead. Live
+    sources are re-opened with exponential backoff when the connection fails or is lost.
+    """
+
+    def __init__(
+        self,
+        source: str | int,
+        frame_stride: int = 1,
+        drop_frames: bool | None = None,
+        reconnect: bool | None = None,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        decoder: VideoDecoder | None = None,
+    ) -> None:
+        """
+        Initialize the reader. Decoding doesn't start until `start` is called.
+
+        Parameters:
+            source: Camera index, stream URL or video file path.
+            frame_stride: Only every `frame_stride`-th decoded frame is handed to the consumer.
+            drop_frames: Whether to keep only the latest frame. Defaults to True for live sources
+                and False for video files.
+            reconnect: Whether to re-open the source when it fails or ends. Defaults to True for
+                live sources and False for video files.
+            initial_backoff: Seconds to wait before the first reconnection attempt.
+            max_backoff: Maximum seconds to wait between reconnection attempts.
+            decoder: Decodes the source. If None, an OpenCVDecoder with the default settings is
+                used. See `fast_alpr.decoders`.
+        """
+        if frame_stride < 1:
+            raise ValueError(f"frame_stride must be at least 1, got {frame_stride}")
+        self.decoder = decoder or OpenCVDecoder()
+        # Errors that retrying can't fix are raised here rather than in the background thread
+        self.decoder.check(source)
+        live = is_live_source(source)
+        self.source = source
+        self.frame_stride = frame_stride
+        self.drop_frames = live if drop_frames is None else drop_frames
+        self.reconnect = live if reconnect is None else reconnect
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.dropped_frames = 0
+        """Number of frames overwritten by a newer one before being consumed."""
+        self.error: Exception | None = None
+        """The error that finished the reader, if any: an unexpected error opening the source, or
+        a decoding error of a source that isn't re-opened."""
+
+        # Latest-wins slot, used when dropping frames
+        self._latest: tuple[int, float, np.ndarray] | None = None
+        self._condition = threading.Condition()
+        # Bounded queue, used when every frame must be consumed
+        self._queue: queue.Queue[tuple[int, float, np.ndarray] | None] = queue.Queue(maxsize=2)
+        self._finished = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fast-alpr-reader")
+
+    def start(self) -> "FrameReader":
+        """
+        Start decoding in the background thread.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop decoding and wait for the background thread to finish.
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the source ended (and won't be re-opened) and every frame was consumed.
+        """
+        if self.drop_frames:
+            with self._condition:
+                return self._finished and self._latest is None
+        return self._finished
+
+    def read(self, timeout: float | None = None) -> tuple[int, float, np.ndarray] | None:
+        """
+        Get the next frame.
+
+        Parameters:
+            timeout: Maximum seconds to wait for a frame. If None, wait until one is available.
+
+        Returns:
+            A `(frame_index, timestamp, frame)` tuple, or None once the source ended (or the
+            timeout expired). If it ended because of an error, it is in `error`.
+        """
+        if not self.drop_frames:
+            if self._finished:
+                return None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return None
+            if item is None:
+                self._finished = True
+            return item
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._latest is not None or self._finished or self._stop_event.is_set(),
+                timeout=timeout,
+            ):
+                return None
+            item, self._latest = self._latest, None
+            return item
+
+    def _publish(self, item: tuple[int, float, np.ndarray] | None) -> None:
+        if self.drop_frames:
+            with self._condition:
+                if item is None:
+                    self._finished = True
+                else:
+                    if self._latest is not None:
+                        self.dropped_frames += 1
+                    self._latest = item
+                self._condition.notify_all()
+            return
+        # Wait for the consumer, checking regularly whether the reader was stopped
+        while not self._stop_event.is_set():
+            with contextlib.suppress(queue.Full):
+                self._queue.put(item, timeout=0.1)
+                return
+
+    def _open(self) -> OpenedSource | None:
+        try:
+            return self.decoder.open(self.source, is_live_source(self.source))
+        except OSError as e:
+            LOGGER.warning("Failed to open video source %s: %s", self.source, e)
+        except Exception as e:  # pylint: disable=broad-except
+            # Not a connection problem, so re-opening won't help
+            LOGGER.error("Failed to open video source %s: %s", self.source, e)
+            self.error = e
+        return None
+
+    def _decode(self, opened: OpenedSource, frame_index: int) -> int:
+        # Decode until the source ends, fails or the reader is stopped, returning the next frame
+        # index
+        try:
+            while not self._stop_event.is_set():
+                # Frames that aren't handed to the consumer are not converted
+                if frame_index % self.frame_stride == 0:
+                    frame = opened.read()
+                    if frame is None:
+                        break
+                    self._publish((frame_index, time.time(), frame))
+                elif not opened.skip():
+                    break
+                frame_index += 1
+        except Exception as e:  # pylint: disable=broad-except
+            if self.reconnect:
+                # i.e. a lost live stream, which is re-opened
+                LOGGER.warning("Failed to decode video source %s: %s", self.source, e)
+            else:
+                # i.e. a corrupted file, which shouldn't look like it ended normally
+                LOGGER.error("Failed to decode video source %s: %s", self.source, e)
+                self.error = e
+        finally:
+            opened.close()
+        return frame_index
+
+    def _run(self) -> None:
+        frame_index = 0
+        backoff = self.initial_backoff
+        try:
+            while not self._stop_event.is_set():
+                opened = self._open()
+                if opened is not None:
+                    start_index, frame_index = frame_index, self._decode(opened, frame_index)
+                    if frame_index > start_index:
+                        backoff = self.initial_backoff
+                if not self.reconnect or self.error is not None:
+                    break
+                LOGGER.warning("Lost video source %s, retrying in %.1fs", self.source, backoff)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        finally:
+            self._publish(None)
@@ -0,0 +1,137 @@
+"""
+Tiled detection module.
+"""
+
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+from fast_alpr.base import BaseDetector, DetectionResult
+from fast_alpr.utils import non_max_suppression
+
+
+def tile_offsets(length: int, tile_size: int, overlap: float) -> list[int]:
+    """
+    Start offsets of the tiles covering one dimension of a frame.
+
+    Parameters:
+        length: Size of the frame dimension, in pixels.
+        tile_size: Size of the tiles, in pixels.
+        overlap: Minimum overlap between consecutive tiles, as a fraction of `tile_size`.
+
+    Returns:
+        Offsets of the tiles, evenly spread so the first one starts at 0 and the last one ends at
+        `length`.
+    """
+    if length <= tile_size:
+        return [0]
+    stride = tile_size * (1 - overlap)
+    num_tiles = math.ceil((length - tile_size) / stride) + 1
+    return [round(idx * (length - tile_size) / (num_tiles - 1)) for idx in range(num_tiles)]
+
+
+class TiledDetector(BaseDetector):
+    """
+    Detector wrapper that runs another detector on overlapping tiles of the frame.
+
+    Small plates in high resolution frames (i.e. 4K overview cameras) vanish once the whole frame
+    is resized to the detector input size. Running the detector on tiles keeps them at (close to)
+    their original resolution. All the tiles of all the frames are passed to the wrapped detector
+    as a single batch, boxes are mapped back to full-frame coordinates, and plates found in more
+    than one tile are merged with Non-Maximum Suppression.
+    """
+
+    def __init__(
+        self,
+        detector: BaseDetector,
+        tile_size: int = 640,
+        overlap: float = 0.2,
+        include_full_frame: bool = True,
+        nms_threshold: float = 0.5,
+    ) -> None:
+        """
+        Initialize the TiledDetector.
+
+        Parameters:
+            detector: The detector run on each tile.
+            tile_size: Width and height of the tiles, in pixels. Frames smaller than a tile are not
+                split along that dimension.
+            overlap: Minimum overlap between consecutive tiles, as a fraction of `tile_size`. It
+                should be larger than the plates, so every plate fits entirely in at least one tile.
+            include_full_frame: Whether to also run the detector on the whole frame, to find plates
+                too large for a single tile.
+            nms_threshold: Overlap threshold used to merge boxes. It is computed as the
+                intersection over the smaller box's area, so a plate cut by a tile border is merged
+                with the box of the tile that contains it whole, and the merged detection gets the
+                box enclosing both.
+        """
+        if tile_size < 1:
+            raise ValueError(f"tile_size must be at least 1, got {tile_size}")
+        if not 0 <= overlap < 1:
+            raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.include_full_frame = include_full_frame
+        self.nms_threshold = nms_threshold
+
+    def tiles(self, frame: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """
+        Returns the `(x1, y1, x2, y2)` rectangles of the tiles covering the frame.
+        """
+        height, width = frame.shape[:2]
+        return [
+            (x1, y1, min(x1 + self.tile_size, width), min(y1 + self.tile_size, height))
+            for y1 in tile_offsets(height, self.tile_size, self.overlap)
+            for x1 in tile_offsets(width, self.tile_size, self.overlap)
+        ]
+
+    def warmup(self, batch_sizes: Sequence[int], frame_shape: tuple[int, int]) -> None:
+        """
+        Warm up the wrapped detector for the number of tiles that frames of `frame_shape` (height,
+        width) are split into.
+        """
+        num_tiles = len(self.tiles(np.empty((*frame_shape, 0), dtype=np.uint8)))
+        if self.include_full_frame and num_tiles > 1:
+            num_tiles += 1
+        tile_shape = (min(frame_shape[0], self.tile_size), min(frame_shape[1], self.tile_size))
+        self.detector.warmup([batch_size * num_tiles for batch_size in batch_sizes], tile_shape)
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:
+        """
+        Perform tiled detection on the input frame and return a list of detections.
+        """
+        return self.predict_batch([frame])[0]
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        """
+        Perform tiled detection on multiple frames, running every tile through a single call of
+        the wrapped detector.
+        """
+        inputs: list[np.ndarray] = []
+        owners: list[tuple[int, int, int]] = []
+        for idx, frame in enumerate(frames):
+            tiles = self.tiles(frame)
+            if self.include_full_frame and len(tiles) > 1:
+                tiles.append((0, 0, frame.shape[1], frame.shape[0]))
+            for x1, y1, x2, y2 in tiles:
+                inputs.append(frame[y1:y2, x1:x2])
+                owners.append((idx, x1, y1))
+
+        frames_detections: list[list[DetectionResult]] = [[] for _ in frames]
+        for (idx, dx, dy), detections in zip(
+            owners, self.detector.predict_batch(inputs), strict=True
+        ):
+            frames_detections[idx].extend(
+                DetectionResult(
+                    label=detection.label,
+                    confidence=detection.confidence,
+                    bounding_box=detection.bounding_box.translate(dx, dy),
+                )
+                for detection in detections
+            )
+        return [
+            non_max_suppression(detections, self.nms_threshold, metric="ios")
+            for detections in frames_detections
+        ]
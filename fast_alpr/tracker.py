@@ -0,0 +1,256 @@
+"""
+Plate tracking module.
+"""
+
+import itertools
+import math
+import statistics
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from fast_alpr.base import BoundingBox, DetectionResult, OcrResult
+from fast_alpr.voting import PlateVoter
+
+
+@dataclass(frozen=True)
+class CropQuality:
+    """
+    How much detail a plate crop has, used to decide whether it's worth re-running OCR.
+    """
+
+    area: int
+    """Area of the crop, in pixels."""
+    sharpness: float
+    """Variance of the Laplacian of the grayscale crop. Higher is sharper."""
+
+    @classmethod
+    def measure(cls, crop: np.ndarray) -> "CropQuality":
+        """
+        Measure the quality of a plate crop (Colors in order: BGR, or grayscale).
+        """
+        if crop.size == 0:
+            return cls(area=0, sharpness=0.0)
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        return cls(
+            area=crop.shape[0] * crop.shape[1],
+            sharpness=float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+        )
+
+
+def mean_confidence(ocr_result: OcrResult | None) -> float:
+    """
+    Returns the confidence of an OCR result as a single number, averaging per-character ones.
+    """
+    if ocr_result is None:
+        return 0.0
+    if isinstance(ocr_result.confidence, list):
+        return statistics.mean(ocr_result.confidence) if ocr_result.confidence else 0.0
+    return ocr_result.confidence
+
+
+@dataclass
+class Track:  # pylint: disable=too-many-instance-attributes
+    """
+    A license plate followed across consecutive frames.
+    """
+
+    track_id: int
+    """Stable identifier of the track."""
+    bounding_box: BoundingBox
+    """Bounding box in the last frame the plate was seen."""
+    hits: int = 1
+    """Number of frames the plate was seen in."""
+    misses: int = 0
+    """Number of consecutive frames the plate was not seen in."""
+    ocr: OcrResult | None = None
+    """Most confident OCR result so far."""
+    ocr_quality: CropQuality | None = None
+    """Quality of the crop OCR last ran on."""
+    ocr_calls: int = 0
+    """Number of times OCR ran on the track."""
+    finalized: bool = False
+    """Whether `ocr` is the finalized consensus read of the tracker's voter."""
+
+
+class PlateTracker:  # pylint: disable=too-many-instance-attributes
+    """
+    Lightweight IoU/centroid tracker assigning stable track IDs to license plate detections.
+
+    The same plate shows up in many consecutive video frames. With a tracker, `ALPR.track` (and
+    `ALPR.stream`) run OCR only on new tracks, or when a track's crop gets noticeably larger or
+    sharper than the one OCR last ran on. Otherwise the most confident read so far is reused.
+
+    Detections are matched to tracks greedily by IoU, and then by the distance between their
+    centers (relative to the track's box diagonal) for fast moving plates. A tracker keeps
+    per-source state, so use one instance per camera. It is not thread-safe.
+
+    With a `PlateVoter`, OCR keeps running on a track until the voter finalizes its consensus read,
+    and then stops for good. Tracks the voter can't finalize (i.e. occluded or unreadable plates)
+    only get `max_voter_reads` reads this way, and then fall back to the larger or sharper crop
+    rule.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_center_distance: float = 1.0,
+        max_age: int = 15,
+        min_area_gain: float = 1.3,
+        min_sharpness_gain: float = 1.3,
+        voter: PlateVoter | None = None,
+        max_voter_reads: int | None = None,
+    ) -> None:
+        """
+        Initialize the PlateTracker.
+
+        Parameters:
+            iou_threshold: Minimum IoU between a detection and a track's last box to match them.
+            max_center_distance: Maximum distance between the centers of a detection and a track's
+                last box to match them when their IoU is too low, relative to the box diagonal.
+            max_age: Number of consecutive frames a plate can be missing before its track ends.
+            min_area_gain: OCR runs again when the crop area grows by this factor.
+            min_sharpness_gain: OCR runs again when the crop sharpness grows by this factor.
+            voter: Optional PlateVoter combining the reads of each track. Its plates are keyed by
+                track ID.
+            max_voter_reads: Maximum number of reads of a track OCR runs on every frame while
+                waiting for the voter to finalize it. Defaults to the voter's `max_reads`.
+        """
+        if max_voter_reads is not None and max_voter_reads < 1:
+            raise ValueError(f"max_voter_reads must be at least 1, got {max_voter_reads}")
+        self.iou_threshold = iou_threshold
+        self.max_center_distance = max_center_distance
+        self.max_age = max_age
+        self.min_area_gain = min_area_gain
+        self.min_sharpness_gain = min_sharpness_gain
+        self.voter = voter
+        self.max_voter_reads = (
+            max_voter_reads if max_voter_reads is not None or voter is None else voter.max_reads
+        )
+        self.tracks: dict[int, Track] = {}
+        """Active tracks, by track ID."""
+        self._track_ids = itertools.count(1)
+
+    def reset(self) -> None:
+        """
+        Forget all the tracks, i.e. after a camera cut.
+        """
+        if self.voter is not None:
+            for track_id in self.tracks:
+                self.voter.discard(track_id)
+        self.tracks.clear()
+
+    def update(self, detections: list[DetectionResult]) -> list[Track]:
+        """
+        Match the detections of a new frame with the active tracks.
+
+        Parameters:
+            detections: Detections of the frame.
+
+        Returns:
+            The track of each detection, in the same order. Unmatched detections start new tracks.
+        """
+        assigned: list[Track | None] = [None] * len(detections)
+        free = dict(self.tracks)
+
+        # Greedy matching, best IoU first
+        pairs = sorted(
+            (
+                (detection.bounding_box.iou(track.bounding_box), idx, track_id)
+                for idx, detection in enumerate(detections)
+                for track_id, track in free.items()
+            ),
+            reverse=True,
+        )
+        for iou, idx, track_id in pairs:
+            if iou < self.iou_threshold:
+                break
+            if assigned[idx] is None and track_id in free:
+                assigned[idx] = free.pop(track_id)
+
+        # Fall back to the center distance for plates that moved too much for the IoU
+        for idx, detection in enumerate(detections):
+            if assigned[idx] is not None or not free:
+                continue
+            distance, track_id = min(
+                (self._center_distance(detection.bounding_box, track.bounding_box), track_id)
+                for track_id, track in free.items()
+            )
+            if distance <= self.max_center_distance:
+                assigned[idx] = free.pop(track_id)
+
+        tracks: list[Track] = []
+        for detection, matched in zip(detections, assigned, strict=True):
+            if matched is None:
+                track = Track(track_id=next(self._track_ids), bounding_box=detection.bounding_box)
+                self.tracks[track.track_id] = track
+            else:
+                track = matched
+                track.bounding_box = detection.bounding_box
+                track.hits += 1
+                track.misses = 0
+            tracks.append(track)
+
+        for track_id, track in free.items():
+            track.misses += 1
+            if track.misses > self.max_age:
+                del self.tracks[track_id]
+                if self.voter is not None:
+                    self.voter.discard(track_id)
+        return tracks
+
+    def needs_ocr(self, track: Track, quality: CropQuality) -> bool:
+        """
+        Whether OCR should run on a track's new crop.
+
+        Parameters:
+            track: The track, as returned by `update`.
+            quality: Quality of the track's crop in the current frame.
+
+        Returns:
+            True for tracks without an OCR result yet, or when the crop is noticeably larger or
+            sharper than the one OCR last ran on. With a voter, True until the track is finalized
+            or got `max_voter_reads` reads, and then only for larger or sharper crops.
+        """
+        if self.voter is not None:
+            if track.finalized:
+                return False
+            if self.max_voter_reads is None or track.ocr_calls < self.max_voter_reads:
+                return True
+            # The voter isn't converging, so only better crops are worth another read
+        elif track.ocr is None:
+            return True
+        if track.ocr_quality is None:
+            return True
+        return (
+            quality.area >= track.ocr_quality.area * self.min_area_gain
+            or quality.sharpness >= track.ocr_quality.sharpness * self.min_sharpness_gain
+        )
+
+    def record_ocr(self, track: Track, ocr_result: OcrResult | None, quality: CropQuality) -> None:
+        """
+        Store the OCR result of a track's crop, keeping the most confident read so far (or the
+        consensus read, once the voter finalizes it).
+
+        Parameters:
+            track: The track OCR ran on.
+            ocr_result: The OCR result of the crop.
+            quality: Quality of the crop.
+        """
+        track.ocr_calls += 1
+        track.ocr_quality = quality
+        if self.voter is not None and (final := self.voter.add(track.track_id, ocr_result)):
+            track.ocr = final
+            track.finalized = True
+            return
+        if ocr_result is not None and (
+            track.ocr is None or mean_confidence(ocr_result) >= mean_confidence(track.ocr)
+        ):
+            track.ocr = ocr_result
+
+    @staticmethod
+    def _center_distance(box: BoundingBox, other: BoundingBox) -> float:
+        (x, y), (other_x, other_y) = box.center, other.center
+        diagonal = math.hypot(other.x2 - other.x1, other.y2 - other.y1)
+        return math.hypot(x - other_x, y - other_y) / diagonal if diagonal > 0 else math.inf
@@ -0,0 +1,78 @@
+"""
+Utilities module.
+"""
+
+from typing import Literal
+
+import cv2
+import numpy as np
+
+from fast_alpr.base import BoundingBox, DetectionResult
+
+
+def load_image(frame: np.ndarray | str) -> np.ndarray:
+    """
+    Load an image from a path, or return the frame as is if it is already an array.
+
+    Parameters:
+        frame: Frame (Colors in order: BGR) or image path.
+
+    Returns:
+        The image as a NumPy array in BGR order.
+    """
+    if isinstance(frame, str):
+        img_path = frame
+        img = cv2.imread(img_path)
+        if img is None:
+            raise ValueError(f"Failed to load image from path: {img_path}")
+        return img
+    return frame
+
+
+def non_max_suppression(
+    detections: list[DetectionResult],
+    iou_threshold: float = 0.5,
+    metric: Literal["iou", "ios"] = "iou",
+) -> list[DetectionResult]:
+    """
+    Greedy Non-Maximum Suppression, used to merge duplicated detections of the same plate (i.e.
+    found in overlapping regions of the same frame).
+
+    Parameters:
+        detections: Detections of a single frame.
+        iou_threshold: Detections overlapping a more confident one by more than this threshold are
+            discarded.
+        metric: Overlap metric. "iou" is the Intersection-over-Union, and "ios" the intersection
+            over the smaller box's area, which also merges partial boxes of a plate (i.e. cut by a
+            tile border) with the full one. With "ios", the kept detection gets the box enclosing
+            the ones it suppresses, since the most confident box may be the partial one.
+
+    Returns:
+        The kept detections, sorted by decreasing confidence.
+    """
+
+    def overlap(box: BoundingBox, other: BoundingBox) -> float:
+        if metric == "iou":
+            return box.iou(other)
+        smaller_area = min(box.area, other.area)
+        return box.intersection_area(other) / smaller_area if smaller_area > 0 else 0.0
+
+    kept: list[DetectionResult] = []
+    for detection in sorted(detections, key=lambda d: d.confidence, reverse=True):
+        idx = next(
+            (
+                idx
+                for idx, other in enumerate(kept)
+                if overlap(detection.bounding_box, other.bounding_box) > iou_threshold
+            ),
+            None,
+        )
+        if idx is None:
+            kept.append(detection)
+        elif metric == "ios":
+            kept[idx] = DetectionResult(
+                label=kept[idx].label,
+                confidence=kept[idx].confidence,
+                bounding_box=kept[idx].bounding_box.union(detection.bounding_box),
+            )
+    return kept
@@ -0,0 +1,140 @@
+"""
+Temporal OCR voting module.
+"""
+
+from collections import defaultdict, deque
+from collections.abc import Hashable
+
+from fast_alpr.base import OcrResult
+
+
+def char_confidences(ocr_result: OcrResult) -> list[float]:
+    """
+    Returns the confidence of each character of an OCR result. When the result only has a single
+    confidence, or the per-character ones don't match the text, it's used for every character.
+    """
+    if isinstance(ocr_result.confidence, list):
+        if len(ocr_result.confidence) == len(ocr_result.text):
+            return ocr_result.confidence
+        confidence = (
+            sum(ocr_result.confidence) / len(ocr_result.confidence)
+            if ocr_result.confidence
+            else 0.0
+        )
+    else:
+        confidence = ocr_result.confidence
+    return [confidence] * len(ocr_result.text)
+
+
+def vote(ocr_results: list[OcrResult]) -> OcrResult | None:
+    """
+    Combine several reads of the same plate with per-character confidence-weighted voting.
+
+    The plate length is voted first, weighting each read by its mean confidence. Then, for each
+    position, the character with the highest summed confidence among the reads of that length wins.
+
+    Parameters:
+        ocr_results: Reads of the same plate.
+
+    Returns:
+        The consensus read, or None if there are no (non-empty) reads. The confidence of each
+        character is the summed confidence of the reads agreeing with it divided by the number of
+        reads of that length, so disagreement lowers it.
+    """
+    reads = [(r.text, char_confidences(r)) for r in ocr_results if r.text]
+    if not reads:
+        return None
+    length_weights: defaultdict[int, float] = defaultdict(float)
+    for read_text, read_confidences in reads:
+        length_weights[len(read_text)] += sum(read_confidences) / len(read_confidences)
+    length = max(length_weights, key=length_weights.__getitem__)
+    reads = [read for read in reads if len(read[0]) == length]
+
+    text = ""
+    confidences: list[float] = []
+    for position in range(length):
+        weights: defaultdict[str, float] = defaultdict(float)
+        for read_text, read_confidences in reads:
+            weights[read_text[position]] += read_confidences[position]
+        char = max(weights, key=weights.__getitem__)
+        text += char
+        confidences.append(weights[char] / len(reads))
+    return OcrResult(text=text, confidence=confidences)
+
+
+class PlateVoter:
+    """
+    Temporal consensus of the OCR reads of each plate (i.e. of each track).
+
+    Instead of acting on a single frame whose read is above a high threshold, reads of the same
+    plate are collected and combined with `vote`. One finalized read is emitted as soon as enough
+    evidence has built up, which allows lower per-frame thresholds and fewer frames per vehicle
+    without losing precision. Reads are grouped by a key, such as `ALPRResult.track_id`.
+    """
+
+    def __init__(
+        self, min_reads: int = 3, min_confidence: float = 0.8, max_reads: int = 10
+    ) -> None:
+        """
+        Initialize the PlateVoter.
+
+        Parameters:
+            min_reads: Minimum number of reads of a plate before its consensus can be finalized.
+            min_confidence: Minimum consensus confidence of every character to finalize a read.
+            max_reads: Maximum number of reads kept per plate. Older reads are discarded.
+        """
+        if min_reads < 1:
+            raise ValueError(f"min_reads must be at least 1, got {min_reads}")
+        if max_reads < min_reads:
+            raise ValueError(f"max_reads ({max_reads}) must be at least min_reads ({min_reads})")
+        self.min_reads = min_reads
+        self.min_confidence = min_confidence
+        self.max_reads = max_reads
+        self._reads: dict[Hashable, deque[OcrResult]] = {}
+        self._finalized: dict[Hashable, OcrResult] = {}
+
+    def add(self, key: Hashable, ocr_result: OcrResult | None) -> OcrResult | None:
+        """
+        Add a read of a plate.
+
+        Parameters:
+            key: Identifier of the plate, such as its track ID.
+            ocr_result: The new read. None and empty reads are ignored.
+
+        Returns:
+            The finalized read, only for the call that finalized it. None otherwise, including for
+            reads added after the plate was finalized.
+        """
+        if key in self._finalized or ocr_result is None or not ocr_result.text:
+            return None
+        reads = self._reads.setdefault(key, deque(maxlen=self.max_reads))
+        reads.append(ocr_result)
+        if len(reads) < self.min_reads:
+            return None
+        consensus = vote(list(reads))
+        if consensus is None or min(char_confidences(consensus)) < self.min_confidence:
+            return None
+        self._finalized[key] = consensus
+        del self._reads[key]
+        return consensus
+
+    def consensus(self, key: Hashable) -> OcrResult | None:
+        """
+        Returns the finalized read of a plate, or the current (not yet final) consensus.
+        """
+        if key in self._finalized:
+            return self._finalized[key]
+        return vote(list(self._reads.get(key, ())))
+
+    def is_finalized(self, key: Hashable) -> bool:
+        """
+        Whether the read of a plate was finalized.
+        """
+        return key in self._finalized
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Forget a plate, i.e. once its track ended.
+        """
+        self._reads.pop(key, None)
+        self._finalized.pop(key, None)
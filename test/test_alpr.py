@@ -2,15 +2,27 @@
 Test ALPR end-to-end.
 """
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Literal
 
 import cv2
 import numpy as np
 import pytest
+from fast_plate_ocr.core.process import resize_image
+from fast_plate_ocr.inference.config import PlateOCRConfig
 from fast_plate_ocr.inference.hub import OcrModel
 from open_image_models.detection.core.hub import PlateDetectorModel
 
-from fast_alpr.alpr import ALPR
+from fast_alpr.alpr import ALPR, ALPRResult
+from fast_alpr.base import BaseDetector, BaseOCR, BoundingBox, DetectionResult, OcrResult
+from fast_alpr.default_detector import DefaultDetector
+from fast_alpr.default_ocr import DefaultOCR, _resize_into
+from fast_alpr.metrics import record_timings
 
 ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
 
@@ -97,3 +109,449 @@ def test_draw_predictions(img_path: Path, alpr: ALPR) -> None:
 
     diff_path = cv2.absdiff(drawn_path, im)
     assert int(diff_path.sum()) > 0
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_render(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    original = im.copy()
+    results = alpr.predict(im)
+
+    rendered = alpr.render(im, results, copy=True)
+    assert np.array_equal(im, original)
+    assert np.array_equal(rendered, alpr.draw_predictions(original.copy()))
+
+    in_place = alpr.render(im, results)
+    assert in_place is im
+    assert np.array_equal(in_place, rendered)
+
+
+class _FlickeringOCR(BaseOCR):
+    """Reads the same plate with a different confidence every time, like a live feed."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:  # noqa: ARG002
+        self.calls += 1
+        return OcrResult(text="ABC123", confidence=0.5 + self.calls / 1000)
+
+
+def test_draw_predictions_reuses_labels() -> None:
+    class _FixedDetector(BaseDetector):
+        def predict(self, frame: np.ndarray) -> list[DetectionResult]:  # noqa: ARG002
+            return [DetectionResult("License Plate", 0.9, BoundingBox(40, 60, 140, 90))]
+
+    fixed_alpr = ALPR(detector=_FixedDetector(), ocr=_FlickeringOCR())
+    frame = np.full((120, 480, 3), 127, dtype=np.uint8)
+    drawn = [fixed_alpr.draw_predictions(frame.copy()) for _ in range(5)]
+    # The confidence changes on every frame, but the plate text is only rendered once
+    assert list(fixed_alpr.renderer._labels) == ["ABC123"]  # pylint: disable=protected-access
+    assert not np.array_equal(drawn[0], drawn[1])
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+@pytest.mark.parametrize(
+    "ocr_model", ["cct-xs-v1-global-model", "global-plates-mobile-vit-v2-model"]
+)
+def test_ocr_predict_batch_matches_predict(img_path: Path, ocr_model: OcrModel) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    ocr = DefaultOCR(hub_ocr_model=ocr_model)
+    h, w = im.shape[:2]
+    crops = [im[: h // 2, : w // 2], im[h // 2 :, w // 2 :], im[h // 4 : h // 2, w // 3 :]]
+
+    batch_results = ocr.predict_batch(crops)
+    single_results = [ocr.predict(crop) for crop in crops]
+
+    assert len(batch_results) == len(crops)
+    for batch_res, single_res in zip(batch_results, single_results, strict=True):
+        assert batch_res is not None and single_res is not None
+        assert batch_res.text == single_res.text
+        assert batch_res.confidence == pytest.approx(single_res.confidence, abs=1e-5)
+    assert not ocr.predict_batch([])
+
+
+@pytest.mark.parametrize("keep_aspect_ratio", [False, True])
+@pytest.mark.parametrize("image_color_mode", ["grayscale", "rgb"])
+@pytest.mark.parametrize("crop_shape", [(40, 150), (70, 90), (64, 128), (13, 200)])
+def test_ocr_resize_into_matches_resize_image(
+    keep_aspect_ratio: bool,
+    image_color_mode: Literal["grayscale", "rgb"],
+    crop_shape: tuple[int, int],
+) -> None:
+    config = PlateOCRConfig(
+        max_plate_slots=9,
+        alphabet="0123456789_",
+        pad_char="_",
+        img_height=64,
+        img_width=128,
+        keep_aspect_ratio=keep_aspect_ratio,
+        image_color_mode=image_color_mode,
+        padding_color=(10, 20, 30),
+    )
+    frame = np.random.default_rng(0).integers(0, 255, (300, 400, 3), dtype=np.uint8)
+    # A view of the frame, as cropped by ALPR
+    crop: np.ndarray = frame[5 : 5 + crop_shape[0], 7 : 7 + crop_shape[1]]
+    if image_color_mode == "grayscale":
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    expected = resize_image(
+        crop,
+        config.img_height,
+        config.img_width,
+        image_color_mode=image_color_mode,
+        keep_aspect_ratio=keep_aspect_ratio,
+        padding_color=config.padding_color,
+    )
+    model_input = np.zeros_like(expected)
+    _resize_into(crop, model_input, config)
+    assert np.array_equal(model_input, expected)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_ocr_reuses_input_buffer(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    ocr = DefaultOCR(hub_ocr_model="cct-xs-v1-global-model")
+    crops = [im[:40, :150], im[100:170, 200:290], im[50:120, 10:300]]
+    expected = ocr.predict_batch(crops)
+
+    first = ocr._preprocess(crops)  # pylint: disable=protected-access
+    second = ocr._preprocess(crops[:2])  # pylint: disable=protected-access
+    assert first.flags.c_contiguous and second.flags.c_contiguous
+    assert np.shares_memory(first, second)
+    # Results don't depend on what previous calls left in the buffer
+    assert ocr.predict_batch(crops[::-1]) == expected[::-1]
+    assert ocr.predict_batch(crops) == expected
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_ocr_fused_preprocessing(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    fused = DefaultOCR(hub_ocr_model="cct-xs-v1-global-model")
+    exact = DefaultOCR(hub_ocr_model="cct-xs-v1-global-model", fused_preprocessing=False)
+    assert fused.ocr_model.config.image_color_mode == "grayscale"
+    # Plates as cropped from a 4K frame, and a small one that isn't fused
+    large = [cv2.resize(im[:120, :400], (1000, 300)), cv2.resize(im[100:200, 50:350], (700, 200))]
+    small = im[:40, :150]
+
+    for crops in (large, [*large, small]):
+        expected = exact._preprocess(crops).astype(np.int16)  # pylint: disable=protected-access
+        actual = fused._preprocess(crops).astype(np.int16)  # pylint: disable=protected-access
+        assert np.abs(actual - expected).max() <= 2
+        assert np.array_equal(actual[len(large) :], expected[len(large) :])
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_ocr_per_char_confidence(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    crop = im[: im.shape[0] // 2, : im.shape[1] // 2]
+    mean_result = DefaultOCR(hub_ocr_model="cct-xs-v1-global-model").predict(crop)
+    char_result = DefaultOCR(
+        hub_ocr_model="cct-xs-v1-global-model", per_char_confidence=True
+    ).predict(crop)
+
+    assert mean_result is not None and char_result is not None
+    assert char_result.text == mean_result.text
+    assert isinstance(char_result.confidence, list)
+    assert len(char_result.confidence) == len(char_result.text)
+    assert all(0.0 <= x <= 1.0 for x in char_result.confidence)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+@pytest.mark.parametrize(
+    "ocr_model", ["cct-xs-v1-global-model", "global-plates-mobile-vit-v2-model"]
+)
+def test_ocr_slot_probabilities(img_path: Path, ocr_model: OcrModel) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    crop = im[: im.shape[0] // 2, : im.shape[1] // 2]
+    ocr = DefaultOCR(hub_ocr_model=ocr_model, per_char_confidence=True, slot_probabilities=True)
+    result = ocr.predict(crop)
+    assert result is not None and result.slot_probabilities is not None
+
+    config = ocr.ocr_model.config
+    assert result.slot_probabilities.shape == (config.max_plate_slots, len(config.alphabet))
+    decoded = "".join(config.alphabet[idx] for idx in result.slot_probabilities.argmax(axis=-1))
+    assert decoded.replace("_", "") == result.text
+    max_probs = result.slot_probabilities.max(axis=-1)
+    assert result.confidence == pytest.approx(
+        [float(p) for char, p in zip(decoded, max_probs, strict=True) if char != "_"]
+    )
+    # Matches the output of `LicensePlateRecognizer.run`
+    if config.image_color_mode == "grayscale":
+        crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    texts = ocr.ocr_model.run(crop)
+    assert isinstance(texts, list)
+    assert texts[0].replace("_", "") == result.text
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_default_stage_timings(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    calls: list[dict[str, float]] = []
+    alpr = ALPR(timing_hooks=[calls.append])
+    alpr.predict(im)
+    assert {"detect_preprocess", "detect_inference", "detect_postprocess"} <= set(calls[0])
+
+    crop = im[: im.shape[0] // 2, : im.shape[1] // 2]
+    with record_timings() as timings:
+        alpr.ocr.predict_batch([crop, crop])
+    assert set(timings) == {"ocr_preprocess", "ocr_inference", "ocr_postprocess"}
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_predict_many_matches_predict(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    frames: list[np.ndarray | str] = [im, np.zeros_like(im), str(img_path), cv2.flip(im, 1)]
+
+    many_results = alpr.predict_many(frames)
+
+    assert len(many_results) == len(frames)
+    for frame, frame_results in zip(frames, many_results, strict=True):
+        assert frame_results == alpr.predict(frame)
+    assert not alpr.predict_many([])
+
+
+class _BatchedModel:
+    """Stands in for an end2end detector session with a dynamic batch dimension."""
+
+    def __init__(self, predictions: np.ndarray) -> None:
+        self.predictions = predictions
+        self.input_shapes: list[tuple[int, ...]] = []
+
+    def get_inputs(self) -> list[SimpleNamespace]:
+        return [SimpleNamespace(shape=["batch", 3, 384, 384])]
+
+    def run(self, output_names: list[str], feed: dict[str, np.ndarray]) -> list[np.ndarray]:
+        assert len(output_names) == 1
+        self.input_shapes.extend(tensor.shape for tensor in feed.values())
+        return [self.predictions]
+
+
+def test_default_detector_batch() -> None:
+    # Rows are [batch index, x1, y1, x2, y2, class id, score], in letterboxed coordinates
+    model = _BatchedModel(
+        np.array(
+            [
+                [2, 10, 20, 110, 60, 0, 0.875],
+                [0, 40, 40, 140, 80, 0, 0.75],
+                [2, 200, 200, 300, 240, 0, 0.5],
+                [2, 0, 0, 10, 10, 0, 0.125],
+            ],
+            dtype=np.float32,
+        )
+    )
+    detector = DefaultDetector()
+    detector.detector.model = model
+    assert detector.supports_batching
+    # The last frame is letterboxed at half its size
+    frames = [np.zeros((384, 384, 3), dtype=np.uint8)] * 2 + [
+        np.zeros((768, 768, 3), dtype=np.uint8)
+    ]
+
+    frames_detections = detector.predict_batch(frames)
+
+    assert model.input_shapes == [(3, 3, 384, 384)]
+    assert frames_detections == [
+        [DetectionResult("License Plate", 0.75, BoundingBox(40, 40, 140, 80))],
+        [],
+        [
+            DetectionResult("License Plate", 0.875, BoundingBox(20, 40, 220, 120)),
+            DetectionResult("License Plate", 0.5, BoundingBox(400, 400, 600, 480)),
+        ],
+    ]
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_concurrent_predict(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    alpr = ALPR(
+        detector_model="yolo-v9-t-384-license-plate-end2end",
+        ocr_model="cct-xs-v1-global-model",
+        num_sessions=2,
+    )
+    expected = alpr.predict(im)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(alpr.predict, [im] * 8))
+
+    assert all(result == expected for result in results)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_warmup(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    warm_alpr = ALPR(num_sessions=2, load_models="lazy")
+    timings = warm_alpr.warmup(batch_sizes=(1, 4), plates_per_frame=2, frame_shape=im.shape[:2])
+    assert set(timings) == {"detector", "ocr", "total"}
+    assert timings["total"] == pytest.approx(timings["detector"] + timings["ocr"])
+    assert warm_alpr.ready.done()
+    assert warm_alpr.predict(im) == alpr.predict(im)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_session_profile(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    low_memory_alpr = ALPR(session_profile="low-memory")
+    assert low_memory_alpr.predict(im) == alpr.predict(im)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_graph_cache(img_path: Path, alpr: ALPR, tmp_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    first_alpr = ALPR(graph_cache_dir=tmp_path)
+    cached = sorted(tmp_path.rglob("*"))
+    assert len([path for path in cached if path.suffix == ".onnx"]) == 2
+    assert not [path for path in cached if path.suffix == ".tmp"]
+
+    # Loaded from the cache, with the optimizations already applied
+    second_alpr = ALPR(graph_cache_dir=tmp_path, num_sessions=2)
+    assert sorted(tmp_path.rglob("*")) == cached
+    expected = alpr.predict(im)
+    assert first_alpr.predict(im) == expected
+    assert second_alpr.predict(im) == expected
+
+
+class _RecordingDetector(BaseDetector):
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:  # noqa: ARG002
+        return []
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        self.batch_sizes.append(len(frames))
+        return super().predict_batch(frames)
+
+
+class _RecordingOCR(BaseOCR):
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:  # noqa: ARG002
+        return None
+
+    def predict_batch(self, cropped_plates: list[np.ndarray]) -> list[OcrResult | None]:
+        self.batch_sizes.append(len(cropped_plates))
+        return super().predict_batch(cropped_plates)
+
+
+def test_warmup_batch_sizes() -> None:
+    detector, ocr = _RecordingDetector(), _RecordingOCR()
+    rois_alpr = ALPR(detector=detector, ocr=ocr, rois=[(0, 0, 10, 10), (10, 10, 20, 20)])
+    rois_alpr.warmup(batch_sizes=(1, 2), plates_per_frame=2)
+    assert detector.batch_sizes == [2, 4]
+    assert ocr.batch_sizes == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_lazy_load_models(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    lazy_alpr = ALPR(load_models="lazy")
+    assert not lazy_alpr.ready.done()
+    assert lazy_alpr.predict(im) == alpr.predict(im)
+    assert lazy_alpr.ready.result() is lazy_alpr
+
+    background_alpr = ALPR(load_models="background")
+    assert background_alpr.ready.result(timeout=60) is background_alpr
+    assert background_alpr.predict(im) == alpr.predict(im)
+
+
+def test_lazy_load_models_error() -> None:
+    failing_alpr = ALPR(
+        detector_model="unknown-model",  # type: ignore[arg-type]
+        load_models="lazy",
+    )
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    for _ in range(2):
+        with pytest.raises(ValueError, match="unknown-model"):
+            failing_alpr.predict(frame)
+    assert isinstance(failing_alpr.ready.exception(), ValueError)
+    with pytest.raises(ValueError, match="load_models"):
+        ALPR(load_models="later")  # type: ignore[arg-type]
+
+
+def test_replace_models() -> None:
+    replaced_alpr = ALPR(detector=_RecordingDetector(), ocr=_RecordingOCR())
+    detector, ocr = _RecordingDetector(), _RecordingOCR()
+    replaced_alpr.detector = detector
+    replaced_alpr.ocr = ocr
+    assert replaced_alpr.detector is detector
+    assert replaced_alpr.ocr is ocr
+    replaced_alpr.predict(np.zeros((64, 64, 3), dtype=np.uint8))
+    assert detector.batch_sizes == [1]
+
+    # Setting a model before the others were built resolves `ready`
+    lazy_alpr = ALPR(ocr=_RecordingOCR(), load_models="lazy")
+    lazy_alpr.detector = detector
+    assert lazy_alpr.ready.result() is lazy_alpr
+    assert lazy_alpr.detector is detector
+
+    # And replaces a failed build
+    failing_alpr = ALPR(
+        detector_model="unknown-model",  # type: ignore[arg-type]
+        ocr=ocr,
+        load_models="lazy",
+    )
+    with pytest.raises(ValueError, match="unknown-model"):
+        failing_alpr.predict(np.zeros((64, 64, 3), dtype=np.uint8))
+    failing_alpr.detector = detector
+    assert failing_alpr.ready.result() is failing_alpr
+    assert failing_alpr.predict(np.zeros((64, 64, 3), dtype=np.uint8)) == []
+
+
+class _SlowDetector(BaseDetector):
+    """Detector that records how many calls run at the same time."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:  # noqa: ARG002
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return []
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_apredict_matches_predict(img_path: Path, alpr: ALPR) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+
+    async def run() -> tuple[list[ALPRResult], list[list[ALPRResult]]]:
+        return await alpr.apredict(im), await alpr.apredict_many([im] * 5, batch_size=2)
+
+    single, many = asyncio.run(run())
+    expected = alpr.predict(im)
+    assert single == expected
+    assert many == [expected] * 5
+
+
+def test_apredict_bounded_concurrency(alpr: ALPR) -> None:
+    detector = _SlowDetector()
+    bounded_alpr = ALPR(detector=detector, ocr=alpr.ocr, max_concurrency=3)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    async def run() -> list[list[ALPRResult]]:
+        return await asyncio.gather(*(bounded_alpr.apredict(frame) for _ in range(20)))
+
+    results = asyncio.run(run())
+    bounded_alpr.close()
+    assert results == [[]] * 20
+    assert 1 <= detector.max_running <= 3
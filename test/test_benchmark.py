@@ -0,0 +1,106 @@
+"""
+Test the benchmark module and CLI.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from fast_alpr.benchmark import (
+    latency_summary,
+    main,
+    run_benchmarks,
+    stage_summary,
+    synthetic_frame,
+)
+
+
+def test_latency_summary() -> None:
+    summary = latency_summary([0.001 * idx for idx in range(1, 101)])
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["min"] == pytest.approx(1.0)
+    assert summary["max"] == pytest.approx(100.0)
+
+
+def test_stage_summary() -> None:
+    summary = stage_summary([{"detect": 0.002, "ocr": 0.004}, {"detect": 0.004}])
+    assert summary == pytest.approx({"detect": 3.0, "ocr": 2.0})
+
+
+def test_synthetic_frame() -> None:
+    frame = synthetic_frame(np.random.default_rng(0), width=320, height=240, plates_per_frame=3)
+    assert frame.shape == (240, 320, 3)
+    assert frame.dtype == np.uint8
+
+
+def test_run_benchmarks() -> None:
+    results = run_benchmarks(
+        ocr_models=["cct-xs-v1-global-model"],
+        width=320,
+        height=240,
+        plates_per_frame=2,
+        batch_sizes=[1, 2],
+        threads=[1, 2],
+        iterations=3,
+        warmup=1,
+    )
+    # (detector + ocr + alpr) x 2 batch sizes x 2 thread counts
+    assert len(results) == 12
+    for result in results:
+        assert result.fps > 0
+        assert 0 < result.latency_ms["p50"] <= result.latency_ms["p99"]
+        assert len({result.detector_model, result.ocr_model} - {None}) >= 1
+        assert result.target != "detector" or "detect_inference" in result.stage_ms
+
+
+def test_cli_json_output(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    main(
+        [
+            "--target",
+            "ocr",
+            "--ocr-model",
+            "cct-xs-v1-global-model",
+            "--plate-size",
+            "300",
+            "1000",
+            "--iterations",
+            "2",
+            "--warmup",
+            "0",
+            "--output",
+            str(output),
+        ]
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert "onnxruntime" in report["environment"]
+    (result,) = report["results"]
+    assert result["target"] == "ocr"
+    assert set(result["latency_ms"]) >= {"p50", "p95", "p99"}
+    assert result["peak_rss_mb"] is None or result["peak_rss_mb"] > 0
+    assert result["profile"] is None
+    assert set(result["stage_ms"]) == {"ocr_preprocess", "ocr_inference", "ocr_postprocess"}
+    assert (
+        0 < result["extra"]["ocr_preprocess_ms_per_plate"] <= result["stage_ms"]["ocr_preprocess"]
+    )
+
+
+def test_cli_profiles(capsys: pytest.CaptureFixture[str]) -> None:
+    main(
+        [
+            "--target",
+            "detector",
+            "--profile",
+            "latency",
+            "low-memory",
+            "--iterations",
+            "1",
+            "--warmup",
+            "0",
+        ]
+    )
+    report = json.loads(capsys.readouterr().out)
+    assert [result["profile"] for result in report["results"]] == ["latency", "low-memory"]
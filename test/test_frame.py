@@ -0,0 +1,108 @@
+"""
+Test frame contexts.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from fast_alpr import ALPR, BaseOCR, FrameContext, MotionGate, OcrResult, default_detector
+from fast_alpr.alpr import ALPRResult
+from fast_alpr.frame import active_context, use_contexts
+
+
+class _NoOCR(BaseOCR):
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:  # noqa: ARG002
+        return None
+
+
+def _image() -> np.ndarray:
+    return np.random.default_rng(0).integers(0, 255, (120, 200, 3), dtype=np.uint8)
+
+
+def test_views_are_computed_once() -> None:
+    context = FrameContext(_image())
+    calls: list[int] = []
+
+    def compute() -> int:
+        calls.append(1)
+        return 42
+
+    assert context.cached("answer", compute) == 42
+    assert context.cached("answer", compute) == 42
+    assert len(calls) == 1
+    context.clear()
+    assert context.cached("answer", compute) == 42
+    assert len(calls) == 2
+
+
+def test_resized_and_gray_views() -> None:
+    image = _image()
+    context = FrameContext(image)
+    expected = cv2.cvtColor(
+        cv2.resize(image, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY
+    )
+    small = context.resized(0.5, gray=True)
+    assert np.array_equal(small, expected)
+    assert context.resized(0.5, gray=True) is small
+    # The color copy was cached on the way
+    assert context.resized(0.5).shape == (60, 100, 3)
+    assert np.array_equal(context.gray(), cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+    assert context.shape == image.shape
+
+
+def test_active_context() -> None:
+    image = _image()
+    context = FrameContext(image)
+    assert active_context(image) is None
+    with use_contexts([context]):
+        assert active_context(image) is context
+        # Crops and copies are different arrays
+        assert active_context(image[10:50]) is None
+        assert active_context(image.copy()) is None
+    assert active_context(image) is None
+
+
+def test_detector_letterbox_is_shared(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[int, ...]] = []
+    preprocess = default_detector.preprocess
+
+    def counting_preprocess(
+        img: np.ndarray, img_size: tuple[int, int]
+    ) -> tuple[np.ndarray, tuple[float, float], tuple[float, float]]:
+        calls.append(img.shape)
+        return preprocess(img, img_size)
+
+    monkeypatch.setattr(default_detector, "preprocess", counting_preprocess)
+    hooked: list[tuple[FrameContext, list[ALPRResult]]] = []
+    alpr = ALPR(
+        ocr=_NoOCR(), frame_hooks=[lambda context, results: hooked.append((context, results))]
+    )
+    context = FrameContext(_image())
+
+    first = alpr.predict(context)
+    second = alpr.predict(context)
+    assert first == second
+    assert len(calls) == 1
+    assert [hook_context for hook_context, _ in hooked] == [context, context]
+    assert hooked[0][1] == first
+
+    # Plain frames get a fresh context every call
+    alpr.predict(context.image)
+    assert len(calls) == 2
+
+
+def test_motion_gate_shares_downscaled_frame() -> None:
+    frames = [np.full((120, 200, 3), 80, dtype=np.uint8) for _ in range(3)]
+    frames[2][40:80, 60:120] = 255
+    plain_gate = MotionGate(method="diff", cooldown=0.0, scale=0.5)
+    context_gate = MotionGate(method="diff", cooldown=0.0, scale=0.5)
+    for t, frame in enumerate(frames):
+        context = FrameContext(frame)
+        assert context_gate.should_process(context, float(t)) == plain_gate.should_process(
+            frame, float(t)
+        )
+        assert context_gate.motion_level == plain_gate.motion_level
+        # The downscaled grayscale copy is left for other consumers, i.e. a preview
+        assert context.resized(0.5, gray=True).shape == (60, 100)
+    assert context_gate.motion_level > 0
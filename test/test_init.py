@@ -0,0 +1,31 @@
+"""
+Test the package's lazy imports.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import fast_alpr
+
+
+def test_base_types_import_is_light() -> None:
+    code = (
+        "import sys\n"
+        "from fast_alpr import BaseDetector, BaseOCR, OcrResult\n"
+        "heavy = ('cv2', 'onnxruntime', 'fast_plate_ocr', 'open_image_models')\n"
+        "print(','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == ""
+
+
+def test_lazy_exports() -> None:
+    for name in fast_alpr.__all__:
+        assert getattr(fast_alpr, name).__name__ == name
+    assert set(fast_alpr.__all__) <= set(dir(fast_alpr))
+    with pytest.raises(AttributeError):
+        _ = fast_alpr.NotAName  # type: ignore[attr-defined]
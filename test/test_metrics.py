@@ -0,0 +1,92 @@
+"""
+Test pipeline metrics.
+"""
+
+import urllib.request
+from contextlib import nullcontext
+
+import numpy as np
+
+from fast_alpr import ALPR, BaseDetector, BaseOCR, DetectionResult, OcrResult, PipelineMetrics
+from fast_alpr.base import BoundingBox
+from fast_alpr.metrics import record_timings, serve_prometheus, stage
+from fast_alpr.tracker import PlateTracker
+
+
+class _FixedDetector(BaseDetector):
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:
+        height, width = frame.shape[:2]
+        box = BoundingBox(width // 4, height // 4, width // 2, height // 2)
+        return [DetectionResult("License Plate", 0.8, box)]
+
+
+class _ShapeOCR(BaseOCR):
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
+        return OcrResult(text=f"{cropped_plate.shape[1]}X{cropped_plate.shape[0]}", confidence=0.9)
+
+
+def test_stage_is_noop_when_not_recording() -> None:
+    assert isinstance(stage("detect"), nullcontext)
+    with record_timings() as timings:
+        with stage("detect"):
+            pass
+        with stage("detect"):
+            pass
+    assert list(timings) == ["detect"]
+    assert timings["detect"] >= 0
+    assert isinstance(stage("detect"), nullcontext)
+
+
+def test_timing_hooks() -> None:
+    calls: list[dict[str, float]] = []
+    metrics = PipelineMetrics()
+    alpr = ALPR(detector=_FixedDetector(), ocr=_ShapeOCR(), timing_hooks=[calls.append, metrics])
+    frame = np.zeros((80, 160, 3), dtype=np.uint8)
+    alpr.predict(frame)
+    alpr.predict_many([frame, frame])
+    alpr.track(frame, PlateTracker())
+
+    assert len(calls) == 3
+    assert set(calls[0]) == {"decode", "detect", "crop", "ocr"}
+    assert set(calls[2]) == {"decode", "detect", "track", "ocr"}
+    assert metrics.calls == 3
+    snapshot = metrics.snapshot()
+    assert snapshot["detect"]["count"] == 3
+    assert snapshot["crop"]["count"] == 2
+
+
+def test_no_timing_hooks() -> None:
+    alpr = ALPR(detector=_FixedDetector(), ocr=_ShapeOCR())
+    results = alpr.predict(np.zeros((80, 160, 3), dtype=np.uint8))
+    assert results[0].ocr is not None
+    assert results[0].ocr.text == "40X20"
+
+
+def test_prometheus_text() -> None:
+    metrics = PipelineMetrics(buckets=(0.01, 0.1))
+    metrics({"detect": 0.005, "ocr": 0.05})
+    metrics({"detect": 0.5})
+    text = metrics.to_prometheus()
+    assert "fast_alpr_calls_total 2\n" in text
+    assert 'fast_alpr_stage_duration_seconds_bucket{stage="detect",le="0.01"} 1\n' in text
+    assert 'fast_alpr_stage_duration_seconds_bucket{stage="detect",le="0.1"} 1\n' in text
+    assert 'fast_alpr_stage_duration_seconds_bucket{stage="detect",le="+Inf"} 2\n' in text
+    assert 'fast_alpr_stage_duration_seconds_count{stage="ocr"} 1\n' in text
+
+    metrics.reset()
+    assert metrics.calls == 0
+    assert not metrics.snapshot()
+
+
+def test_serve_prometheus() -> None:
+    metrics = PipelineMetrics()
+    metrics({"ocr": 0.002})
+    server = serve_prometheus(metrics, port=0, addr="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert body == metrics.to_prometheus()
@@ -0,0 +1,64 @@
+"""
+Test motion gating.
+"""
+
+import numpy as np
+import pytest
+
+from fast_alpr.motion import MotionGate
+
+HEIGHT, WIDTH = 240, 320
+
+
+def _frame(block_x: int | None = None) -> np.ndarray:
+    """Gray frame with an optional white block at the given x position."""
+    frame = np.full((HEIGHT, WIDTH, 3), 80, dtype=np.uint8)
+    if block_x is not None:
+        frame[80:160, block_x : block_x + 80] = 255
+    return frame
+
+
+@pytest.mark.parametrize("method", ["mog2", "diff"])
+def test_static_frames_are_skipped(method: str) -> None:
+    gate = MotionGate(method=method, cooldown=0.0, scale=0.5)  # type: ignore[arg-type]
+    static = _frame()
+    decisions = [gate.should_process(static, timestamp=float(t)) for t in range(10)]
+    # Only the first frame counts as motion, since there is no background model yet
+    assert decisions[0]
+    assert not any(decisions[1:])
+    assert gate.skipped_frames == 9
+    assert gate.processed_frames == 1
+    assert gate.skip_ratio == pytest.approx(0.9)
+
+
+@pytest.mark.parametrize("method", ["mog2", "diff"])
+def test_moving_block_is_processed(method: str) -> None:
+    gate = MotionGate(method=method, cooldown=0.0, scale=0.5)  # type: ignore[arg-type]
+    for t in range(5):
+        gate.should_process(_frame(), timestamp=float(t))
+    assert gate.should_process(_frame(block_x=100), timestamp=5.0)
+    assert gate.motion_level >= gate.threshold
+
+
+def test_cooldown_keeps_processing() -> None:
+    gate = MotionGate(method="diff", cooldown=2.0, scale=0.5)
+    gate.should_process(_frame(), timestamp=0.0)
+    assert gate.should_process(_frame(block_x=100), timestamp=10.0)
+    # No more motion, but still within the cooldown window
+    assert gate.should_process(_frame(block_x=100), timestamp=11.0)
+    assert gate.should_process(_frame(block_x=100), timestamp=12.0)
+    assert not gate.should_process(_frame(block_x=100), timestamp=12.5)
+
+
+def test_roi_ignores_motion_outside() -> None:
+    gate = MotionGate(method="diff", cooldown=0.0, scale=0.5, roi=(0, 0, 80, HEIGHT))
+    gate.should_process(_frame(), timestamp=0.0)
+    assert not gate.should_process(_frame(block_x=200), timestamp=1.0)
+    assert gate.should_process(_frame(block_x=0), timestamp=2.0)
+    gate.reset_stats()
+    assert gate.processed_frames == gate.skipped_frames == 0
+
+
+def test_invalid_method() -> None:
+    with pytest.raises(ValueError):
+        MotionGate(method="optical-flow")  # type: ignore[arg-type]
@@ -0,0 +1,105 @@
+"""
+Test the ALPR process pool.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+import pytest
+
+from fast_alpr import ALPR, ALPRPool
+from fast_alpr.pool import _set_worker_sess_options
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+ALPR_KWARGS: dict[str, Any] = {
+    "detector_model": "yolo-v9-t-384-license-plate-end2end",
+    "ocr_model": "cct-xs-v1-global-model",
+}
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_pool_matches_alpr(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    expected = ALPR(**ALPR_KWARGS).predict(im)
+    # Frames of different sizes force the shared memory segments to be re-created
+    big = cv2.resize(im, None, fx=2.0, fy=2.0)
+
+    with ALPRPool(workers=2, max_pending=2, **ALPR_KWARGS) as pool:
+        assert pool.predict(im) == expected
+        frames_results = pool.predict_many([im, np.zeros_like(im), big, str(img_path)] * 2)
+
+    assert len(frames_results) == 8
+    assert frames_results[0] == frames_results[3] == expected
+    assert not frames_results[1]
+    assert len(frames_results[2]) == len(expected)
+
+
+def test_pool_closed() -> None:
+    pool = ALPRPool(workers=1, **ALPR_KWARGS)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.submit(np.zeros((32, 32, 3), dtype=np.uint8))
+
+
+def test_pool_worker_init_failure() -> None:
+    with pytest.raises(RuntimeError):
+        ALPRPool(workers=1, detector_model="non-existent-model")
+
+
+class _ExitOnUnpickle:
+    """Kills the worker process that unpickles it, before it loads the models."""
+
+    def __reduce__(self) -> tuple[Any, tuple[int]]:
+        return os._exit, (3,)
+
+
+def test_pool_worker_died() -> None:
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        ALPRPool(workers=2, detector=_ExitOnUnpickle(), **ALPR_KWARGS)
+
+
+@pytest.mark.parametrize("img_path", [ASSETS_DIR / "test_image.png"])
+def test_pool_session_profile(img_path: Path) -> None:
+    im = cv2.imread(str(img_path))
+    assert im is not None, "Failed to load test image"
+    expected = ALPR(**ALPR_KWARGS).predict(im)
+    with ALPRPool(workers=1, session_profile="throughput", **ALPR_KWARGS) as pool:
+        assert pool.predict(im) == expected
+
+
+@pytest.mark.parametrize("session_profile", [None, "throughput"])
+def test_pool_splits_cores_between_sessions(
+    monkeypatch: pytest.MonkeyPatch, session_profile: str | None
+) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    alpr_kwargs: dict[str, Any] = {"num_sessions": 2, "session_profile": session_profile}
+    _set_worker_sess_options(alpr_kwargs, num_workers=4)
+    # 4 workers with 2 sessions each share the 16 cores
+    assert alpr_kwargs["detector_sess_options"].intra_op_num_threads == 2
+    assert alpr_kwargs["ocr_sess_options"].intra_op_num_threads == 2
+
+
+def test_pool_worker_killed() -> None:
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+    pool = ALPRPool(workers=2, **ALPR_KWARGS)
+    try:
+        pool.predict(frame)
+        # pylint: disable-next=protected-access
+        victim = pool._processes[0]
+        victim.kill()
+        victim.join()
+        with pytest.raises(RuntimeError, match="died unexpectedly|broken"):
+            # Frames may still be served by the other worker until the death is noticed
+            for _ in range(1000):
+                pool.submit(frame).result(timeout=10.0)
+                time.sleep(0.01)
+        with pytest.raises(RuntimeError, match="broken"):
+            pool.submit(frame)
+    finally:
+        pool.close()
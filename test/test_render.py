@@ -0,0 +1,114 @@
+"""
+Test overlay rendering.
+"""
+
+import timeit
+
+import cv2
+import numpy as np
+import pytest
+
+from fast_alpr import ALPRResult, DetectionResult, OcrResult, PlateRenderer, RenderStyle
+from fast_alpr.base import BoundingBox
+
+
+def _result(text: str, box: BoundingBox, confidence: float = 0.97) -> ALPRResult:
+    return ALPRResult(
+        detection=DetectionResult("License Plate", 0.9, box),
+        ocr=OcrResult(text=text, confidence=confidence),
+    )
+
+
+@pytest.fixture(name="frame")
+def frame_fixture() -> np.ndarray:
+    return np.full((240, 320, 3), 127, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("antialiased", [True, False])
+def test_render_copy_and_in_place(frame: np.ndarray, antialiased: bool) -> None:
+    renderer = PlateRenderer(RenderStyle(antialiased=antialiased))
+    results = [_result("ABC123", BoundingBox(100, 120, 200, 150))]
+    original = frame.copy()
+
+    rendered = renderer.render(frame, results, copy=True)
+    assert np.array_equal(frame, original)
+    assert not np.array_equal(rendered, original)
+    # Text is drawn above the box
+    assert not np.array_equal(rendered[:120], original[:120])
+
+    in_place = renderer.render(frame, results)
+    assert in_place is frame
+    assert np.array_equal(in_place, rendered)
+
+
+def test_render_no_aa_only_style_colors(frame: np.ndarray) -> None:
+    style = RenderStyle(antialiased=False, box_color=(0, 0, 255))
+    rendered = PlateRenderer(style).render(
+        frame, [_result("ABC123", BoundingBox(100, 120, 200, 150))], copy=True
+    )
+    colors = {tuple(pixel) for pixel in rendered.reshape(-1, 3)}
+    assert colors <= {(127, 127, 127), (0, 0, 255), style.text_color, style.outline_color}
+
+
+def test_render_label_cache(frame: np.ndarray) -> None:
+    renderer = PlateRenderer(RenderStyle(show_confidence=False), cache_size=2)
+    box = BoundingBox(100, 120, 200, 150)
+    first = renderer.render(frame, [_result("ABC123", box, 0.9)], copy=True)
+    label = renderer._labels["ABC123"]  # pylint: disable=protected-access
+    # Same text with another confidence reuses the cached label
+    second = renderer.render(frame, [_result("ABC123", box, 0.5)], copy=True)
+    assert renderer._labels["ABC123"] is label  # pylint: disable=protected-access
+    assert np.array_equal(first, second)
+
+    for text in ("XYZ789", "JKL456"):
+        renderer.render(frame, [_result(text, box)], copy=True)
+    assert list(renderer._labels) == ["XYZ789", "JKL456"]  # pylint: disable=protected-access
+
+
+def test_render_clips_to_frame(frame: np.ndarray) -> None:
+    renderer = PlateRenderer()
+    results = [
+        _result("TOPLEFT", BoundingBox(-20, 0, 40, 20)),
+        _result("RIGHT", BoundingBox(300, 200, 330, 250)),
+        _result("OUTSIDE", BoundingBox(500, 500, 600, 600)),
+    ]
+    rendered = renderer.render(frame, results, copy=True)
+    assert rendered.shape == frame.shape
+
+
+def test_render_not_slower_than_put_text() -> None:
+    frame = np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8)
+    results = [
+        _result(
+            f"ABC12{idx}", BoundingBox(200 + 400 * idx, 500, 400 + 400 * idx, 560), 0.9 + idx / 100
+        )
+        for idx in range(4)
+    ]
+    renderer = PlateRenderer()
+    style = renderer.style
+
+    def put_text() -> None:
+        # The two `cv2.putText` passes the renderer replaces
+        for result in results:
+            bbox = result.detection.bounding_box
+            assert result.ocr is not None and isinstance(result.ocr.confidence, float)
+            cv2.rectangle(
+                frame, (bbox.x1, bbox.y1), (bbox.x2, bbox.y2), style.box_color, style.box_thickness
+            )
+            text = f"{result.ocr.text} {result.ocr.confidence * 100:.2f}%"
+            origin = (bbox.x1, bbox.y1 - style.text_offset)
+            font = (style.font_face, style.font_scale)
+            cv2.putText(frame, text, origin, *font, style.outline_color, 6, cv2.LINE_AA)
+            cv2.putText(frame, text, origin, *font, style.text_color, 2, cv2.LINE_AA)
+
+    def render() -> None:
+        renderer.render(frame, results)
+
+    # The best of several interleaved runs, to leave out the noise of other processes
+    render_times, put_text_times = [], []
+    for _ in range(30):
+        render_times.append(timeit.timeit(render, number=10))
+        put_text_times.append(timeit.timeit(put_text, number=10))
+    assert min(render_times) <= min(put_text_times)
+    # Only the plate texts are cached, not the confidences
+    assert set(renderer._labels) == {f"ABC12{idx}" for idx in range(4)}  # pylint: disable=protected-access
@@ -0,0 +1,102 @@
+"""
+Test region of interest cropping.
+"""
+
+import numpy as np
+import pytest
+
+from fast_alpr import ALPR, BaseDetector, BaseOCR, DetectionResult, OcrResult, RegionOfInterest
+from fast_alpr.base import BoundingBox
+from fast_alpr.utils import non_max_suppression
+
+
+class _BrightSpotDetector(BaseDetector):
+    """Detects the bounding box of the non-zero pixels of the frame, and records input shapes."""
+
+    def __init__(self) -> None:
+        self.input_shapes: list[tuple[int, ...]] = []
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:
+        self.input_shapes.append(frame.shape)
+        ys, xs = np.nonzero(frame[..., 0])
+        if xs.size == 0:
+            return []
+        box = BoundingBox(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+        return [DetectionResult("License Plate", 0.9, box)]
+
+
+class _MeanOCR(BaseOCR):
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
+        return OcrResult(text="ABC123", confidence=float(cropped_plate.mean()) / 255)
+
+
+@pytest.fixture(name="frame")
+def frame_fixture() -> np.ndarray:
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    frame[120:130, 150:180] = 255
+    return frame
+
+
+def test_roi_boxes_in_full_frame_coordinates(frame: np.ndarray) -> None:
+    detector = _BrightSpotDetector()
+    alpr = ALPR(detector=detector, ocr=_MeanOCR(), rois=[(100, 100, 250, 180)])
+    results = alpr.predict(frame)
+    assert detector.input_shapes == [(80, 150, 3)]
+    assert len(results) == 1
+    assert results[0].detection.bounding_box == BoundingBox(150, 120, 180, 130)
+    # OCR runs on the full-frame crop of the plate
+    assert results[0].ocr is not None and results[0].ocr.confidence == 1.0
+
+
+def test_roi_override_and_full_frame(frame: np.ndarray) -> None:
+    detector = _BrightSpotDetector()
+    alpr = ALPR(detector=detector, ocr=_MeanOCR(), rois=[(0, 0, 100, 100)])
+    assert not alpr.predict(frame)
+    assert len(alpr.predict(frame, rois=[])) == 1
+    assert detector.input_shapes[-1] == frame.shape
+
+
+def test_overlapping_rois_are_deduplicated(frame: np.ndarray) -> None:
+    detector = _BrightSpotDetector()
+    alpr = ALPR(detector=detector, ocr=_MeanOCR())
+    results = alpr.predict(frame, rois=[(100, 100, 250, 180), (140, 110, 300, 200)])
+    assert len(detector.input_shapes) == 2
+    assert [r.detection.bounding_box for r in results] == [BoundingBox(150, 120, 180, 130)]
+
+
+def test_polygon_roi_filters_by_center(frame: np.ndarray) -> None:
+    alpr = ALPR(detector=_BrightSpotDetector(), ocr=_MeanOCR())
+    # The triangle's bounding rectangle contains the plate, but the triangle itself doesn't
+    outside = RegionOfInterest.from_polygon([(250, 100), (250, 180), (100, 180)])
+    inside = RegionOfInterest.from_polygon([(100, 100), (250, 100), (250, 180), (100, 180)])
+    assert not alpr.predict(frame, rois=[outside])
+    assert len(alpr.predict(frame, rois=[inside])) == 1
+
+
+def test_predict_many_rois_per_frame(frame: np.ndarray) -> None:
+    alpr = ALPR(detector=_BrightSpotDetector(), ocr=_MeanOCR())
+    results = alpr.predict_many([frame, frame], rois=[[(0, 0, 100, 100)], None])
+    assert [len(r) for r in results] == [0, 1]
+    with pytest.raises(ValueError):
+        alpr.predict_many([frame], rois=[None, None])
+
+
+def test_roi_clip() -> None:
+    assert RegionOfInterest(-10, 20, 500, 80).clip(300, 200) == (0, 20, 300, 80)
+    x1, y1, x2, y2 = RegionOfInterest(400, 300, 500, 400).clip(300, 200)
+    assert x2 - x1 == 0 and y2 - y1 == 0
+
+
+def test_non_max_suppression() -> None:
+    detections = [
+        DetectionResult("License Plate", 0.5, BoundingBox(0, 0, 10, 10)),
+        DetectionResult("License Plate", 0.9, BoundingBox(1, 1, 11, 11)),
+        DetectionResult("License Plate", 0.7, BoundingBox(50, 50, 60, 60)),
+    ]
+    assert [d.confidence for d in non_max_suppression(detections)] == [0.9, 0.7]
+    # A box cut by a tile border merges into the whole one, even when it's more confident
+    cut = DetectionResult("License Plate", 0.85, BoundingBox(590, 300, 640, 330))
+    whole = DetectionResult("License Plate", 0.8, BoundingBox(590, 300, 690, 330))
+    assert non_max_suppression([cut, whole], metric="ios") == [
+        DetectionResult("License Plate", 0.85, BoundingBox(590, 300, 690, 330))
+    ]
@@ -0,0 +1,239 @@
+"""
+Test multi-camera scheduling.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from fast_alpr import (
+    ALPR,
+    BaseDetector,
+    BaseOCR,
+    CameraScheduler,
+    DetectionResult,
+    MotionGate,
+    OcrResult,
+    PlateTracker,
+    StreamFrame,
+)
+from fast_alpr.base import BoundingBox
+from fast_alpr.decoders import OpenedSource, VideoDecoder
+
+
+class _CornerDetector(BaseDetector):
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:  # noqa: ARG002
+        return [DetectionResult("License Plate", 0.9, BoundingBox(0, 0, 16, 8))]
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        self.batch_sizes.append(len(frames))
+        return super().predict_batch(frames)
+
+
+class _BrightnessOCR(BaseOCR):
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
+        return OcrResult(text=str(int(cropped_plate.mean())), confidence=0.9)
+
+
+def _frame(value: int = 100) -> np.ndarray:
+    return np.full((32, 48, 3), value, dtype=np.uint8)
+
+
+def _alpr() -> tuple[ALPR, _CornerDetector]:
+    detector = _CornerDetector()
+    return ALPR(detector=detector, ocr=_BrightnessOCR()), detector
+
+
+def test_priority_shares() -> None:
+    alpr, detector = _alpr()
+    scheduler = CameraScheduler(alpr, max_batch_size=1, max_frame_age=None)
+    scheduler.add_source("entrance", priority=2.0)
+    scheduler.add_source("secondary", priority=1.0)
+    start = time.time()
+    for step in range(30):
+        scheduler.submit("entrance", _frame(), timestamp=start + step)
+        scheduler.submit("secondary", _frame(), timestamp=start + step)
+        stream_frames = scheduler.step(now=start + step)
+        assert len(stream_frames) == 1
+        assert stream_frames[0].results[0].ocr == OcrResult(text="100", confidence=0.9)
+
+    stats = scheduler.stats()
+    assert stats["entrance"]["processed"] == pytest.approx(20, abs=1)
+    assert stats["secondary"]["processed"] == pytest.approx(10, abs=1)
+    # Frames that waited while the other source was served were replaced by newer ones
+    assert stats["secondary"]["superseded"] > 0
+    assert detector.batch_sizes == [1] * 30
+
+
+def test_min_fps() -> None:
+    alpr, _ = _alpr()
+    scheduler = CameraScheduler(alpr, max_batch_size=1, max_frame_age=None)
+    scheduler.add_source("busy", priority=100.0)
+    scheduler.add_source("quiet", priority=0.01, min_fps=4.0)
+    start = time.time()
+    served: list[str | None] = []
+    for step in range(20):
+        now = start + 0.1 * step
+        scheduler.submit("busy", _frame(), timestamp=now)
+        scheduler.submit("quiet", _frame(), timestamp=now)
+        served.extend(stream_frame.source for stream_frame in scheduler.step(now=now))
+    # The quiet source is never left waiting for longer than 1 / min_fps seconds
+    gaps = [idx for idx, source in enumerate(served) if source == "quiet"]
+    assert gaps
+    assert max(np.diff(gaps)) <= 3
+
+
+def test_stale_frames_are_dropped() -> None:
+    alpr, _ = _alpr()
+    scheduler = CameraScheduler(alpr, max_frame_age=1.0)
+    scheduler.add_source("lane", max_frame_age=0.5)
+    scheduler.add_source("yard")
+    now = time.time()
+    scheduler.submit("lane", _frame(), timestamp=now - 0.8)
+    scheduler.submit("yard", _frame(), timestamp=now - 0.8)
+    assert [stream_frame.source for stream_frame in scheduler.step(now=now)] == ["yard"]
+    assert scheduler.stats()["lane"]["dropped_stale"] == 1
+    assert not scheduler.step(now=now)
+
+
+def test_latency_budget_limits_batches() -> None:
+    alpr, detector = _alpr()
+    scheduler = CameraScheduler(alpr, max_batch_size=4, latency_budget=0.25)
+    for idx in range(4):
+        scheduler.add_source(f"camera-{idx}")
+    now = time.time()
+
+    for idx in range(4):
+        scheduler.submit(f"camera-{idx}", _frame(), timestamp=now)
+    assert len(scheduler.step(now=now)) == 4
+    assert scheduler.frame_cost is not None
+
+    # Two frames of 0.1s each fit in the budget, a third one doesn't
+    scheduler.frame_cost = 0.1
+    for idx in range(4):
+        scheduler.submit(f"camera-{idx}", _frame(), timestamp=now)
+    assert len(scheduler.step(now=now)) == 2
+    assert len(scheduler.step(now=now)) == 2
+    assert detector.batch_sizes == [4, 2, 2]
+
+
+def test_motion_gate_and_tracker() -> None:
+    alpr, detector = _alpr()
+    scheduler = CameraScheduler(alpr)
+    scheduler.add_source("gated", motion_gate=MotionGate(method="diff", cooldown=0.0))
+    scheduler.add_source("tracked", tracker=PlateTracker())
+    now = time.time()
+    assert scheduler.submit("gated", _frame(), timestamp=now)
+    assert not scheduler.submit("gated", _frame(), timestamp=now + 0.1)
+    scheduler.submit("tracked", _frame(50), timestamp=now)
+
+    stream_frames = {frame.source: frame for frame in scheduler.step(now=now + 0.1)}
+    assert set(stream_frames) == {"gated", "tracked"}
+    assert stream_frames["tracked"].results[0].track_id is not None
+    assert stream_frames["gated"].results[0].track_id is None
+    assert scheduler.stats()["gated"]["skipped_motion"] == 1
+    # The tracked frame is run on its own
+    assert sorted(detector.batch_sizes) == [1, 1]
+
+
+def test_background_sources(tmp_path: Path) -> None:
+    paths = []
+    for name in ("entrance", "exit"):
+        path = str(tmp_path / f"{name}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter.fourcc(*"MJPG"), 25, (48, 32))
+        assert writer.isOpened(), "Failed to create test video"
+        for _ in range(5):
+            writer.write(_frame(200))
+        writer.release()
+        paths.append(path)
+
+    received: list[StreamFrame] = []
+    done = threading.Event()
+
+    def callback(stream_frame: StreamFrame) -> None:
+        received.append(stream_frame)
+        done.set()
+
+    alpr, _ = _alpr()
+    scheduler = CameraScheduler(alpr, callback=callback, max_frame_age=None)
+    scheduler.add_source("entrance", paths[0], priority=2.0)
+    scheduler.add_source("exit", paths[1])
+    scheduler.start()
+    try:
+        assert done.wait(timeout=5.0)
+        deadline = time.monotonic() + 5.0
+        while not scheduler.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.finished
+    finally:
+        scheduler.stop()
+    assert not scheduler.running
+    assert {stream_frame.source for stream_frame in received} <= {"entrance", "exit"}
+    assert all(stats["error"] is None for stats in scheduler.stats().values())
+    assert all(stream_frame.context is not None for stream_frame in received)
+    with pytest.raises(RuntimeError):
+        scheduler.start()
+
+
+class _BrokenDecoder(VideoDecoder):
+    def open(self, source: str | int, live: bool) -> OpenedSource:  # noqa: ARG002
+        raise RuntimeError(f"Can't decode {source}")
+
+
+def test_failed_source(caplog: pytest.LogCaptureFixture) -> None:
+    scheduler = CameraScheduler(_alpr()[0])
+    # Nothing to process isn't the same as everything processed
+    assert not scheduler.finished
+
+    scheduler.add_source("entrance", "entrance.avi", decoder=_BrokenDecoder())
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while not scheduler.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler.finished
+        # Failures are logged once, by the next step polling the readers
+        deadline = time.monotonic() + 5.0
+        while "Video source entrance failed" not in caplog.text and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+    assert caplog.text.count("Video source entrance failed") == 1
+    assert isinstance(scheduler.stats()["entrance"]["error"], RuntimeError)
+
+
+def test_add_source_while_starting(tmp_path: Path) -> None:
+    errors: list[Exception] = []
+
+    def add_sources(scheduler: CameraScheduler, prefix: str, barrier: threading.Barrier) -> None:
+        barrier.wait()
+        try:
+            for idx in range(5):
+                scheduler.add_source(f"{prefix}-{idx}", str(tmp_path / "missing.avi"))
+        except RuntimeError as e:
+            errors.append(e)
+
+    for _ in range(10):
+        scheduler = CameraScheduler(_alpr()[0])
+        barrier = threading.Barrier(3)
+        threads = [
+            threading.Thread(target=add_sources, args=(scheduler, prefix, barrier))
+            for prefix in ("a", "b")
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        # Readers of sources added while starting are started once, either here or by add_source
+        scheduler.start()
+        for thread in threads:
+            thread.join()
+        scheduler.stop()
+        assert len(scheduler.stats()) == 10
+    assert not errors
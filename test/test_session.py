@@ -0,0 +1,197 @@
+"""
+Test ONNX Runtime session utilities.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import onnxruntime as ort
+import pytest
+
+from fast_alpr.session import (
+    SESSION_PROFILES,
+    SessionPool,
+    SessionProfile,
+    create_with_graph_cache,
+    default_intra_op_num_threads,
+    get_session_profile,
+    optimized_model_path,
+)
+
+
+def test_session_pool_hands_out_distinct_instances() -> None:
+    pool = SessionPool(["a", "b", "c"])
+    in_use: set[str] = set()
+    overlaps: list[str] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        for _ in range(20):
+            with pool.acquire() as instance:
+                with lock:
+                    if instance in in_use:
+                        overlaps.append(instance)
+                    in_use.add(instance)
+                time.sleep(0.001)
+                with lock:
+                    in_use.discard(instance)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not overlaps
+    assert len(pool) == 3
+
+
+def test_session_pool_single_instance_is_shared() -> None:
+    pool = SessionPool(["only"])
+    with pool.acquire() as first, pool.acquire() as second:
+        assert first == second == "only"
+
+
+def test_session_pool_requires_instances() -> None:
+    with pytest.raises(ValueError):
+        SessionPool([])
+
+
+@pytest.mark.parametrize("num_sessions", [1, 2, 4, 1_000])
+def test_default_intra_op_num_threads(num_sessions: int) -> None:
+    assert default_intra_op_num_threads(num_sessions) >= 1
+
+
+def test_session_profiles_options() -> None:
+    latency = SESSION_PROFILES["latency"].session_options(num_sessions=1)
+    assert latency.intra_op_num_threads == default_intra_op_num_threads(1)
+    assert latency.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    assert latency.get_session_config_entry("session.intra_op.allow_spinning") == "1"
+
+    throughput = get_session_profile("throughput").session_options(num_sessions=2)
+    assert throughput.intra_op_num_threads == default_intra_op_num_threads(2)
+    assert throughput.get_session_config_entry("session.intra_op.allow_spinning") == "0"
+
+    low_memory = get_session_profile("low-memory").session_options()
+    assert low_memory.intra_op_num_threads == 1
+    assert not low_memory.enable_cpu_mem_arena
+    assert not low_memory.enable_mem_pattern
+
+    with pytest.raises(ValueError, match="Unknown session profile"):
+        get_session_profile("fastest")
+
+
+def test_session_profile_serialization() -> None:
+    profile = SessionProfile(
+        name="custom",
+        intra_op_num_threads=3,
+        graph_optimization_level="extended",
+        config_entries={"session.use_env_allocators": "1"},
+    )
+    assert SessionProfile.from_dict(profile.to_dict()) == profile
+    options = profile.session_options()
+    assert options.intra_op_num_threads == 3
+    assert options.get_session_config_entry("session.use_env_allocators") == "1"
+
+    based = SessionProfile.from_dict(
+        {"base": "low-memory", "name": "tuned", "allow_spinning": True}
+    )
+    assert based.intra_op_num_threads == 1
+    assert based.allow_spinning
+
+
+def test_optimized_model_path(tmp_path: Path) -> None:
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(b"model")
+    sess_options = ort.SessionOptions()
+    path = optimized_model_path(
+        tmp_path / "cache", model_path, ["CPUExecutionProvider"], sess_options
+    )
+    assert (
+        path.parent
+        == tmp_path / "cache" / f"onnxruntime-{ort.__version__}" / "CPUExecutionProvider"
+    )
+    assert path.name.startswith("model-")
+    assert path == optimized_model_path(
+        tmp_path / "cache", model_path, [("CPUExecutionProvider", {})], sess_options
+    )
+
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    assert path != optimized_model_path(
+        tmp_path / "cache", model_path, ["CPUExecutionProvider"], sess_options
+    )
+
+    # The hardware specific optimizations aren't serialized, so both levels share the entry
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    all_path = optimized_model_path(
+        tmp_path / "cache", model_path, ["CPUExecutionProvider"], sess_options
+    )
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    assert all_path == optimized_model_path(
+        tmp_path / "cache", model_path, ["CPUExecutionProvider"], sess_options
+    )
+
+
+def _recording_create(
+    created: list[tuple[Path, ort.GraphOptimizationLevel]],
+) -> Callable[[Path, ort.SessionOptions], str]:
+    def create(path: Path, sess_options: ort.SessionOptions) -> str:
+        created.append((path, sess_options.graph_optimization_level))
+        if sess_options.optimized_model_filepath:
+            Path(sess_options.optimized_model_filepath).write_bytes(b"optimized")
+        return path.name
+
+    return create
+
+
+def test_graph_cache_skips_hardware_specific_optimizations(tmp_path: Path) -> None:
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(b"model")
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    created: list[tuple[Path, ort.GraphOptimizationLevel]] = []
+    create = _recording_create(created)
+
+    create_with_graph_cache(
+        create, model_path, ["CPUExecutionProvider"], sess_options, tmp_path / "cache"
+    )
+    cached_path = optimized_model_path(
+        tmp_path / "cache", model_path, ["CPUExecutionProvider"], sess_options
+    )
+    # Serialized at the extended level, then loaded with the layout transformations of this CPU
+    assert created == [
+        (model_path, ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED),
+        (cached_path, ort.GraphOptimizationLevel.ORT_ENABLE_ALL),
+    ]
+    assert cached_path.read_bytes() == b"optimized"
+    assert sess_options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    assert not sess_options.optimized_model_filepath
+
+    created.clear()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    create_with_graph_cache(
+        create, model_path, ["CPUExecutionProvider"], sess_options, tmp_path / "cache"
+    )
+    assert created == [(cached_path, ort.GraphOptimizationLevel.ORT_DISABLE_ALL)]
+
+
+def test_graph_cache_falls_back_when_unwritable(tmp_path: Path) -> None:
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(b"model")
+    # A file where the cache directory should be
+    (tmp_path / "cache").write_bytes(b"")
+    created: list[tuple[Path, ort.GraphOptimizationLevel]] = []
+
+    assert (
+        create_with_graph_cache(
+            _recording_create(created),
+            model_path,
+            ["CPUExecutionProvider"],
+            None,
+            tmp_path / "cache",
+        )
+        == "model.onnx"
+    )
+    assert created == [(model_path, ort.GraphOptimizationLevel.ORT_ENABLE_ALL)]
@@ -0,0 +1,120 @@
+"""
+Test tiled detection.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from fast_alpr import ALPR, BaseDetector, BaseOCR, DetectionResult, OcrResult, TiledDetector
+from fast_alpr.base import BoundingBox
+from fast_alpr.tiling import tile_offsets
+
+
+class _BrightSpotDetector(BaseDetector):
+    """Detects the bounding box of the non-zero pixels, if they fit in a 100x100 input."""
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:
+        # Mimic the detector downscaling: nothing is found on large inputs
+        if max(frame.shape[:2]) > 100:
+            return []
+        points = cv2.findNonZero(np.ascontiguousarray(frame[..., 0]))
+        if points is None:
+            return []
+        x, y, w, h = cv2.boundingRect(points)
+        return [DetectionResult("License Plate", 0.9, BoundingBox(x, y, x + w, y + h))]
+
+    def predict_batch(self, frames: list[np.ndarray]) -> list[list[DetectionResult]]:
+        self.batch_sizes.append(len(frames))
+        return super().predict_batch(frames)
+
+
+class _MeanOCR(BaseOCR):
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:
+        return OcrResult(text="ABC123", confidence=float(cropped_plate.mean()) / 255)
+
+
+@pytest.mark.parametrize(
+    "length, tile_size, overlap, expected",
+    [
+        (80, 100, 0.2, [0]),
+        (100, 100, 0.2, [0]),
+        (180, 100, 0.2, [0, 80]),
+        (300, 100, 0.25, [0, 67, 133, 200]),
+    ],
+)
+def test_tile_offsets(length: int, tile_size: int, overlap: float, expected: list[int]) -> None:
+    assert tile_offsets(length, tile_size, overlap) == expected
+
+
+def test_tiled_detector_finds_small_plates() -> None:
+    frame = np.zeros((180, 300, 3), dtype=np.uint8)
+    # A plate across the border of the first two tiles, and a second one in the last tile
+    frame[20:30, 70:90] = 255
+    frame[150:160, 250:280] = 255
+    inner = _BrightSpotDetector()
+    assert not inner.predict(frame)
+
+    detector = TiledDetector(inner, tile_size=100, overlap=0.3)
+    detections = detector.predict(frame)
+    # All the tiles (plus the full frame) run in a single batch
+    assert inner.batch_sizes == [len(detector.tiles(frame)) + 1]
+    assert sorted((d.bounding_box for d in detections), key=lambda box: box.x1) == [
+        BoundingBox(70, 20, 90, 30),
+        BoundingBox(250, 150, 280, 160),
+    ]
+
+
+class _CutConfidentDetector(_BrightSpotDetector):
+    """Like `_BrightSpotDetector`, but more confident about plates cut by the input border."""
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:
+        height, width = frame.shape[:2]
+        return [
+            DetectionResult(
+                detection.label,
+                0.85 if box.x1 == 0 or box.y1 == 0 or box.x2 == width or box.y2 == height else 0.8,
+                box,
+            )
+            for detection in super().predict(frame)
+            for box in [detection.bounding_box]
+        ]
+
+
+def test_tiled_detector_keeps_whole_plate() -> None:
+    frame = np.zeros((180, 300, 3), dtype=np.uint8)
+    # Cut by the right border of the first tile, and whole in the second one
+    frame[20:30, 90:120] = 255
+    detector = TiledDetector(_CutConfidentDetector(), tile_size=100, overlap=0.3)
+    assert [d.bounding_box for d in detector.predict(frame)] == [BoundingBox(90, 20, 120, 30)]
+
+
+def test_tiled_detector_warmup() -> None:
+    inner = _BrightSpotDetector()
+    detector = TiledDetector(inner, tile_size=100, overlap=0.3)
+    detector.warmup([1, 2], (180, 300))
+    # Same batch sizes as running real frames of that shape
+    detector.predict_batch([np.zeros((180, 300, 3), dtype=np.uint8)] * 2)
+    assert inner.batch_sizes == [13, 26, 26]
+
+
+def test_tiled_detector_batch() -> None:
+    frame = np.zeros((180, 300, 3), dtype=np.uint8)
+    frame[150:160, 250:280] = 255
+    inner = _BrightSpotDetector()
+    detector = TiledDetector(inner, tile_size=100, overlap=0.3)
+    results = detector.predict_batch([frame, np.zeros_like(frame)])
+    assert len(inner.batch_sizes) == 1
+    assert [len(detections) for detections in results] == [1, 0]
+
+
+def test_alpr_tile_size() -> None:
+    frame = np.zeros((180, 300, 3), dtype=np.uint8)
+    frame[20:30, 70:90] = 255
+    alpr = ALPR(detector=_BrightSpotDetector(), ocr=_MeanOCR(), tile_size=100)
+    assert isinstance(alpr.detector, TiledDetector)
+    results = alpr.predict(frame)
+    assert [r.detection.bounding_box for r in results] == [BoundingBox(70, 20, 90, 30)]
@@ -0,0 +1,105 @@
+"""
+Test plate tracking.
+"""
+
+import numpy as np
+
+from fast_alpr import ALPR, BaseDetector, BaseOCR, DetectionResult, OcrResult, PlateTracker
+from fast_alpr.base import BoundingBox
+from fast_alpr.tracker import CropQuality
+
+
+def _detection(x1: int, y1: int, x2: int, y2: int) -> DetectionResult:
+    return DetectionResult("License Plate", 0.9, BoundingBox(x1, y1, x2, y2))
+
+
+class _ScriptedDetector(BaseDetector):
+    """Returns the boxes of the next frame of a script."""
+
+    def __init__(self, script: list[list[BoundingBox]]) -> None:
+        self.script = iter(script)
+
+    def predict(self, frame: np.ndarray) -> list[DetectionResult]:  # noqa: ARG002
+        return [DetectionResult("License Plate", 0.9, box) for box in next(self.script)]
+
+
+class _CountingOCR(BaseOCR):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def predict(self, cropped_plate: np.ndarray) -> OcrResult | None:  # noqa: ARG002
+        self.calls += 1
+        return OcrResult(text="ABC123", confidence=0.5 + self.calls / 100)
+
+
+def test_tracker_stable_ids() -> None:
+    tracker = PlateTracker()
+    first = tracker.update([_detection(0, 0, 40, 10), _detection(100, 100, 140, 110)])
+    # Plates moved a bit, and are returned in a different order
+    second = tracker.update([_detection(104, 102, 144, 112), _detection(3, 1, 43, 11)])
+    assert [t.track_id for t in second] == [first[1].track_id, first[0].track_id]
+    assert all(t.hits == 2 for t in second)
+
+
+def test_tracker_center_distance_fallback() -> None:
+    tracker = PlateTracker(iou_threshold=0.3, max_center_distance=1.0)
+    first = tracker.update([_detection(0, 0, 40, 10)])[0]
+    # No overlap at all, but the center moved less than one box diagonal
+    second = tracker.update([_detection(40, 0, 80, 10)])[0]
+    assert second.track_id == first.track_id
+    third = tracker.update([_detection(300, 300, 340, 310)])[0]
+    assert third.track_id != first.track_id
+
+
+def test_tracker_expires_tracks() -> None:
+    tracker = PlateTracker(max_age=2)
+    first = tracker.update([_detection(0, 0, 40, 10)])[0]
+    for _ in range(2):
+        tracker.update([])
+    assert first.track_id in tracker.tracks
+    tracker.update([])
+    assert not tracker.tracks
+    new = tracker.update([_detection(0, 0, 40, 10)])[0]
+    assert new.track_id != first.track_id
+
+
+def test_tracker_needs_ocr() -> None:
+    tracker = PlateTracker(min_area_gain=1.5, min_sharpness_gain=1.5)
+    track = tracker.update([_detection(0, 0, 40, 10)])[0]
+    quality = CropQuality(area=400, sharpness=100.0)
+    assert tracker.needs_ocr(track, quality)
+    tracker.record_ocr(track, OcrResult("ABC123", 0.9), quality)
+    assert not tracker.needs_ocr(track, CropQuality(area=500, sharpness=120.0))
+    assert tracker.needs_ocr(track, CropQuality(area=600, sharpness=100.0))
+    assert tracker.needs_ocr(track, CropQuality(area=400, sharpness=150.0))
+    # A less confident read doesn't replace the best one
+    tracker.record_ocr(track, OcrResult("A8C123", 0.6), CropQuality(area=600, sharpness=100.0))
+    assert track.ocr == OcrResult("ABC123", 0.9)
+    assert track.ocr_calls == 2
+
+
+def test_alpr_track_skips_ocr() -> None:
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (200, 300, 3), dtype=np.uint8)
+    script = [
+        [BoundingBox(10, 10, 50, 20)],
+        [BoundingBox(12, 10, 52, 20), BoundingBox(200, 150, 240, 160)],
+        [BoundingBox(14, 11, 54, 21), BoundingBox(202, 150, 242, 160)],
+        # The first plate got much closer to the camera
+        [BoundingBox(16, 11, 96, 31), BoundingBox(204, 150, 244, 160)],
+    ]
+    ocr = _CountingOCR()
+    alpr = ALPR(detector=_ScriptedDetector(script), ocr=ocr)
+    tracker = PlateTracker()
+    results = [alpr.track(frame, tracker) for _ in script]
+
+    assert ocr.calls == 3
+    assert [[r.track_id for r in frame_results] for frame_results in results] == [
+        [1],
+        [1, 2],
+        [1, 2],
+        [1, 2],
+    ]
+    assert all(r.ocr is not None for frame_results in results for r in frame_results)
+    # The read of the larger crop is more confident, so it becomes the best one
+    assert results[3][0].ocr == OcrResult("ABC123", 0.53)
@@ -0,0 +1,91 @@
+"""
+Test temporal OCR voting.
+"""
+
+import pytest
+
+from fast_alpr import OcrResult, PlateTracker, PlateVoter
+from fast_alpr.base import BoundingBox, DetectionResult
+from fast_alpr.tracker import CropQuality
+from fast_alpr.voting import char_confidences, vote
+
+
+def test_char_confidences() -> None:
+    assert char_confidences(OcrResult("AB1", [0.9, 0.8, 0.7])) == [0.9, 0.8, 0.7]
+    assert char_confidences(OcrResult("AB1", 0.5)) == [0.5, 0.5, 0.5]
+    assert char_confidences(OcrResult("AB1", [0.6, 0.9])) == pytest.approx([0.75] * 3)
+
+
+def test_vote_per_character() -> None:
+    reads = [
+        OcrResult("ABC123", [0.9, 0.5, 0.9, 0.9, 0.9, 0.9]),
+        OcrResult("A8C123", [0.9, 0.4, 0.9, 0.9, 0.9, 0.9]),
+        OcrResult("ABC128", [0.9, 0.9, 0.9, 0.9, 0.9, 0.3]),
+        # Minority length is ignored
+        OcrResult("ABC12", 0.6),
+    ]
+    result = vote(reads)
+    assert result is not None
+    assert result.text == "ABC123"
+    assert isinstance(result.confidence, list)
+    assert result.confidence[0] == pytest.approx(0.9)
+    assert result.confidence[1] == pytest.approx((0.5 + 0.9) / 3)
+    assert vote([]) is None
+    assert vote([OcrResult("", 0.9)]) is None
+
+
+def test_voter_finalizes_once() -> None:
+    voter = PlateVoter(min_reads=3, min_confidence=0.6)
+    assert voter.add(1, OcrResult("ABC123", 0.9)) is None
+    assert voter.add(1, OcrResult("A8C123", 0.5)) is None
+    assert not voter.is_finalized(1)
+    final = voter.add(1, OcrResult("ABC123", 0.9))
+    assert final is not None and final.text == "ABC123"
+    assert voter.is_finalized(1)
+    assert voter.add(1, OcrResult("ABC123", 0.9)) is None
+    assert voter.consensus(1) == final
+    voter.discard(1)
+    assert voter.consensus(1) is None
+
+
+def test_voter_waits_for_agreement() -> None:
+    voter = PlateVoter(min_reads=2, min_confidence=0.6)
+    assert voter.add("car", OcrResult("ABC123", 0.9)) is None
+    # Disagreement on the second character keeps its consensus confidence low
+    assert voter.add("car", OcrResult("A8C123", 0.85)) is None
+    consensus = voter.consensus("car")
+    assert consensus is not None and consensus.text == "ABC123"
+    final = voter.add("car", OcrResult("ABC123", 0.9))
+    assert final is not None and final.text == "ABC123"
+
+
+def test_tracker_with_voter() -> None:
+    tracker = PlateTracker(voter=PlateVoter(min_reads=2, min_confidence=0.8))
+    detection = DetectionResult("License Plate", 0.9, BoundingBox(0, 0, 40, 10))
+    quality = CropQuality(area=400, sharpness=100.0)
+    track = tracker.update([detection])[0]
+    for text in ("ABC123", "ABC123"):
+        assert tracker.needs_ocr(track, quality)
+        tracker.record_ocr(track, OcrResult(text, 0.9), quality)
+    assert track.finalized
+    assert track.ocr is not None and track.ocr.text == "ABC123"
+    assert not tracker.needs_ocr(track, CropQuality(area=4000, sharpness=1000.0))
+
+
+def test_tracker_caps_voter_reads() -> None:
+    tracker = PlateTracker(voter=PlateVoter(min_reads=2, min_confidence=0.8), max_voter_reads=3)
+    detection = DetectionResult("License Plate", 0.9, BoundingBox(0, 0, 40, 10))
+    quality = CropQuality(area=400, sharpness=100.0)
+    track = tracker.update([detection])[0]
+    # Reads that never agree, i.e. an occluded plate
+    for text in ("ABC123", "XYZ789", "QRS456"):
+        assert tracker.needs_ocr(track, quality)
+        tracker.record_ocr(track, OcrResult(text, 0.5), quality)
+    assert not track.finalized
+    assert not tracker.needs_ocr(track, quality)
+    # A better crop is still read
+    assert tracker.needs_ocr(track, CropQuality(area=800, sharpness=100.0))
+
+    assert PlateTracker(voter=PlateVoter(max_reads=5)).max_voter_reads == 5
+    with pytest.raises(ValueError, match="max_voter_reads"):
+        PlateTracker(max_voter_reads=0)